@@ -1,12 +1,13 @@
-import bpy
 import os
 import sys
-import importlib
-from bpy.props import StringProperty, BoolProperty, EnumProperty
+import bpy
+from bpy.props import StringProperty, BoolProperty, EnumProperty, FloatProperty, IntProperty, FloatVectorProperty, PointerProperty
 from bpy.types import PropertyGroup
 from . import operators
 from . import ui
 from . import utils
+from .utils import blender_api, hot_reload, metrics
+from .utils.hot_reload import is_developer_mode
 
 bl_info = {
     "name": "SciBlend - Geometry Nodes",
@@ -25,8 +26,8 @@ def unregister_old_addon():
     Desregistra cualquier versión anterior del addon que pueda estar registrada.
     Esto permite actualizar el addon sin necesidad de reiniciar Blender.
     """
-    # Configurar logging
     import logging
+    import importlib
     logger = logging.getLogger("GeometryNodes")
     
     # Lista de clases a desregistrar
@@ -34,6 +35,16 @@ def unregister_old_addon():
         # Operadores
         "SCIBLEND_OT_apply_geometry_nodes",
         "SCIBLEND_OT_apply_transformation",
+        "SCIBLEND_OT_deduplicate_node_groups",
+        "SCIBLEND_OT_watch_template",
+        "SCIBLEND_OT_parameter_sweep",
+        "SCIBLEND_OT_apply_bundle",
+        "SCIBLEND_OT_fuse_modifier_stack",
+        "SCIBLEND_OT_profile_modifiers",
+        "SCIBLEND_OT_probe_geometry_stats",
+        "SCIBLEND_OT_export_node_trees",
+        "SCIBLEND_OT_create_glyphs",
+        "SCIBLEND_OT_reload_changed_modules",
         # UI
         "SCIBLEND_PT_geometry_nodes",
         # Propiedades
@@ -106,6 +117,133 @@ class SciblendGeonodesProperties(PropertyGroup):
         default='GEOMETRY'
     )
     
+    apply_mode: EnumProperty(
+        name="Modo de aplicación",
+        description="Cómo se aplica el árbol de nodos a los objetos",
+        items=[
+            ('OBJECT', "Objeto activo", "Añadir el modificador al objeto activo"),
+            ('COLLECTION', "Instancias de colección", "Reunir los objetos seleccionados en una colección y evaluarlos con un único modificador")
+        ],
+        default='OBJECT'
+    )
+    
+    target_set: EnumProperty(
+        name="Destino",
+        description="Objetos a los que se aplica el árbol, resueltos con el índice espacial de la escena",
+        items=[
+            ('SELECTION', "Selección", "Objeto activo u objetos seleccionados"),
+            ('BOX', "Dentro de caja", "Objetos que tocan una caja centrada en el cursor 3D"),
+            ('RADIUS', "Dentro de radio", "Objetos a menos de un radio del cursor 3D"),
+            ('FRUSTUM', "En cámara", "Objetos dentro del encuadre de la cámara de render")
+        ],
+        default='SELECTION'
+    )
+    
+    target_box_size: FloatVectorProperty(
+        name="Tamaño de la caja",
+        description="Dimensiones de la caja de destino centrada en el cursor 3D",
+        default=(10.0, 10.0, 10.0),
+        min=0.0,
+        subtype='XYZ'
+    )
+    
+    target_radius: FloatProperty(
+        name="Radio",
+        description="Radio de destino alrededor del cursor 3D",
+        default=5.0,
+        min=0.0
+    )
+    
+    append_to_tree: BoolProperty(
+        name="Componer",
+        description="Componer la nueva plantilla sobre la salida del árbol existente en lugar de sustituirlo",
+        default=False
+    )
+    
+    watch_interval: FloatProperty(
+        name="Intervalo de vigilancia",
+        description="Segundos entre comprobaciones del archivo JSON vigilado",
+        default=0.25,
+        min=0.05,
+        max=10.0
+    )
+    
+    sweep_grid: StringProperty(
+        name="Rejilla de parámetros",
+        description='Valores a evaluar en formato JSON, p. ej. {"line.Count": [5, 10, 20], "line.Offset": [[0, 0, 1], [0, 0, 2]]}',
+        default=""
+    )
+    
+    sweep_output: StringProperty(
+        name="Resultados del barrido",
+        description="Archivo CSV o NPZ donde se guardan las estadísticas del barrido",
+        default="//sweep.csv",
+        subtype='FILE_PATH'
+    )
+    
+    sweep_count_instances: BoolProperty(
+        name="Contar instancias",
+        description="Contar las instancias generadas en cada combinación (más lento en escenas grandes)",
+        default=True
+    )
+    
+    profile_output: StringProperty(
+        name="Resultados del perfilado",
+        description="Archivo CSV o JSON donde se guarda el coste por árbol de nodos",
+        default="//profile.csv",
+        subtype='FILE_PATH'
+    )
+    
+    profile_frame_step: IntProperty(
+        name="Paso",
+        description="Fotogramas entre mediciones del perfilado",
+        default=1,
+        min=1
+    )
+    
+    stats_attributes: StringProperty(
+        name="Atributos",
+        description="Atributos de la geometría evaluada a resumir, separados por comas",
+        default=""
+    )
+    
+    glyph_shape: EnumProperty(
+        name="Glifo",
+        description="Geometría instanciada en cada punto",
+        items=[
+            ('ICO_SPHERE', "Esfera", "Icoesfera pequeña"),
+            ('CONE', "Cono", "Cono orientado según la rotación de cada punto"),
+            ('CUBE', "Cubo", "Cubo pequeño"),
+            ('OBJECT', "Objeto", "Geometría de un objeto de la escena")
+        ],
+        default='ICO_SPHERE'
+    )
+    
+    glyph_object: PointerProperty(
+        name="Objeto glifo",
+        description="Objeto instanciado en cada punto cuando el glifo es un objeto",
+        type=bpy.types.Object
+    )
+    
+    skip_undo_large_batches: BoolProperty(
+        name="Sin deshacer en lotes grandes",
+        description="No guardar paso de deshacer en lotes con muchos objetos para ahorrar memoria (no podrán deshacerse por separado)",
+        default=False
+    )
+    
+    undo_skip_threshold: IntProperty(
+        name="Objetos",
+        description="Tamaño de lote a partir del cual no se guarda paso de deshacer",
+        default=1000,
+        min=1
+    )
+    
+    strict_build: BoolProperty(
+        name="Modo estricto",
+        description="Validar el árbol antes de aplicarlo y no modificar la escena si hay problemas",
+        default=False
+    )
+    
     use_custom_attribute: BoolProperty(
         name="Usar atributo personalizado",
         description="Activar para especificar un nombre de atributo personalizado",
@@ -119,8 +257,12 @@ class SciblendGeonodesProperties(PropertyGroup):
     )
 
 def register():
-    # Desregistrar cualquier versión anterior del addon
-    unregister_old_addon()
+    # Desregistrar cualquier versión anterior del addon (solo en modo desarrollador)
+    if is_developer_mode():
+        unregister_old_addon()
+    
+    # Detectar una sola vez la variante de la API de Blender
+    blender_api.detect()
     
     # Registrar clases
     bpy.utils.register_class(SciblendGeonodesProperties)
@@ -132,9 +274,29 @@ def register():
     # Registrar propiedades
     bpy.types.Scene.sciblend_geonodes = bpy.props.PointerProperty(type=SciblendGeonodesProperties)
     
+    # Instantánea de los módulos para la recarga selectiva (solo en modo desarrollador)
+    if is_developer_mode():
+        hot_reload.snapshot()
+    
+    # Exportación de métricas si está definida SCIBLEND_METRICS_FILE
+    metrics.start_from_environment()
+    
+    # Precalentamiento de las cachés de plantillas si está definida SCIBLEND_PREWARM
+    if os.environ.get("SCIBLEND_PREWARM", "") not in ("", "0"):
+        from .utils import prewarm
+        prewarm.start_from_environment()
+    
     print("SciBlend - Geometry Nodes registrado correctamente")
 
 def unregister():
+    # Escribir por última vez las métricas y detener su exportación
+    metrics.stop_export()
+    
+    # Detener el precalentamiento si llegó a iniciarse
+    prewarm = sys.modules.get(f"{__package__}.utils.prewarm")
+    if prewarm is not None:
+        prewarm.stop_prewarm()
+    
     # Desregistrar propiedades
     del bpy.types.Scene.sciblend_geonodes
     
@@ -1,10 +1,40 @@
 from . import import_json
 from . import apply_node_tree
+from . import deduplicate
+from . import watch_template
+from . import sweep
+from . import bundle
+from . import fuse_stack
+from . import profile
+from . import stats
+from . import export_trees
+from . import glyphs
+from . import dev_reload
 
 def register():
     import_json.register()
     apply_node_tree.register()
+    deduplicate.register()
+    watch_template.register()
+    sweep.register()
+    bundle.register()
+    fuse_stack.register()
+    profile.register()
+    stats.register()
+    export_trees.register()
+    glyphs.register()
+    dev_reload.register()
 
 def unregister():
+    dev_reload.unregister()
+    glyphs.unregister()
+    export_trees.unregister()
+    stats.unregister()
+    profile.unregister()
+    fuse_stack.unregister()
+    bundle.unregister()
+    sweep.unregister()
+    watch_template.unregister()
+    deduplicate.unregister()
     apply_node_tree.unregister()
-    import_json.unregister() 
\ No newline at end of file
+    import_json.unregister() 
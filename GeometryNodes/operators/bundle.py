@@ -0,0 +1,57 @@
+import bpy
+import logging
+from bpy.types import Operator
+from bpy_extras.io_utils import ImportHelper
+from bpy.props import StringProperty
+
+logger = logging.getLogger("GeometryNodes")
+
+class SCIBLEND_OT_apply_bundle(Operator, ImportHelper):
+    bl_idname = "sciblend.apply_bundle"
+    bl_label = "Aplicar Paquete"
+    bl_description = "Construye y aplica en una sola pasada todas las plantillas de un paquete JSON o NDJSON"
+    # El paso de deshacer lo guarda execute_batch, uno por paquete
+    bl_options = {'REGISTER'}
+    
+    filename_ext = ".json"
+    filter_glob: StringProperty(
+        default="*.json;*.ndjson;*.jsonl",
+        options={'HIDDEN'},
+    )
+    
+    def execute(self, context):
+        from .apply_node_tree import execute_batch
+        return execute_batch(self, context)
+    
+    def run(self, context):
+        from ..utils import bundle
+        from ..utils.diagnostics import BuildDiagnostics
+        
+        props = context.scene.sciblend_geonodes
+        diagnostics = BuildDiagnostics()
+        
+        try:
+            summary = bundle.apply_bundle(context, self.filepath, diagnostics, strict=props.strict_build)
+        except Exception as e:
+            logger.exception("Error al aplicar el paquete de plantillas")
+            self.report({'ERROR'}, f"Error al aplicar el paquete: {str(e)}")
+            return {'CANCELLED'}
+        
+        self.report({'INFO'}, f"Paquete aplicado: {summary['templates']} plantillas, "
+                              f"{summary['objects']} objetos en {summary['elapsed']:.2f} s")
+        if diagnostics:
+            diagnostics.log()
+            self.report({'WARNING'}, diagnostics.summary())
+        return {'FINISHED'}
+
+classes = (
+    SCIBLEND_OT_apply_bundle,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
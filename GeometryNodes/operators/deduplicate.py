@@ -0,0 +1,113 @@
+import bpy
+import os
+import logging
+import tempfile
+from bpy.types import Operator
+from bpy.props import BoolProperty
+
+logger = logging.getLogger("GeometryNodes")
+
+def measure_node_groups_bytes(node_groups):
+    """
+    Mide el tamaño en disco (sin comprimir) de un conjunto de árboles de nodos.
+
+    Escribe los árboles en un .blend temporal. El tamaño sin comprimir es una buena
+    aproximación de la memoria que ocupan, ya que el formato .blend vuelca las
+    estructuras internas de Blender.
+
+    Args:
+        node_groups: Iterable de árboles de nodos
+
+    Returns:
+        int: Tamaño en bytes
+    """
+    fd, filepath = tempfile.mkstemp(suffix=".blend")
+    os.close(fd)
+    try:
+        bpy.data.libraries.write(filepath, set(node_groups), compress=False)
+        return os.path.getsize(filepath)
+    finally:
+        os.remove(filepath)
+
+def _pick_representative(node_groups):
+    """
+    Elige el árbol que se conserva: uno con usuario falso si lo hay, luego el que más
+    usuarios tiene y luego el de nombre más corto
+    """
+    return max(node_groups, key=lambda ng: (ng.use_fake_user, ng.users, -len(ng.name), ng.name))
+
+class SCIBLEND_OT_deduplicate_node_groups(Operator):
+    bl_idname = "sciblend.deduplicate_node_groups"
+    bl_label = "Deduplicar Árboles de Nodos"
+    bl_description = "Unifica los árboles de Geometry Nodes con estructura idéntica y elimina los duplicados"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    measure_size: BoolProperty(
+        name="Medir ahorro",
+        description="Escribe los árboles en un archivo temporal para medir el ahorro en memoria y disco",
+        default=True
+    )
+
+    def execute(self, context):
+        from ..utils import tree_hash
+        from ..utils.node_builder import PLAN_HASH_PROP
+        
+        # Agrupar los árboles locales por hash estructural
+        memo = {}
+        groups_by_hash = {}
+        for node_group in bpy.data.node_groups:
+            if node_group.bl_idname != 'GeometryNodeTree' or node_group.library is not None:
+                continue
+            structural = tree_hash.structural_hash(node_group, memo)
+            groups_by_hash.setdefault(structural, []).append(node_group)
+
+        duplicates = []
+        for node_groups in groups_by_hash.values():
+            if len(node_groups) < 2:
+                continue
+            representative = _pick_representative(node_groups)
+            for node_group in node_groups:
+                if node_group is not representative:
+                    duplicates.append((node_group, representative))
+
+        if not duplicates:
+            self.report({'INFO'}, f"No hay duplicados entre {len(memo)} árboles")
+            return {'FINISHED'}
+
+        nodes_removed = sum(len(dup.nodes) for dup, _ in duplicates)
+        links_removed = sum(len(dup.links) for dup, _ in duplicates)
+
+        size_before = 0
+        if self.measure_size:
+            size_before = measure_node_groups_bytes(bpy.data.node_groups)
+
+        # Reasignar modificadores y nodos de grupo al representante y purgar los duplicados
+        for duplicate, representative in duplicates:
+            logger.info(f"Reasignando {duplicate.name} -> {representative.name}")
+            if representative.get(PLAN_HASH_PROP) is None and duplicate.get(PLAN_HASH_PROP) is not None:
+                representative[PLAN_HASH_PROP] = duplicate[PLAN_HASH_PROP]
+            duplicate.user_remap(representative)
+            bpy.data.node_groups.remove(duplicate)
+
+        message = (f"{len(duplicates)} árboles duplicados eliminados "
+                   f"({nodes_removed} nodos, {links_removed} links)")
+
+        if self.measure_size:
+            saved = size_before - measure_node_groups_bytes(bpy.data.node_groups)
+            message += f", ahorro aproximado en memoria y disco: {saved / 1024:.1f} KB"
+
+        logger.info(message)
+        self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+classes = (
+    SCIBLEND_OT_deduplicate_node_groups,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
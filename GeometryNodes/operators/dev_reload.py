@@ -0,0 +1,48 @@
+import bpy
+import logging
+from bpy.types import Operator
+
+logger = logging.getLogger("GeometryNodes")
+
+def _reload_changed():
+    from ..utils import hot_reload
+    try:
+        hot_reload.reload_changed()
+    except Exception:
+        logger.exception("Error al recargar los módulos cambiados")
+    return None
+
+class SCIBLEND_OT_reload_changed_modules(Operator):
+    bl_idname = "sciblend.reload_changed_modules"
+    bl_label = "Recargar Módulos Cambiados"
+    bl_description = "Recarga solo los módulos del addon modificados desde la última carga y vuelve a registrar sus clases (modo desarrollador)"
+    
+    @classmethod
+    def poll(cls, context):
+        from ..utils import hot_reload
+        return hot_reload.is_developer_mode()
+    
+    def execute(self, context):
+        from ..utils import hot_reload
+        
+        changed = hot_reload.changed_modules()
+        if not changed:
+            self.report({'INFO'}, "No hay módulos cambiados")
+            return {'FINISHED'}
+        
+        # La recarga puede desregistrar este mismo operador: se hace al terminar su ejecución
+        bpy.app.timers.register(_reload_changed, first_interval=0.0)
+        self.report({'INFO'}, f"Recargando {len(changed)} módulos cambiados")
+        return {'FINISHED'}
+
+classes = (
+    SCIBLEND_OT_reload_changed_modules,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,76 @@
+import bpy
+import logging
+from bpy.types import Operator
+from bpy_extras.io_utils import ExportHelper
+from bpy.props import StringProperty, EnumProperty, BoolProperty
+
+logger = logging.getLogger("GeometryNodes")
+
+class SCIBLEND_OT_export_node_trees(Operator, ExportHelper):
+    bl_idname = "sciblend.export_node_trees"
+    bl_label = "Exportar Árboles"
+    bl_description = "Exporta árboles de Geometry Nodes como plantillas del addon en un paquete NDJSON"
+    
+    filename_ext = ".ndjson"
+    filter_glob: StringProperty(
+        default="*.ndjson;*.jsonl",
+        options={'HIDDEN'},
+    )
+    
+    scope: EnumProperty(
+        name="Árboles",
+        items=[
+            ('ACTIVE', "Objeto activo", "Árbol del modificador de Geometry Nodes del objeto activo"),
+            ('ALL', "Todos", "Todos los árboles de Geometry Nodes del archivo")
+        ],
+        default='ACTIVE'
+    )
+    
+    register_cache: BoolProperty(
+        name="Registrar en caché",
+        description="Usar los árboles exportados como árboles en caché de sus plantillas, de modo que aplicarlas en este archivo no reconstruye nada",
+        default=True
+    )
+    
+    def execute(self, context):
+        from ..utils import tree_export, node_builder
+        
+        if self.scope == 'ACTIVE':
+            obj = context.active_object
+            gn_mod = next((mod for mod in obj.modifiers if mod.type == 'NODES'), None) if obj else None
+            if gn_mod is None or gn_mod.node_group is None:
+                self.report({'ERROR'}, "El objeto activo no tiene un árbol de Geometry Nodes")
+                return {'CANCELLED'}
+            node_groups = [gn_mod.node_group]
+        else:
+            node_groups = None
+        
+        try:
+            results = tree_export.export_library(node_groups)
+            tree_export.write_bundle(results, self.filepath)
+        except Exception as e:
+            logger.exception("Error al exportar los árboles de nodos")
+            self.report({'ERROR'}, f"Error al exportar los árboles: {str(e)}")
+            return {'CANCELLED'}
+        
+        if self.register_cache:
+            node_groups = node_groups or [bpy.data.node_groups[result["template"]["name"]] for result in results]
+            for node_group, result in zip(node_groups, results):
+                # Los árboles de pila guardan su propia cadena y no se sustituyen
+                if node_group.get(node_builder.PLAN_HASH_PROP) is None:
+                    node_builder.cache_node_group(result["hash"], node_group)
+        
+        self.report({'INFO'}, f"{len(results)} árboles exportados a {bpy.path.basename(self.filepath)}")
+        return {'FINISHED'}
+
+classes = (
+    SCIBLEND_OT_export_node_trees,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,46 @@
+import bpy
+import logging
+from bpy.types import Operator
+
+logger = logging.getLogger("GeometryNodes")
+
+class SCIBLEND_OT_fuse_modifier_stack(Operator):
+    bl_idname = "sciblend.fuse_modifier_stack"
+    bl_label = "Fusionar Modificadores"
+    bl_description = "Fusiona los modificadores de Geometry Nodes consecutivos creados por SciBlend en un único árbol"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def execute(self, context):
+        from ..utils import stack_fusion
+        
+        objects = context.selected_objects or ([context.active_object] if context.active_object else [])
+        if not objects:
+            self.report({'ERROR'}, "No hay objetos seleccionados")
+            return {'CANCELLED'}
+        
+        removed = 0
+        try:
+            for obj in objects:
+                removed += stack_fusion.fuse_modifier_stack(obj)
+        except Exception as e:
+            logger.exception("Error al fusionar modificadores")
+            self.report({'ERROR'}, f"Error al fusionar modificadores: {str(e)}")
+            return {'CANCELLED'}
+        
+        if removed == 0:
+            self.report({'INFO'}, "No hay modificadores consecutivos que fusionar")
+        else:
+            self.report({'INFO'}, f"{removed} modificadores fusionados")
+        return {'FINISHED'}
+
+classes = (
+    SCIBLEND_OT_fuse_modifier_stack,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,64 @@
+import bpy
+import logging
+from bpy.types import Operator
+from bpy_extras.io_utils import ImportHelper
+from bpy.props import StringProperty
+
+logger = logging.getLogger("GeometryNodes")
+
+class SCIBLEND_OT_create_glyphs(Operator, ImportHelper):
+    bl_idname = "sciblend.create_glyphs"
+    bl_label = "Crear Glifos"
+    bl_description = "Crea una nube de puntos desde un archivo .npy o .npz e instancia un glifo en cada punto"
+    # El paso de deshacer lo guarda execute_batch
+    bl_options = {'REGISTER'}
+    
+    filename_ext = ".npz"
+    filter_glob: StringProperty(
+        default="*.npy;*.npz",
+        options={'HIDDEN'},
+    )
+    
+    def execute(self, context):
+        from .apply_node_tree import execute_batch
+        return execute_batch(self, context)
+    
+    def run(self, context):
+        from ..utils import glyphs
+        from ..utils.diagnostics import BuildDiagnostics
+        from .apply_node_tree import report_diagnostics
+        
+        props = context.scene.sciblend_geonodes
+        if props.glyph_shape == 'OBJECT' and props.glyph_object is None:
+            self.report({'ERROR'}, "No se ha seleccionado el objeto usado como glifo")
+            return {'CANCELLED'}
+        
+        diagnostics = BuildDiagnostics()
+        try:
+            obj = glyphs.create_glyphs_from_file(context, self.filepath, shape=props.glyph_shape,
+                                                 glyph_object=props.glyph_object, diagnostics=diagnostics)
+        except Exception as e:
+            logger.exception("Error al crear los glifos")
+            self.report({'ERROR'}, f"Error al crear los glifos: {str(e)}")
+            return {'CANCELLED'}
+        
+        for selected in context.selected_objects:
+            selected.select_set(False)
+        obj.select_set(True)
+        context.view_layer.objects.active = obj
+        
+        self.report({'INFO'}, f"{len(obj.data.vertices)} glifos creados en {obj.name}")
+        report_diagnostics(self, diagnostics)
+        return {'FINISHED'}
+
+classes = (
+    SCIBLEND_OT_create_glyphs,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -4,8 +4,6 @@ from bpy.types import Operator
 from bpy_extras.io_utils import ImportHelper
 from bpy.props import StringProperty, BoolProperty
 
-from ..utils import json_parser
-
 class SCIBLEND_OT_import_geometry_nodes_json(Operator, ImportHelper):
     bl_idname = "sciblend.import_geometry_nodes_json"
     bl_label = "Seleccionar JSON"
@@ -0,0 +1,46 @@
+import bpy
+import logging
+from bpy.types import Operator
+
+logger = logging.getLogger("GeometryNodes")
+
+class SCIBLEND_OT_profile_modifiers(Operator):
+    bl_idname = "sciblend.profile_modifiers"
+    bl_label = "Perfilar Modificadores"
+    bl_description = "Mide el coste por fotograma de cada modificador de SciBlend en el rango de la escena y guarda el resumen"
+    
+    def execute(self, context):
+        from ..utils import profiler
+        
+        scene = context.scene
+        props = scene.sciblend_geonodes
+        
+        if not profiler.find_profiled_modifiers(scene):
+            self.report({'ERROR'}, "No hay modificadores de SciBlend en la escena")
+            return {'CANCELLED'}
+        
+        try:
+            profile = profiler.profile_modifiers(context, scene.frame_start, scene.frame_end, props.profile_frame_step)
+            output = bpy.path.abspath(props.profile_output)
+            rows = profiler.write_profile(profile, output)
+        except Exception as e:
+            logger.exception("Error al perfilar los modificadores")
+            self.report({'ERROR'}, f"Error al perfilar los modificadores: {str(e)}")
+            return {'CANCELLED'}
+        
+        slowest = rows[0]
+        self.report({'INFO'}, f"{len(rows)} árboles perfilados; el más costoso es {slowest['node_group']} "
+                              f"(p95 {slowest['p95_ms']:.1f} ms). Resultados en {bpy.path.basename(output)}")
+        return {'FINISHED'}
+
+classes = (
+    SCIBLEND_OT_profile_modifiers,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
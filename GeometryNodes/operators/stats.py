@@ -0,0 +1,54 @@
+import bpy
+import sys
+import logging
+from bpy.types import Operator
+
+logger = logging.getLogger("GeometryNodes")
+
+class SCIBLEND_OT_probe_geometry_stats(Operator):
+    bl_idname = "sciblend.probe_geometry_stats"
+    bl_label = "Estadísticas de Geometría"
+    bl_description = "Evalúa el objeto activo y resume su geometría: recuentos, límites y atributos indicados"
+    
+    def execute(self, context):
+        from ..utils import geometry_stats
+        
+        obj = context.active_object
+        if not obj:
+            self.report({'ERROR'}, "No hay objeto seleccionado")
+            return {'CANCELLED'}
+        
+        props = context.scene.sciblend_geonodes
+        attribute_names = [name.strip() for name in props.stats_attributes.split(",") if name.strip()]
+        
+        try:
+            stats = geometry_stats.probe(context, obj, attribute_names)
+        except Exception as e:
+            logger.exception("Error al calcular las estadísticas de geometría")
+            self.report({'ERROR'}, f"Error al calcular las estadísticas: {str(e)}")
+            return {'CANCELLED'}
+        
+        missing = [name for name, summary in stats["attributes"].items() if summary is None]
+        if missing:
+            self.report({'WARNING'}, f"Atributos no encontrados o no admitidos: {', '.join(missing)}")
+        
+        for area in context.screen.areas if context.screen else ():
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+        return {'FINISHED'}
+
+classes = (
+    SCIBLEND_OT_probe_geometry_stats,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    # Dejar de seguir el depsgraph si llegaron a calcularse estadísticas
+    geometry_stats = sys.modules.get(f"{__package__.rpartition('.')[0]}.utils.geometry_stats")
+    if geometry_stats is not None:
+        geometry_stats.clear()
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,59 @@
+import bpy
+import json
+import logging
+from bpy.types import Operator
+
+logger = logging.getLogger("GeometryNodes")
+
+class SCIBLEND_OT_parameter_sweep(Operator):
+    bl_idname = "sciblend.parameter_sweep"
+    bl_label = "Barrido de Parámetros"
+    bl_description = "Evalúa la plantilla JSON en el objeto activo para cada combinación de la rejilla y guarda las estadísticas"
+    
+    def execute(self, context):
+        from ..utils import sweep, template_plan
+        
+        obj = context.active_object
+        if not obj:
+            self.report({'ERROR'}, "No hay objeto seleccionado")
+            return {'CANCELLED'}
+        
+        props = context.scene.sciblend_geonodes
+        if not props.json_filepath:
+            self.report({'ERROR'}, "No se ha seleccionado un archivo JSON")
+            return {'CANCELLED'}
+        
+        try:
+            grid = json.loads(props.sweep_grid)
+        except ValueError:
+            self.report({'ERROR'}, "La rejilla de parámetros no es un JSON válido")
+            return {'CANCELLED'}
+        
+        if not isinstance(grid, dict) or not grid or not all(isinstance(v, list) and v for v in grid.values()):
+            self.report({'ERROR'}, 'La rejilla debe tener la forma {"nodo.Entrada": [valores], ...}')
+            return {'CANCELLED'}
+        
+        try:
+            plan = template_plan.load_template(bpy.path.abspath(props.json_filepath))
+            rows = sweep.run_sweep(context, obj, plan, grid, props.sweep_count_instances)
+            output = bpy.path.abspath(props.sweep_output)
+            sweep.write_results(rows, output)
+        except Exception as e:
+            logger.exception("Error en el barrido de parámetros")
+            self.report({'ERROR'}, f"Error en el barrido de parámetros: {str(e)}")
+            return {'CANCELLED'}
+        
+        self.report({'INFO'}, f"{len(rows)} combinaciones evaluadas, resultados en {bpy.path.basename(output)}")
+        return {'FINISHED'}
+
+classes = (
+    SCIBLEND_OT_parameter_sweep,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
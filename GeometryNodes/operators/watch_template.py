@@ -0,0 +1,56 @@
+import bpy
+import sys
+import logging
+from bpy.types import Operator
+
+logger = logging.getLogger("GeometryNodes")
+
+class SCIBLEND_OT_watch_template(Operator):
+    bl_idname = "sciblend.watch_template"
+    bl_label = "Vigilar Plantilla"
+    bl_description = "Reaplica automáticamente la plantilla JSON al objeto activo cada vez que cambia el archivo"
+    
+    def execute(self, context):
+        from ..utils import template_watch
+        
+        # El mismo botón inicia y detiene la vigilancia
+        if template_watch.is_watching():
+            template_watch.stop_watch()
+            self.report({'INFO'}, "Vigilancia de plantilla detenida")
+            return {'FINISHED'}
+        
+        obj = context.active_object
+        if not obj:
+            self.report({'ERROR'}, "No hay objeto seleccionado")
+            return {'CANCELLED'}
+        
+        props = context.scene.sciblend_geonodes
+        if not props.json_filepath:
+            self.report({'ERROR'}, "No se ha seleccionado un archivo JSON")
+            return {'CANCELLED'}
+        
+        try:
+            template_watch.start_watch(obj, bpy.path.abspath(props.json_filepath), props.watch_interval)
+        except Exception as e:
+            logger.exception("Error al iniciar la vigilancia de la plantilla")
+            self.report({'ERROR'}, f"Error al iniciar la vigilancia: {str(e)}")
+            return {'CANCELLED'}
+        
+        self.report({'INFO'}, f"Vigilando {bpy.path.basename(props.json_filepath)}")
+        return {'FINISHED'}
+
+classes = (
+    SCIBLEND_OT_watch_template,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    # Solo hay vigilancia activa si el módulo llegó a importarse
+    template_watch = sys.modules.get(f"{__package__.rpartition('.')[0]}.utils.template_watch")
+    if template_watch is not None:
+        template_watch.stop_watch()
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -1 +1 @@
-# Este archivo puede quedar vacío inicialmente 
\ No newline at end of file
+from . import transforms
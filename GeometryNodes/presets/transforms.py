@@ -0,0 +1,94 @@
+import functools
+
+from ..utils import template_plan
+
+# Nodos de cada transformación predefinida, en el mismo formato que las plantillas JSON
+_TRANSFORM_NODES = {
+    'translate': [
+        {
+            "id": "transform",
+            "type": "GeometryNodeTransform",
+            "location": (100, 0),
+            "inputs": {"Translation": (1.0, 0.0, 0.0)}
+        }
+    ],
+    'rotate': [
+        {
+            "id": "transform",
+            "type": "GeometryNodeTransform",
+            "location": (100, 0),
+            "inputs": {"Rotation": (0.0, 0.0, 0.785398)}  # Rotación 45 grados en Z
+        }
+    ],
+    'scale': [
+        {
+            "id": "transform",
+            "type": "GeometryNodeTransform",
+            "location": (100, 0),
+            "inputs": {"Scale": (2.0, 2.0, 2.0)}
+        }
+    ],
+    'mirror': [
+        {
+            "id": "transform",
+            "type": "GeometryNodeMirror",  # Este nodo puede no existir en todas las versiones
+            "location": (100, 0),
+            "inputs": {"1": True}  # Espejo en X
+        }
+    ],
+    'array': [
+        {
+            "id": "line",
+            "type": "GeometryNodeMeshLine",
+            "location": (-50, -100),
+            "properties": {"mode": 'END_POINTS'},
+            "inputs": {"Count": 5, "End Location": (2.0, 0.0, 0.0)}
+        },
+        {
+            "id": "transform",
+            "type": "GeometryNodeInstanceOnPoints",
+            "location": (100, 0)
+        }
+    ],
+}
+
+def _transform_links(transform_type):
+    """Enlaces entre la entrada, el nodo de transformación y la salida"""
+    if transform_type == 'array':
+        return [
+            {"from_node": "line", "from_socket": "Mesh", "to_node": "transform", "to_socket": "Points"},
+            {"from_node": "input", "from_socket": "Geometry", "to_node": "transform", "to_socket": "Instance"},
+            {"from_node": "transform", "from_socket": "Instances", "to_node": "output", "to_socket": "Geometry"},
+        ]
+
+    return [
+        {"from_node": "input", "from_socket": "Geometry", "to_node": "transform", "to_socket": "Geometry"},
+        {"from_node": "transform", "from_socket": "Geometry", "to_node": "output", "to_socket": "Geometry"},
+    ]
+
+@functools.lru_cache(maxsize=None)
+def get_transform_plan(transform_type, attribute_target='GEOMETRY', custom_attribute_name=""):
+    """
+    Devuelve el plan compilado de una transformación predefinida.
+
+    El resultado se memoriza por (transform_type, attribute_target, custom_attribute_name)
+    y comparte el formato de plan y la caché de árboles con las plantillas JSON.
+
+    Args:
+        transform_type (str): Tipo de transformación ('translate', 'rotate', ...)
+        attribute_target (str): Atributo al que se aplica la transformación
+        custom_attribute_name (str): Nombre del atributo cuando attribute_target es 'CUSTOM'
+
+    Returns:
+        dict: Plan compilado (compartido, no debe modificarse)
+    """
+    nodes = _TRANSFORM_NODES.get(transform_type)
+
+    # Si el tipo no existe, conectar directamente entrada y salida
+    data = {
+        "name": f"GN_{transform_type}",
+        "nodes": nodes or [],
+        "links": _transform_links(transform_type) if nodes else [],
+    }
+
+    return template_plan.compile_template(data)
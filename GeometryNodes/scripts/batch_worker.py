@@ -0,0 +1,48 @@
+"""
+Worker de procesamiento por lotes que se ejecuta dentro de Blender.
+
+Uso (lo lanza sciblend_batch.py, no suele invocarse a mano):
+    blender --background --factory-startup --python batch_worker.py
+
+Importa el addon una sola vez, lee trabajos JSON (uno por línea) de la entrada
+estándar y escribe cada resultado en una línea con el prefijo RESULT_PREFIX.
+"""
+import os
+import sys
+import json
+import importlib
+
+RESULT_PREFIX = "SCIBLEND_RESULT "
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_addon():
+    """Importa y registra el addon desde el directorio que contiene este script"""
+    sys.path.insert(0, os.path.dirname(ADDON_DIR))
+    addon = importlib.import_module(os.path.basename(ADDON_DIR))
+    addon.register()
+    return importlib.import_module(addon.__name__ + ".utils.jobs")
+
+
+def main():
+    jobs = load_addon()
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            result = {"id": None, "status": "error", "error": f"Trabajo no válido: {str(e)}"}
+        else:
+            result = jobs.run_job(job)
+
+        sys.stdout.write(RESULT_PREFIX + json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
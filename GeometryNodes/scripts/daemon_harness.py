@@ -0,0 +1,136 @@
+"""
+Banco de pruebas local del servicio de construcción.
+
+Uso:
+    python daemon_harness.py manifest.json [--blender RUTA] [--repeat N] [--socket RUTA]
+
+Arranca sciblend_daemon.py en un Blender en segundo plano, espera a que esté listo,
+comprueba que las peticiones defectuosas reciben un error sin detener el servicio,
+envía los trabajos del manifiesto (repetidos N veces), comprueba que todos terminan
+bien y muestra la latencia por trabajo y el rendimiento frente al tiempo de arranque
+de Blender. Termina con código 1 si algún trabajo falla.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+import subprocess
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from sciblend_batch import load_manifest
+from sciblend_client import SciBlendClient
+from sciblend_daemon import READY_PREFIX
+
+
+def start_daemon(blender, extra_args):
+    """
+    Arranca el servicio y espera a que anuncie su dirección.
+
+    El resto de la salida de Blender se sigue leyendo en un hilo para que el servicio
+    no se bloquee al llenarse la tubería.
+
+    Returns:
+        tuple: (proceso, dirección, segundos de arranque)
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [blender, "--background", "--factory-startup",
+         "--python", os.path.join(SCRIPTS_DIR, "sciblend_daemon.py"), "--"] + extra_args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    for line in process.stdout:
+        if line.startswith(READY_PREFIX):
+            threading.Thread(target=_drain, args=(process.stdout,), daemon=True).start()
+            return process, line[len(READY_PREFIX):].strip(), time.perf_counter() - start
+    raise RuntimeError(f"El servicio terminó antes de estar listo (código {process.wait()})")
+
+
+def _drain(stream):
+    for _ in stream:
+        pass
+
+
+# Peticiones defectuosas que el servicio debe rechazar sin dejar de atender
+MALFORMED_REQUESTS = ('{"op": "run"', '[]', '1', '"x"', '{"op": "run", "job": []}')
+
+
+def check_malformed(client):
+    """
+    Envía peticiones defectuosas y comprueba que el servicio responde con un error.
+
+    Returns:
+        list: Descripción de cada comprobación fallida
+    """
+    failures = []
+    for line in MALFORMED_REQUESTS:
+        client.sock.sendall((line + "\n").encode("utf-8"))
+        response = json.loads(client.reader.readline() or "null")
+        if not isinstance(response, dict) or response.get("status") != "error":
+            failures.append({"id": f"petición {line}", "error": f"respuesta inesperada: {response}"})
+    if client.ping().get("status") != "ok":
+        failures.append({"id": "ping", "error": "El servicio no responde tras las peticiones defectuosas"})
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas del servicio de SciBlend")
+    parser.add_argument("manifest", help="Manifiesto de trabajos (mismo formato que sciblend_batch.py)")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"))
+    parser.add_argument("--repeat", type=int, default=1, help="Veces que se envía cada trabajo")
+    parser.add_argument("--port", type=int, default=0, help="Puerto local (0 para uno libre)")
+    parser.add_argument("--socket", default=None, help="Usar un socket Unix en lugar de TCP")
+    args = parser.parse_args(argv)
+
+    jobs = load_manifest(args.manifest)
+    extra = ["--socket", args.socket] if args.socket else ["--port", str(args.port)]
+    process, address, startup = start_daemon(args.blender, extra)
+
+    latencies = []
+    failures = []
+    shutdown_sent = False
+    try:
+        with SciBlendClient(address) as client:
+            assert client.ping()["status"] == "ok"
+            failures += check_malformed(client)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for job in jobs:
+                    step = time.perf_counter()
+                    result = client.run(job)
+                    latencies.append(time.perf_counter() - step)
+                    if result.get("status") != "ok":
+                        failures.append(result)
+            elapsed = time.perf_counter() - start
+            stats = client.stats()
+            client.shutdown()
+            shutdown_sent = True
+    finally:
+        # Sin la orden de parada el servicio seguiría esperando conexiones
+        if not shutdown_sent:
+            process.kill()
+        process.wait(timeout=30)
+
+    print(f"Arranque del servicio: {startup:.2f} s")
+    if latencies:
+        print(f"Trabajos: {len(latencies)} en {elapsed:.2f} s ({len(latencies) / elapsed:.1f} trabajos/s)")
+        print(f"Latencia: media {statistics.mean(latencies) * 1000:.1f} ms, "
+              f"máxima {max(latencies) * 1000:.1f} ms")
+        print(f"Tiempo ocupado en construcciones: {stats['busy_time']:.2f} s "
+              f"({100.0 * stats['busy_time'] / elapsed:.0f}% del total)")
+        print(f"Arranques de Blender evitados: {len(latencies) - 1} "
+              f"(~{startup * (len(latencies) - 1):.1f} s)")
+    for failure in failures:
+        print(f"  [{failure.get('id')}] {failure.get('error')}", file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Ejecuta trabajos de aplicación de plantillas sobre muchos .blend en paralelo.
+
+Uso:
+    python sciblend_batch.py manifest.json [--workers N] [--blender RUTA] [--report informe.json]
+        [--timeout SEGUNDOS] [--log-dir DIRECTORIO]
+
+El manifiesto es una lista JSON (o un archivo con un trabajo JSON por línea) de
+trabajos con las claves:
+    blend     ruta al archivo .blend
+    template  ruta a la plantilla JSON o "preset:<tipo>"
+    bundle    ruta a un paquete de plantillas NDJSON (en lugar de template)
+    objects   selector de objetos ("*", "name:<patrón>", "collection:<nombre>",
+              "type:<TIPO>" o lista de nombres); por defecto "*"
+    output    ruta de guardado (por defecto se sobrescribe el .blend)
+    save      False para no guardar
+    export    {"format": "obj" | "gltf" | "usd" | "stl", "filepath": ruta} (opcional)
+    timeout   segundos antes de dar el trabajo por fallido (por defecto, --timeout)
+
+Las rutas relativas se resuelven respecto al manifiesto. Cada worker es un proceso
+'blender --background' de larga duración que importa el addon una sola vez y
+procesa muchos trabajos. Los trabajos de un mismo .blend los procesa un único
+worker, seguidos, y la salida de errores de cada worker se guarda en
+worker_<n>.log dentro de --log-dir. El informe lista los resultados en el orden
+del manifiesto.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import tempfile
+import threading
+import subprocess
+
+RESULT_PREFIX = "SCIBLEND_RESULT "
+
+# Tiempo máximo de un trabajo, en segundos, si ni el manifiesto ni la línea de órdenes lo fijan
+DEFAULT_TIMEOUT = 600.0
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "batch_worker.py")
+
+
+def load_manifest(filepath):
+    """
+    Lee un manifiesto de trabajos (lista JSON o un trabajo por línea).
+
+    Args:
+        filepath (str): Ruta al manifiesto
+
+    Returns:
+        list: Trabajos con rutas absolutas y un 'id' asignado
+    """
+    with open(filepath, 'r') as f:
+        content = f.read()
+
+    stripped = content.lstrip()
+    if stripped.startswith("["):
+        jobs = json.loads(content)
+    else:
+        jobs = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    base_dir = os.path.dirname(os.path.abspath(filepath))
+    for index, job in enumerate(jobs):
+        job.setdefault("id", index)
+        for key in ("blend", "output", "template", "bundle"):
+            value = job.get(key)
+            if value and not value.startswith("preset:") and not os.path.isabs(value):
+                job[key] = os.path.join(base_dir, value)
+        export = job.get("export")
+        if isinstance(export, dict) and export.get("filepath") and not os.path.isabs(export["filepath"]):
+            export["filepath"] = os.path.join(base_dir, export["filepath"])
+    return jobs
+
+
+def group_by_blend(jobs):
+    """
+    Agrupa los trabajos por .blend para que cada archivo lo procese un solo worker.
+
+    Args:
+        jobs (list): Trabajos en el orden del manifiesto
+
+    Returns:
+        list: Listas de (índice en el manifiesto, trabajo), de la más larga a la más corta
+    """
+    groups = {}
+    for index, job in enumerate(jobs):
+        groups.setdefault(job.get("blend") or "", []).append((index, job))
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+class Worker:
+    """Proceso de Blender en segundo plano que ejecuta trabajos de uno en uno"""
+
+    def __init__(self, blender, log_path=None, timeout=DEFAULT_TIMEOUT):
+        self.blender = blender
+        self.log_path = log_path
+        self.timeout = timeout
+        self.process = None
+        self.lines = None
+        self.log = None
+
+    def start(self):
+        if self.log is None and self.log_path:
+            self.log = open(self.log_path, 'a')
+        self.process = subprocess.Popen(
+            [self.blender, "--background", "--factory-startup", "--python", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self.log if self.log is not None else subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        # Un hilo lee la salida para poder esperar cada resultado con un límite de tiempo
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read, args=(self.process.stdout, self.lines), daemon=True).start()
+
+    @staticmethod
+    def _read(stream, lines):
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    def _error(self, job, message):
+        if self.log_path:
+            message += f" (registro: {self.log_path})"
+        return {"id": job.get("id"), "status": "error", "objects": 0, "timings": {}, "error": message}
+
+    def run(self, job):
+        """
+        Envía un trabajo al proceso y espera su resultado.
+
+        Si el trabajo supera su tiempo máximo, el proceso se termina y se reiniciará en
+        el siguiente trabajo.
+
+        Returns:
+            dict: Resultado del trabajo
+        """
+        if self.process is None or self.process.poll() is not None:
+            self.start()
+
+        try:
+            self.process.stdin.write(json.dumps(job) + "\n")
+            self.process.stdin.flush()
+        except OSError:
+            pass
+
+        timeout = job.get("timeout", self.timeout)
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            try:
+                line = self.lines.get(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.process.kill()
+                self.process.wait()
+                self.process = None
+                return self._error(job, f"El trabajo superó el tiempo máximo de {timeout} s")
+            if line is None:
+                break
+            # Blender también escribe en stdout: solo interesan las líneas con el prefijo
+            if line.startswith(RESULT_PREFIX):
+                return json.loads(line[len(RESULT_PREFIX):])
+
+        # El proceso terminó sin responder: se reiniciará en el siguiente trabajo
+        code = self.process.wait()
+        self.process = None
+        return self._error(job, f"El worker de Blender terminó inesperadamente (código {code})")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+        self.process = None
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+
+def run_batch(jobs, blender="blender", workers=None, timeout=DEFAULT_TIMEOUT, log_dir=None):
+    """
+    Reparte los trabajos entre un grupo de workers de Blender.
+
+    Cada worker toma de la cola todos los trabajos de un mismo .blend.
+
+    Args:
+        jobs (list): Trabajos cargados del manifiesto
+        blender (str): Ejecutable de Blender
+        workers (int): Número de procesos (por defecto, número de núcleos)
+        timeout (float): Tiempo máximo de cada trabajo en segundos (None o 0 sin límite)
+        log_dir (str): Directorio de los registros de errores de los workers (por
+            defecto, uno nuevo en el directorio temporal)
+
+    Returns:
+        dict: Informe con el resumen y el resultado de cada trabajo
+    """
+    groups = group_by_blend(jobs)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(groups) or 1))
+    pending = queue.Queue()
+    for group in groups:
+        pending.put(group)
+
+    if log_dir is None:
+        log_dir = tempfile.mkdtemp(prefix="sciblend_batch_")
+    os.makedirs(log_dir, exist_ok=True)
+
+    results = []
+    lock = threading.Lock()
+
+    def consume(number):
+        worker = Worker(blender, os.path.join(log_dir, f"worker_{number}.log"), timeout)
+        try:
+            while True:
+                try:
+                    group = pending.get_nowait()
+                except queue.Empty:
+                    return
+                for index, job in group:
+                    start = time.perf_counter()
+                    result = worker.run(job)
+                    result["wall_time"] = time.perf_counter() - start
+                    result["blend"] = job.get("blend")
+                    result["template"] = job.get("template") or job.get("bundle")
+                    with lock:
+                        results.append((index, result))
+        finally:
+            worker.stop()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=consume, args=(number,)) for number in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    results = [result for _, result in sorted(results, key=lambda item: item[0])]
+    failed = [result for result in results if result.get("status") != "ok"]
+    return {
+        "summary": {
+            "jobs": len(results),
+            "ok": len(results) - len(failed),
+            "failed": len(failed),
+            "workers": workers,
+            "log_dir": log_dir,
+            "elapsed": elapsed,
+            "jobs_per_second": len(results) / elapsed if elapsed > 0 else 0.0,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica plantillas de SciBlend a muchos .blend en paralelo")
+    parser.add_argument("manifest", help="Manifiesto de trabajos (JSON o un trabajo por línea)")
+    parser.add_argument("--workers", type=int, default=None, help="Número de procesos de Blender")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"), help="Ejecutable de Blender")
+    parser.add_argument("--report", default=None, help="Ruta del informe JSON (por defecto, salida estándar)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="Tiempo máximo de cada trabajo en segundos (0 sin límite)")
+    parser.add_argument("--log-dir", default=None,
+                        help="Directorio de los registros de errores de los workers (por defecto, uno temporal)")
+    args = parser.parse_args(argv)
+
+    report = run_batch(load_manifest(args.manifest), blender=args.blender, workers=args.workers,
+                       timeout=args.timeout, log_dir=args.log_dir)
+
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    summary = report["summary"]
+    print(f"{summary['ok']}/{summary['jobs']} trabajos correctos en {summary['elapsed']:.1f} s "
+          f"con {summary['workers']} workers", file=sys.stderr)
+    for result in report["results"]:
+        if result.get("status") != "ok":
+            print(f"  [{result.get('id')}] {result.get('error')}", file=sys.stderr)
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Cliente mínimo del servicio de construcción de SciBlend (sciblend_daemon.py).
+
+Ejemplo:
+    from sciblend_client import SciBlendClient
+
+    with SciBlendClient("127.0.0.1:8765") as client:
+        result = client.run({"blend": "escena.blend", "template": "array.json"})
+"""
+import json
+import socket
+
+
+def connect(address, timeout=None):
+    """
+    Abre una conexión con el servicio.
+
+    Args:
+        address (str): "host:puerto" o "unix:/ruta/al/socket"
+        timeout (float): Tiempo máximo de espera por respuesta (None para esperar siempre)
+
+    Returns:
+        socket.socket: Conexión abierta
+    """
+    if address.startswith("unix:"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address[len("unix:"):])
+    else:
+        host, _, port = address.rpartition(":")
+        sock = socket.create_connection((host or "127.0.0.1", int(port)))
+    sock.settimeout(timeout)
+    return sock
+
+
+class SciBlendClient:
+    """Envía peticiones JSON al servicio y devuelve sus respuestas"""
+
+    def __init__(self, address="127.0.0.1:8765", timeout=None):
+        self.address = address
+        self.timeout = timeout
+        self.sock = None
+        self.reader = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self):
+        self.sock = connect(self.address, self.timeout)
+        self.reader = self.sock.makefile('r')
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = None
+        self.reader = None
+
+    def request(self, payload):
+        """Envía una petición y espera la respuesta"""
+        if self.sock is None:
+            self.open()
+        self.sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("El servicio cerró la conexión")
+        return json.loads(line)
+
+    def ping(self):
+        return self.request({"op": "ping"})
+
+    def run(self, job):
+        return self.request({"op": "run", "job": job})
+
+    def stats(self):
+        return self.request({"op": "stats"})
+
+    def shutdown(self):
+        return self.request({"op": "shutdown"})
@@ -0,0 +1,150 @@
+"""
+Servicio de construcción persistente que se ejecuta dentro de Blender.
+
+Uso:
+    blender --background --factory-startup --python sciblend_daemon.py -- [--port 8765 | --socket /tmp/sciblend.sock]
+
+Mantiene un proceso de Blender con el addon registrado y las cachés de plantillas y
+árboles calientes entre trabajos. Acepta conexiones en localhost o en un socket Unix
+y lee peticiones JSON, una por línea:
+
+    {"op": "ping"}
+    {"op": "run", "job": {...}}     trabajo con el formato de utils/jobs.run_job
+    {"op": "stats"}
+    {"op": "shutdown"}
+
+Cada petición recibe una respuesta JSON en una línea. Las conexiones se atienden
+de una en una en el hilo principal, ya que bpy no admite acceso concurrente.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import batch_worker
+
+READY_PREFIX = "SCIBLEND_DAEMON_READY "
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Servicio de construcción de SciBlend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", default=None, help="Ruta de un socket Unix (sustituye a host/port)")
+    return parser.parse_args(argv)
+
+
+def create_server(args):
+    """Crea el socket de escucha y devuelve (socket, dirección legible)"""
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(args.socket)
+        address = f"unix:{args.socket}"
+    else:
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((args.host, args.port))
+        address = f"{args.host}:{server.getsockname()[1]}"
+    server.listen(16)
+    return server, address
+
+
+class Daemon:
+    """Atiende peticiones JSON reutilizando un único proceso de Blender"""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.started = time.time()
+        self.jobs_served = 0
+        self.jobs_failed = 0
+        self.busy_time = 0.0
+        self.running = True
+
+    def handle(self, request):
+        if not isinstance(request, dict):
+            return {"status": "error", "error": "Petición no válida: se esperaba un objeto JSON"}
+        op = request.get("op", "run")
+
+        if op == "ping":
+            return {"status": "ok"}
+
+        if op == "run":
+            job = request.get("job", {})
+            if not isinstance(job, dict):
+                return {"status": "error", "error": "Petición no válida: 'job' debe ser un objeto JSON"}
+            result = self.jobs.run_job(job)
+            self.jobs_served += 1
+            self.busy_time += result["timings"].get("total", 0.0)
+            if result["status"] != "ok":
+                self.jobs_failed += 1
+            return result
+
+        if op == "stats":
+            return {
+                "status": "ok",
+                "uptime": time.time() - self.started,
+                "jobs_served": self.jobs_served,
+                "jobs_failed": self.jobs_failed,
+                "busy_time": self.busy_time,
+            }
+
+        if op == "shutdown":
+            self.running = False
+            return {"status": "ok"}
+
+        return {"status": "error", "error": f"Operación desconocida: {op}"}
+
+    def serve_connection(self, connection):
+        with connection, connection.makefile('r') as reader, connection.makefile('w') as writer:
+            for line in reader:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"status": "error", "error": f"Petición no válida: {str(e)}"}
+                else:
+                    try:
+                        response = self.handle(request)
+                    except Exception as e:
+                        # Una petición defectuosa no debe terminar el servicio
+                        print(f"Error al atender la petición: {type(e).__name__}: {str(e)}", file=sys.stderr)
+                        response = {"status": "error", "error": f"{type(e).__name__}: {str(e)}"}
+                writer.write(json.dumps(response) + "\n")
+                writer.flush()
+                if not self.running:
+                    return
+
+    def serve(self, server):
+        while self.running:
+            connection, _ = server.accept()
+            try:
+                self.serve_connection(connection)
+            except (ConnectionError, OSError) as e:
+                print(f"Conexión cerrada con error: {str(e)}", file=sys.stderr)
+
+
+def main():
+    args = parse_args()
+    daemon = Daemon(batch_worker.load_addon())
+    server, address = create_server(args)
+
+    print(READY_PREFIX + address)
+    sys.stdout.flush()
+
+    try:
+        daemon.serve(server)
+    finally:
+        server.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Prueba de resistencia para detectar fugas de árboles de nodos y de memoria.
+
+Uso:
+    blender --background --factory-startup --python-exit-code 1 --python soak_test.py -- \
+        [--iterations 2000] [--objects 50] [--synthetic 20] [--fresh-iterations 20] [--report soak.json]
+
+Aplica una y otra vez todas las plantillas de json_templates/ y un conjunto de
+plantillas sintéticas sobre varios objetos, validando además cada plan como en el
+modo estricto (un plan con problemas hace fallar la prueba). Cada cierto número de
+iteraciones anota el número de árboles de bpy.data.node_groups (cuántos están
+huérfanos y cuántos son árboles de plan sin usuarios), la memoria residente del
+proceso y la memoria de Python registrada por tracemalloc.
+
+La primera pasada completa por las plantillas llena las cachés y sirve de referencia:
+a partir de ahí el número de árboles y la memoria deberían mantenerse estables. Si el
+crecimiento supera los umbrales, muestra las líneas de código que más memoria han
+acumulado desde la referencia y termina con código 1.
+
+Después, una fase de planes nuevos aplica en cada iteración plantillas sintéticas con
+valores distintos, de modo que cada aplicación construye un árbol con un hash que no
+se había visto. Los árboles sin usuarios que deja esa fase deben quedarse por debajo
+del límite de la caché (--max-plan-trees, por defecto MAX_UNUSED_PLAN_TREES).
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import importlib
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import batch_worker
+
+import bpy
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Prueba de resistencia de SciBlend")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iteraciones tras la pasada de referencia")
+    parser.add_argument("--objects", type=int, default=50, help="Objetos sobre los que se aplican las plantillas")
+    parser.add_argument("--synthetic", type=int, default=20, help="Plantillas sintéticas además de json_templates/")
+    parser.add_argument("--fresh-iterations", type=int, default=20,
+                        help="Iteraciones de la fase de planes nuevos")
+    parser.add_argument("--sample-every", type=int, default=100, help="Iteraciones entre mediciones")
+    parser.add_argument("--max-node-groups", type=int, default=0,
+                        help="Árboles nuevos tolerados tras la referencia")
+    parser.add_argument("--max-plan-trees", type=int, default=None,
+                        help="Árboles de plan sin usuarios tolerados tras la fase de planes nuevos "
+                             "(por defecto el límite de la caché)")
+    parser.add_argument("--max-rss-mb", type=float, default=64.0,
+                        help="Crecimiento de la memoria residente tolerado (MB)")
+    parser.add_argument("--max-traced-mb", type=float, default=8.0,
+                        help="Crecimiento de la memoria de Python tolerado (MB)")
+    parser.add_argument("--top", type=int, default=10, help="Puntos de asignación mostrados")
+    parser.add_argument("--report", default=None, help="Guardar las mediciones y el resultado en JSON")
+    return parser.parse_args(argv)
+
+
+def synthetic_template(index, variant=0):
+    """
+    Plantilla sintética: una cadena de nodos Transform de longitud y valores variables.
+
+    Cada índice produce un plan distinto, de modo que se construye un árbol por
+    plantilla y las siguientes aplicaciones deben reutilizarlo. Cada variante cambia
+    además la escala, lo que da otro plan con la misma estructura.
+    """
+    length = 1 + index % 8
+    scale = 1.0 + variant * 0.001
+    nodes = [
+        {"id": "input", "type": "NodeGroupInput", "location": [-300, 0]},
+        {"id": "output", "type": "NodeGroupOutput", "location": [300 * (length + 1), 0]},
+    ]
+    links = []
+    previous = "input"
+    for step in range(length):
+        node_id = f"transform_{step}"
+        nodes.append({
+            "id": node_id,
+            "type": "GeometryNodeTransform",
+            "location": [300 * step, 0],
+            "inputs": {"Translation": [index * 0.01, step * 0.1, 0.0], "Scale": [scale, scale, scale]},
+        })
+        links.append({"from_node": previous, "from_socket": "Geometry", "to_node": node_id, "to_socket": "Geometry"})
+        previous = node_id
+    links.append({"from_node": previous, "from_socket": "Geometry", "to_node": "output", "to_socket": "Geometry"})
+    return {
+        "name": f"Sintética {index}",
+        "nodes": nodes,
+        "links": links,
+        "inputs": [{"name": "Geometry", "type": "NodeSocketGeometry"}],
+        "outputs": [{"name": "Geometry", "type": "NodeSocketGeometry"}],
+    }
+
+
+def create_objects(count):
+    """Crea objetos de malla sencillos (un triángulo) sin pasar por bpy.ops"""
+    objects = []
+    for index in range(count):
+        mesh = bpy.data.meshes.new(f"soak_mesh_{index}")
+        mesh.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [], [(0, 1, 2)])
+        obj = bpy.data.objects.new(f"soak_{index}", mesh)
+        obj.location = (index % 10, index // 10, 0)
+        bpy.context.scene.collection.objects.link(obj)
+        objects.append(obj)
+    return objects
+
+
+def resident_memory_mb():
+    """Memoria residente actual del proceso en MB (None si no puede medirse)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Solo el pico en sistemas sin /proc: kB en Linux, bytes en macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+
+def orphan_node_groups(plan_hash_prop):
+    """Árboles sin usuarios que el addon no conserva como caché"""
+    return [node_group.name for node_group in bpy.data.node_groups
+            if node_group.users == 0 and node_group.get(plan_hash_prop) is None]
+
+
+def unused_plan_trees(plan_hash_prop):
+    """Árboles de plan sin usuarios que el addon conserva como caché"""
+    return [node_group.name for node_group in bpy.data.node_groups
+            if node_group.users == 0 and node_group.get(plan_hash_prop) is not None]
+
+
+def take_sample(iteration, started, plan_hash_prop):
+    traced, _ = tracemalloc.get_traced_memory()
+    return {
+        "iteration": iteration,
+        "elapsed": time.perf_counter() - started,
+        "node_groups": len(bpy.data.node_groups),
+        "orphans": len(orphan_node_groups(plan_hash_prop)),
+        "unused_plan_trees": len(unused_plan_trees(plan_hash_prop)),
+        "rss_mb": resident_memory_mb(),
+        "traced_mb": traced / (1024 * 1024),
+    }
+
+
+def filtered_snapshot():
+    """Instantánea de tracemalloc sin las asignaciones del propio tracemalloc e importlib"""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+
+
+def leak_sites(baseline, final, top):
+    """
+    Líneas de código con más memoria acumulada entre dos instantáneas.
+
+    Returns:
+        list: Dicts con 'site' (archivo:línea), 'size_kb' y 'count' (crecimiento)
+    """
+    sites = []
+    for stat in final.compare_to(baseline, 'lineno'):
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        sites.append({
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size_kb": stat.size_diff / 1024,
+            "count": stat.count_diff,
+        })
+        if len(sites) >= top:
+            break
+    return sites
+
+
+def main():
+    args = parse_args()
+    jobs = batch_worker.load_addon()
+    package = jobs.__name__.rsplit(".", 2)[0]
+    node_builder = importlib.import_module(package + ".utils.node_builder")
+    template_plan = importlib.import_module(package + ".utils.template_plan")
+    diagnostics_module = importlib.import_module(package + ".utils.diagnostics")
+
+    template_dir = os.path.join(batch_worker.ADDON_DIR, "json_templates")
+    plans = [template_plan.load_template(path) for path in sorted(glob.glob(os.path.join(template_dir, "*.json")))]
+    plans += [template_plan.compile_template(synthetic_template(index)) for index in range(args.synthetic)]
+    objects = create_objects(args.objects)
+    print(f"Prueba de resistencia: {len(plans)} plantillas, {len(objects)} objetos, "
+          f"{args.iterations} iteraciones")
+
+    # Plantillas que no pasan la validación estricta: nombre -> resumen de problemas
+    invalid = {}
+
+    def run_iteration(iteration):
+        for index, obj in enumerate(objects):
+            plan = plans[(iteration + index) % len(plans)]
+            diagnostics = diagnostics_module.BuildDiagnostics()
+            if not node_builder.validate_plan(plan, diagnostics) and plan["name"] not in invalid:
+                invalid[plan["name"]] = diagnostics.summary()
+                diagnostics.log()
+            node_builder.apply_plan(obj, plan)
+            # Quitar de vez en cuando el modificador para recorrer también la liberación
+            if (iteration + index) % 7 == 0:
+                obj.modifiers.remove(obj.modifiers[0])
+
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    # Pasada de referencia: cada objeto recibe cada plantilla una vez
+    for iteration in range(len(plans)):
+        run_iteration(iteration)
+    bpy.context.view_layer.update()
+    baseline_snapshot = filtered_snapshot()
+    samples = [take_sample(0, started, node_builder.PLAN_HASH_PROP)]
+
+    for iteration in range(1, args.iterations + 1):
+        run_iteration(iteration)
+        if iteration % args.sample_every == 0 or iteration == args.iterations:
+            bpy.context.view_layer.update()
+            sample = take_sample(iteration, started, node_builder.PLAN_HASH_PROP)
+            samples.append(sample)
+            print(f"[{iteration}] árboles {sample['node_groups']} (huérfanos {sample['orphans']}, "
+                  f"de plan sin usuarios {sample['unused_plan_trees']}), "
+                  f"RSS {sample['rss_mb'] or 0:.1f} MB, Python {sample['traced_mb']:.2f} MB")
+
+    final_snapshot = filtered_snapshot()
+    tracemalloc.stop()
+
+    # Fase de planes nuevos: cada aplicación construye un árbol y libera el anterior
+    fresh_hashes = set()
+    for iteration in range(1, args.fresh_iterations + 1):
+        for index, obj in enumerate(objects):
+            plan = template_plan.compile_template(synthetic_template(index, iteration))
+            fresh_hashes.add(plan["hash"])
+            node_builder.apply_plan(obj, plan)
+    bpy.context.view_layer.update()
+    fresh_unused = [node_group.name for node_group in bpy.data.node_groups
+                    if node_group.users == 0 and node_group.get(node_builder.PLAN_HASH_PROP) in fresh_hashes]
+    max_plan_trees = args.max_plan_trees
+    if max_plan_trees is None:
+        max_plan_trees = node_builder.MAX_UNUSED_PLAN_TREES
+    fresh = {"plans": len(fresh_hashes), "unused_plan_trees": len(fresh_unused)}
+    if args.fresh_iterations:
+        print(f"Planes nuevos: {fresh['plans']} aplicados, {fresh['unused_plan_trees']} árboles sin usuarios")
+
+    baseline, final = samples[0], samples[-1]
+    growth = {
+        "node_groups": final["node_groups"] - baseline["node_groups"],
+        "traced_mb": final["traced_mb"] - baseline["traced_mb"],
+        "rss_mb": (final["rss_mb"] - baseline["rss_mb"]) if final["rss_mb"] is not None else None,
+    }
+    failures = []
+    if growth["node_groups"] > args.max_node_groups:
+        failures.append(f"{growth['node_groups']} árboles nuevos tras la referencia "
+                        f"(huérfanos: {', '.join(orphan_node_groups(node_builder.PLAN_HASH_PROP)[:10]) or 'ninguno'})")
+    if growth["rss_mb"] is not None and growth["rss_mb"] > args.max_rss_mb:
+        failures.append(f"La memoria residente creció {growth['rss_mb']:.1f} MB")
+    if growth["traced_mb"] > args.max_traced_mb:
+        failures.append(f"La memoria de Python creció {growth['traced_mb']:.2f} MB")
+    if fresh["unused_plan_trees"] > max_plan_trees:
+        failures.append(f"{fresh['unused_plan_trees']} árboles de plan sin usuarios tras la fase de planes "
+                        f"nuevos (límite {max_plan_trees})")
+
+    for name, summary in invalid.items():
+        failures.append(f"La plantilla {name} no pasa la validación estricta: {summary}")
+
+    sites = leak_sites(baseline_snapshot, final_snapshot, args.top)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({"samples": samples, "growth": growth, "fresh": fresh, "invalid": invalid,
+                       "failures": failures, "leak_sites": sites}, f, indent=2)
+
+    if not failures:
+        print("Sin fugas: el número de árboles y la memoria se mantienen estables")
+        return 0
+
+    print("PRUEBA FALLIDA:")
+    for failure in failures:
+        print(f"  {failure}")
+    print("Puntos de asignación con más crecimiento:")
+    for site in sites:
+        print(f"  {site['size_kb']:10.1f} kB  {site['count']:+7d} bloques  {site['site']}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Comprueba que la vigilancia de plantillas no modifica árboles compartidos.
+
+Uso:
+    blender --background --factory-startup --python-exit-code 1 --python watch_check.py
+
+Aplica la misma plantilla a dos objetos (que comparten así el árbol de la caché),
+vigila la plantilla sobre el primero, cambia un valor en el archivo y reaplica. El
+parche debe llegar solo al objeto vigilado: el segundo objeto y el árbol en caché del
+plan original deben quedar como estaban. Termina con código 1 si no es así.
+"""
+import os
+import sys
+import json
+import tempfile
+import importlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import batch_worker
+
+import bpy
+
+
+def template(translation):
+    return {
+        "name": "Vigilada",
+        "nodes": [
+            {"id": "transform", "type": "GeometryNodeTransform", "location": [0, 0],
+             "inputs": {"Translation": translation}},
+        ],
+        "links": [
+            {"from_node": "input", "from_socket": "Geometry", "to_node": "transform", "to_socket": "Geometry"},
+            {"from_node": "transform", "from_socket": "Geometry", "to_node": "output", "to_socket": "Geometry"},
+        ],
+    }
+
+
+def create_object(name):
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata([(0, 0, 0), (1, 0, 0), (0, 1, 0)], [], [(0, 1, 2)])
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+def translation_of(node_tree):
+    node = next(node for node in node_tree.nodes if node.bl_idname == "GeometryNodeTransform")
+    return tuple(node.inputs["Translation"].default_value)
+
+
+def main():
+    jobs = batch_worker.load_addon()
+    package = jobs.__name__.rsplit(".", 2)[0]
+    node_builder = importlib.import_module(package + ".utils.node_builder")
+    template_plan = importlib.import_module(package + ".utils.template_plan")
+    template_watch = importlib.import_module(package + ".utils.template_watch")
+
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    failures = []
+    try:
+        with open(path, 'w') as f:
+            json.dump(template([1.0, 0.0, 0.0]), f)
+        original = template_plan.compile_template(template([1.0, 0.0, 0.0]))
+
+        watched, other = create_object("vigilado"), create_object("otro")
+        node_builder.apply_plan(other, original)
+        template_watch.start_watch(watched, path)
+        shared = other.modifiers[0].node_group
+        if watched.modifiers[0].node_group is not shared:
+            failures.append("Los dos objetos deberían compartir el árbol antes del parche")
+
+        changed = template_plan.compile_template(template([0.0, 5.0, 0.0]))
+        template_watch.reapply(watched, changed)
+        template_watch.stop_watch()
+
+        watched_tree = watched.modifiers[0].node_group
+        if watched_tree is shared:
+            failures.append("El parche se aplicó sobre el árbol compartido")
+        if translation_of(watched_tree) != (0.0, 5.0, 0.0):
+            failures.append(f"El objeto vigilado no recibió el parche: {translation_of(watched_tree)}")
+        if other.modifiers[0].node_group is not shared or translation_of(shared) != (1.0, 0.0, 0.0):
+            failures.append(f"El otro objeto cambió: {translation_of(other.modifiers[0].node_group)}")
+        if node_builder.find_cached_node_group(original["hash"]) is not shared:
+            failures.append("La caché ya no resuelve el plan original a su árbol")
+        if node_builder.find_cached_node_group(changed["hash"]) is watched_tree:
+            failures.append("La copia parcheada quedó registrada en la caché")
+    finally:
+        os.remove(path)
+
+    if failures:
+        for failure in failures:
+            print(f"FALLO: {failure}")
+        return 1
+    print("El parche de la vigilancia solo afecta al objeto vigilado")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
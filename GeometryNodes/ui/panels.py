@@ -1,5 +1,37 @@
 import bpy
+import sys
 from bpy.types import Panel
+from ..utils.hot_reload import is_developer_mode
+
+def get_cached_stats(obj):
+    """Estadísticas ya calculadas del objeto, sin importar NumPy si nunca se pidieron"""
+    geometry_stats = sys.modules.get(f"{__package__.rpartition('.')[0]}.utils.geometry_stats")
+    return geometry_stats.get_cached(obj) if geometry_stats is not None else None
+
+def draw_stats(layout, stats):
+    """Muestra las estadísticas de geometría de un objeto"""
+    col = layout.column(align=True)
+    col.label(text=f"Vértices: {stats['vertices']:,}  Caras: {stats['faces']:,}")
+    if stats["points"] or stats["curves"]:
+        col.label(text=f"Puntos: {stats['points']:,}  Curvas: {stats['curves']:,}")
+    col.label(text=f"Instancias: {stats['instances']:,}")
+    if stats["bounds"] is not None:
+        low, high = stats["bounds"]
+        col.label(text="Mín: " + ", ".join(f"{value:.3g}" for value in low))
+        col.label(text="Máx: " + ", ".join(f"{value:.3g}" for value in high))
+    for name, summary in stats["attributes"].items():
+        if summary is None:
+            col.label(text=f"{name}: no encontrado", icon='ERROR')
+            continue
+        col.label(text=f"{name}:")
+        for key, label in (("min", "mín"), ("max", "máx"), ("mean", "media")):
+            col.label(text=f"  {label} " + ", ".join(f"{value:.4g}" for value in summary[key]))
+    col.label(text=f"Calculado en {stats['time'] * 1000.0:.1f} ms")
+
+def get_watched_filepath():
+    """Ruta de la plantilla vigilada, sin importar el módulo de vigilancia si nunca se usó"""
+    template_watch = sys.modules.get(f"{__package__.rpartition('.')[0]}.utils.template_watch")
+    return template_watch.get_watched_filepath() if template_watch is not None else ""
 
 class SCIBLEND_PT_geometry_nodes(Panel):
     bl_label = "SciBlend Geometry Nodes"
@@ -13,6 +45,24 @@ class SCIBLEND_PT_geometry_nodes(Panel):
         scene = context.scene
         props = scene.sciblend_geonodes
         
+        # Modo de aplicación común a presets y plantillas JSON
+        row = layout.row()
+        row.prop(props, "apply_mode", text="Modo")
+        row = layout.row()
+        row.prop(props, "target_set", text="Destino")
+        if props.target_set == 'BOX':
+            layout.prop(props, "target_box_size", text="")
+        elif props.target_set == 'RADIUS':
+            layout.prop(props, "target_radius")
+        row = layout.row()
+        row.prop(props, "strict_build")
+        row.prop(props, "append_to_tree")
+        row = layout.row(align=True)
+        row.prop(props, "skip_undo_large_batches")
+        sub = row.row()
+        sub.enabled = props.skip_undo_large_batches
+        sub.prop(props, "undo_skip_threshold")
+        
         # Sección para aplicar transformaciones predefinidas
         box = layout.box()
         box.label(text="Transformaciones Predefinidas")
@@ -44,6 +94,79 @@ class SCIBLEND_PT_geometry_nodes(Panel):
         # Botón para aplicar el JSON
         row = box.row()
         row.operator("sciblend.apply_geometry_nodes", text="Aplicar Geometry Nodes")
+        
+        # Vigilancia del archivo JSON con reaplicación incremental
+        row = box.row(align=True)
+        watched_filepath = get_watched_filepath()
+        if watched_filepath:
+            row.operator("sciblend.watch_template", text="Detener Vigilancia", icon='PAUSE')
+            box.label(text=f"Vigilando: {bpy.path.basename(watched_filepath)}")
+        else:
+            row.operator("sciblend.watch_template", text="Vigilar Plantilla", icon='PLAY')
+            row.prop(props, "watch_interval", text="")
+        
+        # Paquetes con muchas plantillas y sus asignaciones a objetos
+        row = box.row()
+        row.operator("sciblend.apply_bundle", text="Aplicar Paquete", icon='PACKAGE')
+        
+        # Sección de barrido de parámetros sobre la plantilla JSON
+        box = layout.box()
+        box.label(text="Barrido de Parámetros")
+        box.prop(props, "sweep_grid", text="Rejilla")
+        box.prop(props, "sweep_output", text="")
+        box.prop(props, "sweep_count_instances")
+        
+        row = box.row()
+        row.operator("sciblend.parameter_sweep", text="Ejecutar Barrido")
+        
+        # Perfilado del coste por fotograma de los modificadores
+        box = layout.box()
+        box.label(text="Perfilado")
+        box.prop(props, "profile_output", text="")
+        box.prop(props, "profile_frame_step")
+        
+        row = box.row()
+        row.operator("sciblend.profile_modifiers", text="Perfilar Modificadores")
+        
+        # Estadísticas de la geometría evaluada del objeto activo
+        box = layout.box()
+        box.label(text="Estadísticas de Geometría")
+        box.prop(props, "stats_attributes", text="Atributos")
+        
+        row = box.row()
+        row.operator("sciblend.probe_geometry_stats", text="Calcular Estadísticas", icon='INFO')
+        
+        stats = get_cached_stats(context.active_object)
+        if stats is not None:
+            draw_stats(box, stats)
+        
+        # Glifos instanciados sobre nubes de puntos leídas de matrices NumPy
+        box = layout.box()
+        box.label(text="Glifos")
+        box.prop(props, "glyph_shape")
+        if props.glyph_shape == 'OBJECT':
+            box.prop(props, "glyph_object", text="")
+        
+        row = box.row()
+        row.operator("sciblend.create_glyphs", text="Crear Glifos", icon='POINTCLOUD_DATA')
+        
+        # Sección de mantenimiento de la escena
+        box = layout.box()
+        box.label(text="Mantenimiento")
+        
+        row = box.row()
+        row.operator("sciblend.deduplicate_node_groups", text="Deduplicar Árboles")
+        
+        row = box.row()
+        row.operator("sciblend.fuse_modifier_stack", text="Fusionar Modificadores")
+        
+        row = box.row()
+        row.operator("sciblend.export_node_trees", text="Exportar Árboles", icon='EXPORT')
+        
+        # Recarga selectiva de módulos durante el desarrollo del addon
+        if is_developer_mode():
+            row = box.row()
+            row.operator("sciblend.reload_changed_modules", text="Recargar Módulos", icon='FILE_REFRESH')
 
 def register():
     bpy.utils.register_class(SCIBLEND_PT_geometry_nodes)
@@ -0,0 +1,106 @@
+import bpy
+import logging
+
+logger = logging.getLogger("GeometryNodes")
+
+# Variante de la API de interfaces detectada en register():
+# 'INTERFACE' (Blender 4.x, node_tree.interface) o 'LEGACY' (Blender 3.x, node_tree.inputs/outputs)
+variant = None
+
+# Tipos de nodo disponibles en esta versión de Blender
+_node_types = frozenset()
+
+# Object.evaluated_geometry() (Blender 4.3+): lectura directa del conjunto de geometría
+# evaluado, incluidas las instancias
+has_geometry_set = False
+
+# API de Blender 4.x
+
+def _interface_sockets(node_tree, in_out):
+    return [item for item in node_tree.interface.items_tree
+            if item.item_type == 'SOCKET' and item.in_out == in_out]
+
+def _interface_new_socket(node_tree, name, in_out, socket_type):
+    return node_tree.interface.new_socket(name=name, in_out=in_out, socket_type=socket_type)
+
+def _interface_clear_sockets(node_tree):
+    node_tree.interface.clear()
+
+def _interface_socket_type(item):
+    return item.socket_type
+
+# API de Blender 3.x
+
+def _legacy_sockets(node_tree, in_out):
+    return list(node_tree.inputs if in_out == 'INPUT' else node_tree.outputs)
+
+def _legacy_new_socket(node_tree, name, in_out, socket_type):
+    sockets = node_tree.inputs if in_out == 'INPUT' else node_tree.outputs
+    return sockets.new(socket_type, name)
+
+def _legacy_clear_sockets(node_tree):
+    node_tree.inputs.clear()
+    node_tree.outputs.clear()
+
+def _legacy_socket_type(item):
+    return item.bl_socket_idname
+
+# Adaptadores enlazados por detect(); el código de construcción los llama sin comprobar
+# la versión de Blender
+interface_sockets = None
+new_socket = None
+clear_sockets = None
+socket_type = None
+
+def detect():
+    """
+    Detecta una sola vez las capacidades de la API de Blender y enlaza los adaptadores.
+
+    Se llama desde register(), antes de registrar operadores y paneles.
+
+    Returns:
+        str: Variante detectada ('INTERFACE' o 'LEGACY')
+    """
+    global variant, _node_types, has_geometry_set, interface_sockets, new_socket, clear_sockets, socket_type
+
+    if bpy.types.NodeTree.bl_rna.properties.get("interface") is not None:
+        variant = 'INTERFACE'
+        interface_sockets = _interface_sockets
+        new_socket = _interface_new_socket
+        clear_sockets = _interface_clear_sockets
+        socket_type = _interface_socket_type
+    else:
+        variant = 'LEGACY'
+        interface_sockets = _legacy_sockets
+        new_socket = _legacy_new_socket
+        clear_sockets = _legacy_clear_sockets
+        socket_type = _legacy_socket_type
+
+    has_geometry_set = bpy.types.Object.bl_rna.functions.get("evaluated_geometry") is not None
+
+    _node_types = frozenset(
+        name for name in dir(bpy.types)
+        if name.startswith(("GeometryNode", "FunctionNode", "ShaderNode", "Node"))
+    )
+
+    logger.debug(f"API de Blender {bpy.app.version_string}: {variant}, {len(_node_types)} tipos de nodo")
+    return variant
+
+def node_type_exists(node_type):
+    """Indica si un tipo de nodo existe en esta versión de Blender"""
+    return node_type in _node_types
+
+def create_io_nodes(node_tree):
+    """
+    Crea los nodos de entrada y salida de un árbol recién creado.
+
+    Args:
+        node_tree: Árbol vacío
+
+    Returns:
+        tuple: (input_node, output_node)
+    """
+    input_node = node_tree.nodes.new('NodeGroupInput')
+    output_node = node_tree.nodes.new('NodeGroupOutput')
+    output_node.is_active_output = True
+    return input_node, output_node
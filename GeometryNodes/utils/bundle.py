@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import logging
+
+from . import node_builder, template_plan, collection_instance, jobs, undo_batch, metrics
+from .diagnostics import BuildDiagnostics
+
+logger = logging.getLogger("GeometryNodes")
+
+# Extensiones de los paquetes con un registro JSON por línea
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+# Tamaño de los bloques leídos al recorrer un paquete en formato de lista JSON
+_CHUNK_SIZE = 1 << 16
+
+def _iter_json_array(f):
+    """
+    Recorre los elementos de una lista JSON sin cargar el archivo completo.
+
+    Args:
+        f: Archivo de texto abierto, posicionado al principio
+
+    Yields:
+        Cada elemento de la lista ya decodificado
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(_CHUNK_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("El paquete debe ser una lista JSON o un archivo NDJSON")
+    buffer = buffer[1:]
+    eof = False
+
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            # El registro está cortado al final del bloque: leer más
+            if eof:
+                raise
+            chunk = f.read(_CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        yield record
+        buffer = buffer[end:]
+
+def iter_records(filepath):
+    """
+    Recorre los registros de un paquete de plantillas de uno en uno.
+
+    Un paquete es una lista JSON o un archivo NDJSON (un registro por línea). Cada
+    registro es una plantilla (con 'id' y 'nodes', en el formato habitual) o una
+    asignación {"assign": id, "objects": selector, "mode": "object" | "collection"},
+    donde id es el de una plantilla del paquete, "preset:<tipo>" o una ruta a un JSON.
+    Una plantilla puede incluir directamente su propia clave 'objects'.
+
+    Args:
+        filepath (str): Ruta al paquete
+
+    Yields:
+        dict: Cada registro del paquete
+    """
+    metrics.inc("template_bytes_parsed_total", os.path.getsize(filepath))
+    with open(filepath, 'r') as f:
+        if filepath.lower().endswith(NDJSON_EXTENSIONS):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+def apply_bundle(context, filepath, diagnostics=None, strict=False):
+    """
+    Construye y aplica todas las plantillas de un paquete en una sola pasada.
+
+    Las plantillas se compilan a medida que se leen; las asignaciones se acumulan y
+    se aplican al final, de modo que una asignación puede aparecer antes que su
+    plantilla. Las plantillas con el mismo contenido comparten árbol gracias a la
+    caché por hash, y la escena se actualiza una única vez al terminar.
+
+    Args:
+        context: Contexto de Blender
+        filepath (str): Ruta al paquete
+        diagnostics (BuildDiagnostics): Registro de problemas (opcional)
+        strict (bool): Validar todos los planes antes de modificar la escena
+
+    Returns:
+        dict: Resumen con 'templates', 'assignments', 'objects' y 'elapsed'
+    """
+    if diagnostics is None:
+        diagnostics = BuildDiagnostics()
+    start = time.perf_counter()
+    base_dir = os.path.dirname(os.path.abspath(filepath))
+    plans = {}
+    assignments = []
+
+    for index, record in enumerate(iter_records(filepath)):
+        if "assign" in record:
+            assignments.append(record)
+            continue
+
+        template_id = str(record.get("id", record.get("name", f"template_{index}")))
+        plans[template_id] = template_plan.compile_template(record, base_dir=base_dir)
+        if "objects" in record:
+            assignments.append({"assign": template_id, "objects": record["objects"],
+                                "mode": record.get("mode", "object")})
+
+    # Resolver todas las asignaciones antes de tocar la escena
+    resolved = []
+    for assignment in assignments:
+        ref = str(assignment["assign"])
+        plan = plans.get(ref)
+        if plan is None:
+            # Un preset integrado o una plantilla externa, relativa al paquete
+            plan = jobs.resolve_template(ref if ref.startswith("preset:") else os.path.join(base_dir, ref))
+        resolved.append((plan, jobs.select_objects(assignment.get("objects", "*")),
+                         assignment.get("mode", "object")))
+
+    if strict:
+        for plan in {plan["hash"]: plan for plan, _, _ in resolved}.values():
+            if not node_builder.validate_plan(plan, diagnostics):
+                raise ValueError(f"Modo estricto: {diagnostics.summary()}")
+
+    # Un solo paso de deshacer y una sola actualización del depsgraph para todo el paquete
+    objects_applied = 0
+    with undo_batch.batch(context, f"Aplicar paquete {os.path.basename(filepath)}"):
+        for plan, objects, mode in resolved:
+            if not objects:
+                continue
+            if mode == "collection":
+                collection_instance.apply_plan_to_collection(context, objects, plan, diagnostics)
+            else:
+                for obj in objects:
+                    node_builder.apply_plan(obj, plan, diagnostics)
+            objects_applied += len(objects)
+            undo_batch.record(len(objects))
+
+    elapsed = time.perf_counter() - start
+    metrics.observe("bundle_seconds", elapsed)
+    logger.info(f"Paquete {os.path.basename(filepath)}: {len(plans)} plantillas, "
+                f"{len(resolved)} asignaciones, {objects_applied} objetos en {elapsed:.2f} s")
+    return {"templates": len(plans), "assignments": len(resolved),
+            "objects": objects_applied, "elapsed": elapsed}
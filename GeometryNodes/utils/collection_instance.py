@@ -0,0 +1,78 @@
+import bpy
+import logging
+
+from . import node_builder, template_plan
+
+logger = logging.getLogger("GeometryNodes")
+
+def gather_into_collection(context, objects, name):
+    """
+    Mueve los objetos a una nueva colección excluida de la capa de vista.
+    
+    La colección se enlaza a la escena para que los objetos sigan visibles en el
+    outliner, pero se excluye de la capa de vista para que solo se evalúen a
+    través de las instancias del objeto anfitrión.
+    
+    Args:
+        context: Contexto de Blender
+        objects: Objetos a reunir
+        name (str): Nombre de la colección
+        
+    Returns:
+        bpy.types.Collection: La colección creada
+    """
+    scene = context.scene
+    collection = bpy.data.collections.new(name)
+    scene.collection.children.link(collection)
+    
+    for obj in objects:
+        for user_collection in list(obj.users_collection):
+            user_collection.objects.unlink(obj)
+        collection.objects.link(obj)
+    
+    layer_collection = context.view_layer.layer_collection.children.get(collection.name)
+    if layer_collection is not None:
+        layer_collection.exclude = True
+    
+    logger.info(f"{len(objects)} objetos reunidos en la colección {collection.name}")
+    return collection
+
+def create_host_object(context, name):
+    """
+    Crea un objeto de malla vacío que alojará el modificador de la colección.
+    
+    Args:
+        context: Contexto de Blender
+        name (str): Nombre del objeto
+        
+    Returns:
+        bpy.types.Object: El objeto anfitrión
+    """
+    mesh = bpy.data.meshes.new(name)
+    host = bpy.data.objects.new(name, mesh)
+    context.scene.collection.objects.link(host)
+    return host
+
+def apply_plan_to_collection(context, objects, plan, diagnostics=None):
+    """
+    Aplica un plan a muchos objetos con un único modificador.
+    
+    Los objetos se reúnen en una colección y un objeto anfitrión evalúa el plan
+    sobre sus instancias, de modo que el depsgraph evalúa un solo árbol.
+    
+    Args:
+        context: Contexto de Blender
+        objects: Objetos de destino
+        plan (dict): Plan compilado de la plantilla
+        diagnostics (BuildDiagnostics): Registro de problemas (opcional)
+        
+    Returns:
+        bpy.types.Object: El objeto anfitrión
+    """
+    collection = gather_into_collection(context, objects, f"SciBlend_{plan['name']}")
+    host = create_host_object(context, f"SciBlend_{plan['name']}_host")
+    
+    gn_mod = node_builder.apply_plan(host, template_plan.with_collection_source(plan), diagnostics)
+    node_builder.set_modifier_input(gn_mod, template_plan.COLLECTION_SOCKET, collection)
+    
+    return host
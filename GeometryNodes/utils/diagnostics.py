@@ -0,0 +1,75 @@
+import logging
+
+logger = logging.getLogger("GeometryNodes")
+
+# Descripción legible de cada categoría de problema
+CATEGORIES = {
+    "unknown_node_type": "tipos de nodo desconocidos",
+    "unknown_node": "enlaces con nodos desconocidos",
+    "missing_socket": "sockets no encontrados",
+    "invalid_property": "propiedades no válidas",
+    "invalid_value": "valores no válidos",
+}
+
+class BuildDiagnostics:
+    """
+    Problemas encontrados al compilar o construir un árbol de nodos.
+
+    En lugar de lanzar y capturar una excepción por cada nodo o enlace defectuoso,
+    los constructores registran aquí cada problema. Se guardan los contadores por
+    categoría y solo los primeros ejemplos, para informar una sola vez al final.
+    """
+
+    def __init__(self, max_examples=10):
+        self.max_examples = max_examples
+        self.counts = {}
+        self.examples = []
+
+    def record(self, category, message):
+        """Registra un problema de una categoría"""
+        self.counts[category] = self.counts.get(category, 0) + 1
+        if len(self.examples) < self.max_examples:
+            self.examples.append((category, message))
+
+    def extend(self, issues):
+        """Registra una secuencia de problemas (category, message)"""
+        for category, message in issues:
+            self.record(category, message)
+
+    def merge(self, other):
+        """Añade los problemas de otro diagnóstico"""
+        for category, count in other.counts.items():
+            self.counts[category] = self.counts.get(category, 0) + count
+        room = self.max_examples - len(self.examples)
+        if room > 0:
+            self.examples.extend(other.examples[:room])
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def summary(self):
+        """
+        Resumen de una línea, apto para Operator.report.
+
+        Returns:
+            str: Contadores por categoría, o cadena vacía si no hay problemas
+        """
+        if not self.counts:
+            return ""
+        parts = [f"{count} {CATEGORIES.get(category, category)}"
+                 for category, count in sorted(self.counts.items())]
+        return f"{self.total} problemas: " + ", ".join(parts)
+
+    def log(self):
+        """Escribe el resumen y los ejemplos en el log"""
+        if not self.counts:
+            return
+        logger.warning(self.summary())
+        for category, message in self.examples:
+            logger.warning(f"  [{category}] {message}")
+        if self.total > len(self.examples):
+            logger.warning(f"  ... y {self.total - len(self.examples)} más")
@@ -0,0 +1,196 @@
+import bpy
+import time
+import logging
+import numpy as np
+
+from . import blender_api
+from .sweep import count_instances
+
+logger = logging.getLogger("GeometryNodes")
+
+# Tipo de dato de un atributo -> (propiedad para foreach_get, componentes, dtype de NumPy)
+ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ("value", 1, np.float32),
+    'INT': ("value", 1, np.int32),
+    'INT8': ("value", 1, np.int8),
+    'BOOLEAN': ("value", 1, np.bool_),
+    'FLOAT_VECTOR': ("vector", 3, np.float32),
+    'FLOAT2': ("vector", 2, np.float32),
+    'INT32_2D': ("value", 2, np.int32),
+    'FLOAT_COLOR': ("color", 4, np.float32),
+    'BYTE_COLOR': ("color", 4, np.float32),
+    'QUATERNION': ("value", 4, np.float32),
+}
+
+# Estadísticas calculadas por objeto: nombre -> dict (se descartan cuando el depsgraph
+# informa de un cambio en el objeto)
+_stats_cache = {}
+
+def read_attribute(attribute):
+    """
+    Lee los valores de un atributo en una matriz de NumPy con foreach_get.
+
+    Args:
+        attribute: Atributo de una malla, nube de puntos o curvas
+
+    Returns:
+        numpy.ndarray: Matriz de forma (elementos, componentes), o None si el tipo
+                       de dato no se admite
+    """
+    layout = ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+    if layout is None:
+        return None
+    prop, components, dtype = layout
+    values = np.empty(len(attribute.data) * components, dtype=dtype)
+    attribute.data.foreach_get(prop, values)
+    return values.reshape(-1, components)
+
+def summarize_array(values):
+    """Mínimo, máximo y media por componente de una matriz (elementos, componentes)"""
+    if values is None or not len(values):
+        return None
+    numeric = values.astype(np.float64, copy=False)
+    return {
+        "min": numeric.min(axis=0).tolist(),
+        "max": numeric.max(axis=0).tolist(),
+        "mean": numeric.mean(axis=0).tolist(),
+    }
+
+def _components(obj_eval):
+    """
+    Geometrías evaluadas de un objeto y su número de instancias.
+
+    Returns:
+        tuple: (lista de datos con atributos, instancias o None si hay que contarlas
+               recorriendo el depsgraph)
+    """
+    if blender_api.has_geometry_set:
+        geometry = obj_eval.evaluated_geometry()
+        components = [data for data in (geometry.mesh, geometry.pointcloud, geometry.curves) if data is not None]
+        instances = geometry.instances_pointcloud()
+        return components, len(instances.points) if instances is not None else 0
+
+    data = obj_eval.data
+    if isinstance(data, (bpy.types.Mesh, bpy.types.PointCloud, bpy.types.Curves)):
+        return [data], None
+    return [], None
+
+def compute_stats(depsgraph, obj, attribute_names=()):
+    """
+    Calcula las estadísticas de la geometría evaluada de un objeto.
+
+    Los recuentos, los límites de las posiciones y el mínimo, máximo y media de cada
+    atributo se leen con foreach_get y se calculan con NumPy, sin bucles de Python
+    por elemento.
+
+    Args:
+        depsgraph: Depsgraph evaluado
+        obj: Objeto original
+        attribute_names (tuple): Atributos a resumir
+
+    Returns:
+        dict: 'vertices', 'edges', 'faces', 'points', 'curves', 'instances',
+              'bounds' ((mín, máx) en coordenadas locales o None), 'attributes'
+              (nombre -> resumen o None si no existe) y 'time' (segundos)
+    """
+    start = time.perf_counter()
+    obj_eval = obj.evaluated_get(depsgraph)
+    components, instances = _components(obj_eval)
+
+    stats = {"vertices": 0, "edges": 0, "faces": 0, "points": 0, "curves": 0}
+    positions = []
+    for data in components:
+        if isinstance(data, bpy.types.Mesh):
+            stats["vertices"] += len(data.vertices)
+            stats["edges"] += len(data.edges)
+            stats["faces"] += len(data.polygons)
+        elif isinstance(data, bpy.types.Curves):
+            stats["points"] += len(data.points)
+            stats["curves"] += len(data.curves)
+        else:
+            stats["points"] += len(data.points)
+
+        position = data.attributes.get("position")
+        if position is not None and len(position.data):
+            positions.append(read_attribute(position))
+
+    stats["instances"] = instances if instances is not None else count_instances(depsgraph, obj)
+
+    stats["bounds"] = None
+    if positions:
+        points = np.concatenate(positions) if len(positions) > 1 else positions[0]
+        stats["bounds"] = (points.min(axis=0).tolist(), points.max(axis=0).tolist())
+
+    stats["attributes"] = {}
+    for name in attribute_names:
+        arrays = [read_attribute(data.attributes[name]) for data in components if name in data.attributes]
+        arrays = [values for values in arrays if values is not None]
+        if not arrays or any(values.shape[1] != arrays[0].shape[1] for values in arrays):
+            stats["attributes"][name] = None
+            continue
+        stats["attributes"][name] = summarize_array(np.concatenate(arrays) if len(arrays) > 1 else arrays[0])
+
+    stats["time"] = time.perf_counter() - start
+    return stats
+
+def probe(context, obj, attribute_names=()):
+    """
+    Devuelve las estadísticas de un objeto, calculándolas solo si ha cambiado.
+
+    Args:
+        context: Contexto de Blender
+        obj: Objeto original
+        attribute_names (tuple): Atributos a resumir
+
+    Returns:
+        dict: Resultado de compute_stats
+    """
+    attribute_names = tuple(attribute_names)
+    cached = _stats_cache.get(obj.name)
+    if cached is not None and cached["attribute_names"] == attribute_names:
+        return cached
+
+    stats = compute_stats(context.evaluated_depsgraph_get(), obj, attribute_names)
+    stats["attribute_names"] = attribute_names
+    _stats_cache[obj.name] = stats
+    _add_handler()
+    logger.info(f"Estadísticas de {obj.name} calculadas en {stats['time'] * 1000.0:.1f} ms")
+    return stats
+
+def get_cached(obj):
+    """Estadísticas guardadas de un objeto, o None si no las hay o han caducado"""
+    return _stats_cache.get(obj.name) if obj is not None else None
+
+@bpy.app.handlers.persistent
+def _on_depsgraph_update(scene, depsgraph):
+    """Callback de depsgraph_update_post: descarta las estadísticas de los objetos cambiados"""
+    if not _stats_cache:
+        return
+    for update in depsgraph.updates:
+        datablock = update.id
+        if isinstance(datablock, bpy.types.Object):
+            if update.is_updated_geometry:
+                _stats_cache.pop(datablock.original.name, None)
+        elif isinstance(datablock, bpy.types.NodeTree):
+            # Un árbol editado puede cambiar cualquier objeto que lo use
+            _stats_cache.clear()
+            return
+
+@bpy.app.handlers.persistent
+def _on_frame_change(scene, *args):
+    """Callback de frame_change_post: la geometría animada cambia sin un aviso por objeto"""
+    _stats_cache.clear()
+
+def _add_handler():
+    if _on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    if _on_frame_change not in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.append(_on_frame_change)
+
+def clear():
+    """Descarta las estadísticas y deja de seguir los cambios del depsgraph y de fotograma"""
+    _stats_cache.clear()
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_frame_change in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.remove(_on_frame_change)
@@ -0,0 +1,249 @@
+import os
+import time
+import logging
+import functools
+import numpy as np
+
+from . import node_builder, template_plan, collection_instance, undo_batch
+from .geometry_stats import ATTRIBUTE_LAYOUTS
+
+logger = logging.getLogger("GeometryNodes")
+
+# Atributos de la nube de puntos que lee el árbol de glifos
+ROTATION_ATTRIBUTE = "rotation"
+SCALE_ATTRIBUTE = "scale"
+
+# Entrada del grupo con el objeto usado como glifo en la forma 'OBJECT'
+GLYPH_SOCKET = "Glyph"
+
+# Claves de un archivo .npz que no se guardan como atributos
+POSITION_KEYS = ("positions", "position")
+
+# Forma del glifo -> (tipo de nodo, entradas, socket de salida)
+GLYPH_SHAPES = {
+    'ICO_SPHERE': ("GeometryNodeMeshIcoSphere", {"Radius": 0.05, "Subdivisions": 1}, "Mesh"),
+    'CONE': ("GeometryNodeMeshCone", {"Vertices": 8, "Radius Top": 0.0, "Radius Bottom": 0.03, "Depth": 0.1}, "Mesh"),
+    'CUBE': ("GeometryNodeMeshCube", {"Size": (0.05, 0.05, 0.05)}, "Mesh"),
+    'OBJECT': ("GeometryNodeObjectInfo", {}, "Geometry"),
+}
+
+def attribute_type(name, values):
+    """
+    Tipo de atributo de Blender adecuado para una matriz de valores por punto.
+
+    Args:
+        name (str): Nombre del atributo (una rotación de 4 componentes es un cuaternión)
+        values (numpy.ndarray): Matriz de forma (puntos,) o (puntos, componentes)
+
+    Returns:
+        str: Tipo de dato para mesh.attributes.new
+
+    Raises:
+        ValueError: Si la forma o el tipo de la matriz no tiene equivalente
+    """
+    if values.ndim not in (1, 2):
+        raise ValueError(f"El atributo {name} tiene {values.ndim} dimensiones")
+    components = 1 if values.ndim == 1 else values.shape[1]
+    if components == 1:
+        if values.dtype == np.bool_:
+            return 'BOOLEAN'
+        return 'INT' if np.issubdtype(values.dtype, np.integer) else 'FLOAT'
+    if components == 2:
+        return 'FLOAT2'
+    if components == 3:
+        return 'FLOAT_VECTOR'
+    if components == 4:
+        return 'QUATERNION' if name == ROTATION_ATTRIBUTE else 'FLOAT_COLOR'
+    raise ValueError(f"El atributo {name} tiene {components} componentes")
+
+def _write_attribute(mesh, name, values):
+    data_type = attribute_type(name, values)
+    prop, _, dtype = ATTRIBUTE_LAYOUTS[data_type]
+    attribute = mesh.attributes.new(name=name, type=data_type, domain='POINT')
+    attribute.data.foreach_set(prop, np.ascontiguousarray(values, dtype=dtype).ravel())
+    return data_type
+
+def fill_point_cloud(mesh, positions, attributes=None):
+    """
+    Llena una malla vacía con un punto por fila de 'positions' y sus atributos.
+
+    Los vértices se crean con vertices.add y los valores se copian de una vez con
+    foreach_set, sin recorrer los puntos en Python.
+
+    Args:
+        mesh: Malla vacía
+        positions (numpy.ndarray): Posiciones, de forma (puntos, 3)
+        attributes (dict): Nombre -> matriz de forma (puntos,) o (puntos, componentes)
+
+    Returns:
+        dict: Nombre del atributo -> tipo de dato con el que se guardó
+    """
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(positions, dtype=np.float32).ravel())
+
+    types = {name: _write_attribute(mesh, name, values) for name, values in (attributes or {}).items()}
+    mesh.update()
+    return types
+
+@functools.lru_cache(maxsize=None)
+def glyph_plan(shape='ICO_SPHERE', rotation_type=None, scale_type=None):
+    """
+    Devuelve el plan del árbol que instancia un glifo en cada punto.
+
+    El árbol usa InstanceOnPoints sobre la geometría del objeto y lee la rotación y la
+    escala de los atributos 'rotation' y 'scale' de los puntos. El resto de atributos
+    pasa a las instancias y puede leerse desde los materiales.
+
+    Args:
+        shape (str): Forma del glifo (clave de GLYPH_SHAPES)
+        rotation_type (str): Tipo del atributo de rotación o None si no hay
+        scale_type (str): Tipo del atributo de escala o None si no hay
+
+    Returns:
+        dict: Plan compilado (compartido, no debe modificarse)
+    """
+    node_type, glyph_inputs, glyph_output = GLYPH_SHAPES[shape]
+    nodes = [
+        {"id": "glyph", "type": node_type, "location": (-300, -150), "inputs": glyph_inputs},
+        {"id": "instance", "type": "GeometryNodeInstanceOnPoints", "location": (100, 0)},
+    ]
+    links = [
+        {"from_node": "input", "from_socket": "Geometry", "to_node": "instance", "to_socket": "Points"},
+        {"from_node": "glyph", "from_socket": glyph_output, "to_node": "instance", "to_socket": "Instance"},
+        {"from_node": "instance", "from_socket": "Instances", "to_node": "output", "to_socket": "Geometry"},
+    ]
+    inputs = [{"name": "Geometry", "type": "NodeSocketGeometry"}]
+    if shape == 'OBJECT':
+        inputs.append({"name": GLYPH_SOCKET, "type": "NodeSocketObject"})
+        links.append({"from_node": "input", "from_socket": GLYPH_SOCKET, "to_node": "glyph", "to_socket": "Object"})
+
+    for index, (name, data_type, socket) in enumerate(((ROTATION_ATTRIBUTE, rotation_type, "Rotation"),
+                                                       (SCALE_ATTRIBUTE, scale_type, "Scale"))):
+        if data_type is None:
+            continue
+        nodes.append({
+            "id": name,
+            "type": "GeometryNodeInputNamedAttribute",
+            "location": (-300, -350 - 150 * index),
+            "properties": {"data_type": data_type},
+            "inputs": {"Name": name},
+        })
+        links.append({"from_node": name, "from_socket": "Attribute", "to_node": "instance", "to_socket": socket})
+
+    data = {
+        "name": f"GN_glyphs_{shape.lower()}",
+        "nodes": nodes,
+        "links": links,
+        "inputs": inputs,
+        "outputs": [{"name": "Geometry", "type": "NodeSocketGeometry"}],
+    }
+    return template_plan.compile_template(data)
+
+def load_arrays(filepath):
+    """
+    Lee las matrices de glifos de un archivo .npy o .npz.
+
+    Un .npy contiene solo las posiciones (puntos, 3). Un .npz contiene 'positions' y,
+    opcionalmente, 'rotation', 'scale' y cualquier otro atributo por punto.
+
+    Args:
+        filepath (str): Ruta al archivo
+
+    Returns:
+        dict: Nombre -> matriz, con las posiciones en 'positions'
+    """
+    if filepath.lower().endswith(".npy"):
+        # Proyectado en memoria: foreach_set copia directamente desde el archivo
+        return {"positions": np.load(filepath, mmap_mode='r')}
+
+    with np.load(filepath) as archive:
+        arrays = {key: archive[key] for key in archive.files}
+    for key in POSITION_KEYS:
+        if key in arrays:
+            arrays["positions"] = arrays.pop(key)
+            break
+    return arrays
+
+def create_glyphs(context, positions, rotation=None, scale=None, attributes=None,
+                  shape='ICO_SPHERE', glyph_object=None, name="Glifos", diagnostics=None):
+    """
+    Crea un objeto con un glifo instanciado en cada punto de una nube de puntos.
+
+    Los puntos y sus atributos se escriben en una malla sin caras con foreach_set, y
+    el árbol compartido de glyph_plan los instancia, de modo que millones de glifos se
+    crean en segundos.
+
+    Args:
+        context: Contexto de Blender
+        positions (numpy.ndarray): Posiciones, de forma (puntos, 3)
+        rotation (numpy.ndarray): Rotaciones por punto: Euler (puntos, 3) o cuaterniones (puntos, 4)
+        scale (numpy.ndarray): Escala por punto: uniforme (puntos,) o por eje (puntos, 3)
+        attributes (dict): Otros atributos por punto: nombre -> matriz
+        shape (str): Forma del glifo (clave de GLYPH_SHAPES)
+        glyph_object: Objeto usado como glifo cuando shape es 'OBJECT'
+        name (str): Nombre del objeto creado
+        diagnostics (BuildDiagnostics): Registro de problemas (opcional)
+
+    Returns:
+        bpy.types.Object: El objeto con la nube de puntos y el modificador
+
+    Raises:
+        ValueError: Si las matrices no tienen la forma esperada
+    """
+    start = time.perf_counter()
+    positions = np.asarray(positions)
+    if positions.ndim != 2 or positions.shape[1] != 3:
+        raise ValueError(f"Las posiciones deben tener forma (puntos, 3), no {positions.shape}")
+    if shape == 'OBJECT' and glyph_object is None:
+        raise ValueError("La forma 'OBJECT' necesita un objeto como glifo")
+
+    point_attributes = dict(attributes or {})
+    if rotation is not None:
+        point_attributes[ROTATION_ATTRIBUTE] = rotation
+    if scale is not None:
+        point_attributes[SCALE_ATTRIBUTE] = scale
+    for attribute_name, values in point_attributes.items():
+        values = point_attributes[attribute_name] = np.asarray(values)
+        if len(values) != len(positions):
+            raise ValueError(f"El atributo {attribute_name} tiene {len(values)} valores "
+                             f"para {len(positions)} puntos")
+        if attribute_name == "position":
+            raise ValueError("El nombre de atributo 'position' está reservado")
+
+    obj = collection_instance.create_host_object(context, name)
+    types = fill_point_cloud(obj.data, positions, point_attributes)
+
+    plan = glyph_plan(shape, types.get(ROTATION_ATTRIBUTE), types.get(SCALE_ATTRIBUTE))
+    gn_mod = node_builder.apply_plan(obj, plan, diagnostics)
+    if shape == 'OBJECT':
+        node_builder.set_modifier_input(gn_mod, GLYPH_SOCKET, glyph_object)
+    undo_batch.record()
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"{len(positions)} glifos creados en {obj.name} en {elapsed:.2f} s")
+    return obj
+
+def create_glyphs_from_file(context, filepath, shape='ICO_SPHERE', glyph_object=None, diagnostics=None):
+    """
+    Crea glifos a partir de un archivo .npy o .npz (ver load_arrays).
+
+    Args:
+        context: Contexto de Blender
+        filepath (str): Ruta al archivo
+        shape (str): Forma del glifo (clave de GLYPH_SHAPES)
+        glyph_object: Objeto usado como glifo cuando shape es 'OBJECT'
+        diagnostics (BuildDiagnostics): Registro de problemas (opcional)
+
+    Returns:
+        bpy.types.Object: El objeto creado
+    """
+    arrays = load_arrays(filepath)
+    if "positions" not in arrays:
+        raise ValueError(f"{os.path.basename(filepath)} no contiene la matriz 'positions'")
+
+    positions = arrays.pop("positions")
+    rotation = arrays.pop(ROTATION_ATTRIBUTE, None)
+    scale = arrays.pop(SCALE_ATTRIBUTE, None)
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    return create_glyphs(context, positions, rotation, scale, arrays, shape=shape,
+                         glyph_object=glyph_object, name=name, diagnostics=diagnostics)
@@ -0,0 +1,223 @@
+import os
+import sys
+import ast
+import time
+import logging
+import importlib
+
+logger = logging.getLogger("GeometryNodes")
+
+# Paquete raíz del addon ("GeometryNodes" o el nombre con el que se instaló)
+ADDON_PACKAGE = __package__.rpartition(".")[0]
+
+# Última fecha de modificación conocida de cada submódulo: nombre -> mtime_ns
+_mtimes = {}
+
+def is_developer_mode():
+    """
+    Indica si el addon se ejecuta en modo desarrollador (variable de entorno SCIBLEND_DEV=1).
+
+    Solo en este modo se desregistran versiones anteriores al registrar y se ofrece la
+    recarga de módulos; en el arranque normal, y sobre todo en los trabajadores sin
+    interfaz, el registro se limita a las clases del addon.
+    """
+    return os.environ.get("SCIBLEND_DEV", "") not in ("", "0")
+
+def addon_modules():
+    """
+    Devuelve los módulos del addon cargados actualmente.
+
+    Returns:
+        dict: Nombre del módulo -> módulo (solo los que tienen archivo fuente)
+    """
+    prefix = ADDON_PACKAGE + "."
+    return {
+        name: module for name, module in list(sys.modules.items())
+        if module is not None and (name == ADDON_PACKAGE or name.startswith(prefix))
+        and getattr(module, "__file__", None)
+    }
+
+def _mtime(module):
+    try:
+        return os.stat(module.__file__).st_mtime_ns
+    except OSError:
+        return None
+
+def _compiled_mtime(module):
+    """Fecha del código fuente con la que se compiló el .pyc del módulo (None si no hay)"""
+    cached = getattr(module.__spec__, "cached", None) if module.__spec__ else None
+    try:
+        with open(cached, 'rb') as f:
+            header = f.read(16)
+    except (OSError, TypeError):
+        return None
+    # Cabecera de los .pyc basados en fecha: magic, flags, mtime, tamaño
+    if len(header) < 16 or int.from_bytes(header[4:8], "little") != 0:
+        return None
+    return int.from_bytes(header[8:12], "little")
+
+def snapshot():
+    """Guarda la fecha de modificación de todos los módulos cargados del addon"""
+    _mtimes.clear()
+    for name, module in addon_modules().items():
+        _mtimes[name] = _mtime(module)
+
+def changed_modules():
+    """
+    Devuelve los módulos cuyo archivo ha cambiado desde la última instantánea.
+
+    Returns:
+        set: Nombres de los módulos cambiados
+    """
+    changed = set()
+    for name, module in addon_modules().items():
+        mtime = _mtime(module)
+        if name in _mtimes:
+            if mtime != _mtimes[name]:
+                changed.add(name)
+        elif mtime is not None:
+            # Módulo importado de forma diferida después de la instantánea: comparar
+            # con la fecha que quedó registrada en su .pyc al importarlo
+            compiled = _compiled_mtime(module)
+            if compiled is not None and compiled != (mtime // 1_000_000_000) & 0xFFFFFFFF:
+                changed.add(name)
+    return changed
+
+def _resolve_import(module_name, is_package, node):
+    """Nombre absoluto del módulo de una sentencia 'from ... import'"""
+    if node.level == 0:
+        return node.module
+    base = module_name if is_package else module_name.rpartition(".")[0]
+    for _ in range(node.level - 1):
+        base = base.rpartition(".")[0]
+    return f"{base}.{node.module}" if node.module else base
+
+def name_dependencies(module):
+    """
+    Módulos del addon de los que un módulo copia nombres al importarse.
+
+    Solo cuentan las sentencias 'from X import nombre' del nivel superior cuando el
+    nombre no es un submódulo: un módulo importado como tal se recarga en el sitio y la
+    referencia sigue siendo válida, pero un nombre copiado apunta al objeto antiguo.
+    Las importaciones dentro de funciones se resuelven al ejecutarse y no cuentan.
+
+    Args:
+        module: Módulo del addon
+
+    Returns:
+        set: Nombres de los módulos de los que depende
+    """
+    with open(module.__file__, 'r', encoding="utf-8") as f:
+        tree = ast.parse(f.read(), module.__file__)
+
+    is_package = hasattr(module, "__path__")
+    dependencies = set()
+    for node in tree.body:
+        if not isinstance(node, ast.ImportFrom):
+            continue
+        base = _resolve_import(module.__name__, is_package, node)
+        if not base or not base.startswith(ADDON_PACKAGE):
+            continue
+        for alias in node.names:
+            if f"{base}.{alias.name}" not in sys.modules:
+                dependencies.add(base)
+    return dependencies
+
+def plan_reload(changed):
+    """
+    Calcula qué módulos recargar y en qué orden.
+
+    Se recargan los módulos cambiados y, transitivamente, los que copian nombres de
+    ellos. El orden respeta las dependencias: cada módulo se recarga después de
+    aquellos de los que copia nombres.
+
+    Args:
+        changed (set): Módulos cambiados
+
+    Returns:
+        list: Nombres de los módulos en orden de recarga
+    """
+    modules = addon_modules()
+    dependencies = {name: name_dependencies(module) & modules.keys()
+                    for name, module in modules.items() if name != ADDON_PACKAGE}
+
+    affected = set(changed)
+    pending = list(changed)
+    while pending:
+        current = pending.pop()
+        for name, deps in dependencies.items():
+            if current in deps and name not in affected:
+                affected.add(name)
+                pending.append(name)
+
+    order = []
+    remaining = set(affected)
+    while remaining:
+        ready = sorted(name for name in remaining
+                       if not (dependencies.get(name, set()) & remaining))
+        if not ready:
+            # Ciclo de importaciones: recargar el resto en orden alfabético
+            ready = sorted(remaining)
+        order.extend(ready)
+        remaining.difference_update(ready)
+    return order
+
+def _warm_state(module):
+    """Cachés del módulo (diccionarios privados del nivel superior) para conservarlas"""
+    return {name: value for name, value in vars(module).items()
+            if name.startswith("_") and not name.startswith("__") and isinstance(value, dict)}
+
+def reload_changed():
+    """
+    Recarga solo los módulos cambiados del addon y los que dependen de ellos.
+
+    Los módulos que registran clases (con register/unregister) se desregistran antes de
+    recargarlos y se vuelven a registrar después. Los módulos recargados solo por
+    depender de otro conservan sus cachés. Si cambia el paquete raíz, se vuelve a
+    registrar el addon completo.
+
+    Returns:
+        list: Nombres de los módulos recargados
+    """
+    start = time.perf_counter()
+    changed = changed_modules()
+    if not changed:
+        logger.info("No hay módulos cambiados")
+        return []
+
+    root = sys.modules[ADDON_PACKAGE]
+    full_reload = ADDON_PACKAGE in changed
+    order = plan_reload(changed - {ADDON_PACKAGE})
+    modules = addon_modules()
+
+    if full_reload:
+        root.unregister()
+
+    # Desregistrar en orden inverso las clases de los módulos afectados
+    registering = [name for name in order
+                   if not full_reload and not hasattr(modules[name], "__path__")
+                   and hasattr(modules[name], "register") and hasattr(modules[name], "unregister")]
+    for name in reversed(registering):
+        modules[name].unregister()
+
+    for name in order:
+        module = modules[name]
+        state = _warm_state(module) if name not in changed else {}
+        importlib.reload(module)
+        vars(module).update(state)
+
+    if f"{ADDON_PACKAGE}.utils.blender_api" in order:
+        sys.modules[f"{ADDON_PACKAGE}.utils.blender_api"].detect()
+
+    if full_reload:
+        importlib.reload(root)
+        root.register()
+        order.append(ADDON_PACKAGE)
+    else:
+        for name in registering:
+            modules[name].register()
+
+    snapshot()
+    elapsed = (time.perf_counter() - start) * 1000.0
+    logger.info(f"{len(order)} módulos recargados en {elapsed:.0f} ms: {', '.join(order)}")
+    return order
@@ -0,0 +1,158 @@
+import bpy
+import os
+import time
+import fnmatch
+import logging
+
+from . import node_builder, template_plan, metrics
+from .diagnostics import BuildDiagnostics
+from ..presets import transforms
+
+logger = logging.getLogger("GeometryNodes")
+
+def select_objects(selector):
+    """
+    Resuelve un selector de objetos de un trabajo.
+
+    Formatos admitidos:
+        "*"                  todos los objetos de malla
+        "name:<patrón>"      objetos cuyo nombre coincide con el patrón (fnmatch)
+        "collection:<name>"  objetos de una colección (incluidas las hijas)
+        "type:<TIPO>"        objetos de un tipo ('MESH', 'CURVE', ...)
+        lista de nombres     objetos con esos nombres exactos
+
+    Args:
+        selector: Selector en uno de los formatos anteriores
+
+    Returns:
+        list: Objetos seleccionados
+    """
+    if isinstance(selector, (list, tuple)):
+        return [bpy.data.objects[name] for name in selector if name in bpy.data.objects]
+
+    if selector in (None, "", "*"):
+        return [obj for obj in bpy.data.objects if obj.type == 'MESH']
+
+    kind, _, value = selector.partition(":")
+    if kind == "name":
+        return [obj for obj in bpy.data.objects if fnmatch.fnmatchcase(obj.name, value)]
+    if kind == "collection":
+        collection = bpy.data.collections.get(value)
+        return list(collection.all_objects) if collection is not None else []
+    if kind == "type":
+        return [obj for obj in bpy.data.objects if obj.type == value.upper()]
+
+    raise ValueError(f"Selector de objetos no válido: {selector}")
+
+def resolve_template(template):
+    """
+    Obtiene el plan de la plantilla de un trabajo.
+
+    Args:
+        template (str): Ruta a una plantilla JSON o "preset:<tipo>" para un preset integrado
+
+    Returns:
+        dict: Plan compilado (en caché entre trabajos)
+    """
+    if template.startswith("preset:"):
+        return transforms.get_transform_plan(template[len("preset:"):])
+    return template_plan.load_template(template)
+
+def open_blend(filepath):
+    """
+    Abre un .blend salvo que ya esté cargado y sin cambios.
+
+    Args:
+        filepath (str): Ruta al archivo .blend
+    """
+    filepath = os.path.abspath(filepath)
+    if bpy.data.filepath == filepath and not bpy.data.is_dirty:
+        return
+    bpy.ops.wm.open_mainfile(filepath=filepath, load_ui=False)
+
+def export_scene(export):
+    """
+    Exporta la escena con uno de los exportadores integrados de Blender.
+
+    Args:
+        export (dict): {'format': 'obj' | 'gltf' | 'usd' | 'stl', 'filepath': ruta}
+    """
+    export_format = export.get("format", "gltf").lower()
+    filepath = os.path.abspath(export["filepath"])
+
+    if export_format == "obj":
+        bpy.ops.wm.obj_export(filepath=filepath, apply_modifiers=True)
+    elif export_format == "gltf":
+        bpy.ops.export_scene.gltf(filepath=filepath, export_apply=True)
+    elif export_format == "usd":
+        bpy.ops.wm.usd_export(filepath=filepath)
+    elif export_format == "stl":
+        bpy.ops.wm.stl_export(filepath=filepath, apply_modifiers=True)
+    else:
+        raise ValueError(f"Formato de exportación no soportado: {export_format}")
+
+def run_job(job):
+    """
+    Ejecuta un trabajo: abrir un .blend, aplicar una plantilla a objetos y guardar.
+
+    Args:
+        job (dict): Trabajo con las claves 'blend', 'template' o 'bundle' (paquete de
+                    plantillas, ver bundle.apply_bundle), 'objects' (selector,
+                    opcional), 'output' (ruta de guardado, opcional), 'save'
+                    (por defecto True), 'export' (opcional, ver export_scene) y
+                    'strict' (validar el plan antes de abrir nada más)
+
+    Returns:
+        dict: Resultado con 'id', 'status', 'objects', 'timings' y 'error'
+    """
+    result = {"id": job.get("id"), "status": "ok", "objects": 0, "timings": {}, "error": None}
+    timings = result["timings"]
+    start = time.perf_counter()
+
+    try:
+        step = time.perf_counter()
+        if job.get("blend"):
+            open_blend(job["blend"])
+        timings["open"] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        diagnostics = BuildDiagnostics()
+        if job.get("bundle"):
+            # Importación diferida: bundle depende de este módulo
+            from . import bundle
+            summary = bundle.apply_bundle(bpy.context, os.path.abspath(job["bundle"]),
+                                          diagnostics, strict=job.get("strict", False))
+            result["objects"] = summary["objects"]
+        else:
+            plan = resolve_template(job["template"])
+            if job.get("strict") and not node_builder.validate_plan(plan, diagnostics):
+                raise ValueError(f"Modo estricto: {diagnostics.summary()}")
+
+            objects = select_objects(job.get("objects", "*"))
+            for obj in objects:
+                node_builder.apply_plan(obj, plan, diagnostics)
+            result["objects"] = len(objects)
+        if diagnostics:
+            result["diagnostics"] = {"counts": diagnostics.counts, "examples": diagnostics.examples}
+        timings["apply"] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        if job.get("save", True):
+            output = job.get("output") or bpy.data.filepath
+            bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(output))
+        timings["save"] = time.perf_counter() - step
+
+        if job.get("export"):
+            step = time.perf_counter()
+            export_scene(job["export"])
+            timings["export"] = time.perf_counter() - step
+
+    except Exception as e:
+        logger.exception(f"Error en el trabajo {job.get('id')}")
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {str(e)}"
+
+    # Los indicadores leen bpy.data, así que se actualizan aquí y no en el hilo de exportación
+    metrics.refresh_gauges()
+    timings["total"] = time.perf_counter() - start
+    return result
@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import atexit
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger("GeometryNodes")
+
+# Prefijo de las métricas en el formato de texto de Prometheus
+PREFIX = "sciblend_"
+
+COUNTERS = {
+    "applies_total": "Árboles asignados a objetos",
+    "cache_hits_total": "Árboles reutilizados de la caché",
+    "cache_misses_total": "Árboles construidos por no estar en la caché",
+    "nodes_created_total": "Nodos creados al construir árboles",
+    "links_created_total": "Enlaces creados al construir árboles",
+    "links_failed_total": "Enlaces que no pudieron crearse",
+    "orphaned_groups_total": "Árboles sin usuarios que no pudieron eliminarse",
+    "evicted_groups_total": "Árboles de plan sin usuarios expulsados de la caché",
+    "template_bytes_parsed_total": "Bytes de plantillas y paquetes leídos de disco",
+}
+
+# Límites superiores de los intervalos de cada histograma (en segundos)
+HISTOGRAMS = {
+    "build_seconds": ("Tiempo de construcción de un árbol",
+                      (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)),
+    "bundle_seconds": ("Tiempo de aplicación de un paquete",
+                       (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)),
+}
+
+GAUGES = {
+    "node_groups": "Árboles de nodos en el archivo",
+    "orphaned_node_groups": "Árboles sin usuarios que el addon no conserva como caché",
+}
+
+_lock = threading.Lock()
+_counters = dict.fromkeys(COUNTERS, 0)
+_histograms = {name: {"buckets": [0] * (len(bounds) + 1), "sum": 0.0, "count": 0}
+               for name, (_, bounds) in HISTOGRAMS.items()}
+_gauges = dict.fromkeys(GAUGES, 0)
+
+# Exportación periódica activa: {"filepath", "interval", "thread", "stop"} o None
+_export = None
+
+def inc(name, value=1):
+    """Suma un valor a un contador"""
+    with _lock:
+        _counters[name] += value
+
+def observe(name, value):
+    """Anota una medida en un histograma"""
+    bounds = HISTOGRAMS[name][1]
+    with _lock:
+        histogram = _histograms[name]
+        histogram["buckets"][bisect.bisect_left(bounds, value)] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+def refresh_gauges():
+    """
+    Actualiza los indicadores que se leen de bpy.data.
+
+    Solo debe llamarse desde el hilo principal: durante la exportación lo llama un
+    temporizador de Blender con el mismo intervalo, y los trabajos por lotes al
+    terminar cada trabajo. La escritura a disco usa el último valor leído.
+    """
+    import bpy
+    from .node_builder import PLAN_HASH_PROP
+
+    node_groups = bpy.data.node_groups
+    orphans = sum(1 for node_group in node_groups
+                  if node_group.users == 0 and node_group.get(PLAN_HASH_PROP) is None)
+    with _lock:
+        _gauges["node_groups"] = len(node_groups)
+        _gauges["orphaned_node_groups"] = orphans
+
+def snapshot():
+    """
+    Copia coherente de todas las métricas.
+
+    Returns:
+        dict: 'counters', 'histograms' (con 'bounds', 'buckets' no acumulados, 'sum' y
+              'count'), 'gauges', 'pid' y 'time'
+    """
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "histograms": {
+                name: {"bounds": list(HISTOGRAMS[name][1]), "buckets": list(histogram["buckets"]),
+                       "sum": histogram["sum"], "count": histogram["count"]}
+                for name, histogram in _histograms.items()
+            },
+            "gauges": dict(_gauges),
+            "pid": os.getpid(),
+            "time": time.time(),
+        }
+
+def to_prometheus(data=None):
+    """
+    Formatea las métricas en el formato de texto de Prometheus.
+
+    Args:
+        data (dict): Resultado de snapshot (por defecto, el estado actual)
+
+    Returns:
+        str: Texto listo para el recolector de archivos de texto de node_exporter
+    """
+    data = data or snapshot()
+    lines = []
+    for name, value in data["counters"].items():
+        lines += [f"# HELP {PREFIX}{name} {COUNTERS[name]}", f"# TYPE {PREFIX}{name} counter",
+                  f"{PREFIX}{name} {value}"]
+    for name, value in data["gauges"].items():
+        lines += [f"# HELP {PREFIX}{name} {GAUGES[name]}", f"# TYPE {PREFIX}{name} gauge",
+                  f"{PREFIX}{name} {value}"]
+    for name, histogram in data["histograms"].items():
+        lines += [f"# HELP {PREFIX}{name} {HISTOGRAMS[name][0]}", f"# TYPE {PREFIX}{name} histogram"]
+        cumulative = 0
+        for bound, count in zip(histogram["bounds"] + ["+Inf"], histogram["buckets"]):
+            cumulative += count
+            lines.append(f'{PREFIX}{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines += [f"{PREFIX}{name}_sum {histogram['sum']}", f"{PREFIX}{name}_count {histogram['count']}"]
+    return "\n".join(lines) + "\n"
+
+def write_metrics(filepath):
+    """
+    Escribe las métricas en un archivo: JSON si la extensión es .json y formato de
+    texto de Prometheus en otro caso.
+
+    El archivo se sustituye de forma atómica, de modo que un recolector nunca lee una
+    escritura a medias. '{pid}' en la ruta se sustituye por el identificador del
+    proceso, para que varios trabajadores en la misma máquina no compartan archivo.
+
+    Args:
+        filepath (str): Ruta de salida
+    """
+    filepath = filepath.replace("{pid}", str(os.getpid()))
+    data = snapshot()
+    if filepath.lower().endswith(".json"):
+        content = json.dumps(data, indent=2)
+    else:
+        content = to_prometheus(data)
+
+    temporary = f"{filepath}.tmp"
+    with open(temporary, 'w') as f:
+        f.write(content)
+    os.replace(temporary, filepath)
+
+def _try_write(filepath):
+    try:
+        write_metrics(filepath)
+    except OSError as e:
+        logger.warning(f"No se pudieron escribir las métricas en {filepath}: {str(e)}")
+
+def _export_loop(stop, filepath, interval):
+    while not stop.wait(interval):
+        _try_write(filepath)
+
+def _refresh_timer():
+    """Callback de bpy.app.timers: actualiza los indicadores en el hilo principal"""
+    if _export is None:
+        return None
+    refresh_gauges()
+    return _export["interval"]
+
+def _stop_thread(export):
+    # Esperar al hilo para que no escriba el mismo archivo temporal a la vez que la
+    # escritura final
+    export["stop"].set()
+    if export["thread"] is not threading.current_thread():
+        export["thread"].join()
+
+def _write_at_exit():
+    # Sin leer bpy.data: durante el cierre del intérprete Blender ya puede haberlo liberado
+    if _export is not None:
+        _stop_thread(_export)
+        _try_write(_export["filepath"])
+
+def start_export(filepath, interval=15.0):
+    """
+    Empieza a escribir las métricas cada cierto tiempo y al terminar el proceso.
+
+    La escritura periódica se hace en un hilo aparte, sin tocar bpy, para que funcione
+    también en trabajadores en segundo plano cuyo hilo principal no atiende los
+    temporizadores de Blender. Los indicadores, que leen bpy.data, los actualiza un
+    temporizador en el hilo principal (en sesiones interactivas) o cada trabajo por
+    lotes al terminar.
+
+    Args:
+        filepath (str): Ruta de salida (ver write_metrics)
+        interval (float): Segundos entre escrituras
+
+    Raises:
+        ValueError: Si el intervalo no es positivo
+    """
+    global _export
+    if not interval > 0:
+        raise ValueError(f"El intervalo de las métricas debe ser positivo: {interval}")
+    stop_export()
+    stop = threading.Event()
+    thread = threading.Thread(target=_export_loop, args=(stop, filepath, interval),
+                              name="sciblend-metrics", daemon=True)
+    _export = {"filepath": filepath, "interval": interval, "thread": thread, "stop": stop}
+    thread.start()
+
+    import bpy
+    # Persistente: la sesión sigue exportando tras abrir otro archivo
+    bpy.app.timers.register(_refresh_timer, first_interval=0.0, persistent=True)
+    logger.info(f"Métricas en {filepath} cada {interval:g} s")
+
+def stop_export():
+    """Detiene la exportación periódica, escribiendo antes las métricas una última vez"""
+    global _export
+    if _export is None:
+        return
+    _stop_thread(_export)
+    _try_write(_export["filepath"])
+    _export = None
+
+    import bpy
+    if bpy.app.timers.is_registered(_refresh_timer):
+        bpy.app.timers.unregister(_refresh_timer)
+
+def start_from_environment():
+    """
+    Activa la exportación si está definida la variable de entorno SCIBLEND_METRICS_FILE.
+
+    SCIBLEND_METRICS_INTERVAL fija los segundos entre escrituras (15 por defecto).
+    """
+    filepath = os.environ.get("SCIBLEND_METRICS_FILE")
+    if not filepath:
+        return
+    try:
+        interval = float(os.environ.get("SCIBLEND_METRICS_INTERVAL", "15"))
+    except ValueError:
+        interval = 15.0
+    if not interval > 0:
+        logger.warning(f"SCIBLEND_METRICS_INTERVAL debe ser positivo, se usan 15 s en lugar de {interval:g}")
+        interval = 15.0
+    start_export(filepath, interval)
+
+atexit.register(_write_at_exit)
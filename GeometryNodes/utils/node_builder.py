@@ -1,6 +1,33 @@
 import bpy
+import json
+import time
+import logging
 
-def build_and_apply_node_tree(obj, data):
+from . import template_plan, blender_api, undo_batch, metrics
+from .diagnostics import BuildDiagnostics
+
+logger = logging.getLogger("GeometryNodes")
+
+# Propiedad personalizada con la que se marcan los árboles construidos desde un plan
+PLAN_HASH_PROP = "sciblend_plan_hash"
+
+# Caché de árboles de nodos: hash del plan -> nombre del árbol en bpy.data.node_groups
+_node_group_cache = {}
+
+# Problemas de la construcción de cada árbol en caché: hash del plan -> BuildDiagnostics
+_build_diagnostics = {}
+
+# Árboles de plan sin usuarios que se conservan como caché, del liberado hace más tiempo
+# al más reciente: nombre del árbol -> None
+_unused_plan_trees = {}
+
+# Número máximo de árboles de plan sin usuarios que se conservan
+MAX_UNUSED_PLAN_TREES = 64
+
+# Sockets de cada tipo de nodo según sus propiedades, para la validación estricta
+_socket_signatures = {}
+
+def build_and_apply_node_tree(obj, data, diagnostics=None):
     """
     Construye y aplica un árbol de nodos de Geometry Nodes a un objeto
     a partir de datos JSON.
@@ -8,169 +35,22 @@ def build_and_apply_node_tree(obj, data):
     Args:
         obj: El objeto al que aplicar el árbol de nodos
         data: Diccionario con los datos del árbol de nodos
+        diagnostics (BuildDiagnostics): Registro de problemas (opcional)
     
     Returns:
         bool: True si se aplicó correctamente, False en caso contrario
     """
     try:
-        # Añadir modificador de Geometry Nodes si no existe
-        gn_mod = None
-        for mod in obj.modifiers:
-            if mod.type == 'NODES':
-                gn_mod = mod
-                break
-        
-        if not gn_mod:
-            gn_mod = obj.modifiers.new(name="GeometryNodes", type='NODES')
-        
-        # Eliminar cualquier árbol de nodos existente
-        if gn_mod.node_group:
-            old_node_group = gn_mod.node_group
-            gn_mod.node_group = None
-            try:
-                bpy.data.node_groups.remove(old_node_group)
-            except:
-                print(f"No se pudo eliminar el árbol de nodos anterior: {old_node_group.name}")
-        
-        # Crear un nuevo árbol de nodos desde cero
-        node_tree = bpy.data.node_groups.new(name=data.get("name", "GeometryNodes"), type='GeometryNodeTree')
-        
-        # Asignar el árbol de nodos al modificador
-        gn_mod.node_group = node_tree
-        
-        # Crear nodos de entrada y salida básicos
-        input_node = node_tree.nodes.new('NodeGroupInput')
-        input_node.location = (-400, 0)
-        
-        output_node = node_tree.nodes.new('NodeGroupOutput')
-        output_node.location = (400, 0)
-        output_node.is_active_output = True
+        apply_plan(obj, template_plan.compile_template(data), diagnostics)
+        undo_batch.record()
         
-        # Intentar crear interfaces del árbol de nodos
-        try:
-            # Crear las interfaces del árbol de nodos (para Blender 2.93+)
-            if hasattr(node_tree, 'inputs') and hasattr(node_tree, 'outputs'):
-                geometry_in = node_tree.inputs.new('NodeSocketGeometry', "Geometry")
-                geometry_out = node_tree.outputs.new('NodeSocketGeometry', "Geometry")
-        except Exception as e:
-            print(f"No se pudieron crear interfaces: {str(e)}")
-            # En versiones más recientes, las interfaces se crean automáticamente
-        
-        # Crear nodos según el JSON
-        nodes = {}
-        nodes['input'] = input_node
-        nodes['output'] = output_node
-        
-        for node_data in data.get("nodes", []):
-            node_id = node_data["id"]
-            node_type = node_data["type"]
-            
-            # Saltar nodos de entrada y salida, ya los hemos creado
-            if node_type in ['NodeGroupInput', 'NodeGroupOutput']:
-                continue
-                
-            node_location = node_data.get("location", (0, 0))
-            
-            # Crear nodo
-            try:
-                node = node_tree.nodes.new(node_type)
-                node.location = node_location
-                nodes[node_id] = node
-                
-                # Configurar inputs si existen
-                if "inputs" in node_data:
-                    for input_name, input_value in node_data["inputs"].items():
-                        if input_name in node.inputs:
-                            # Asignar valor según el tipo
-                            if isinstance(input_value, (list, tuple)) and len(input_value) > 0:
-                                # Para vectores y colores
-                                if hasattr(node.inputs[input_name], "default_value") and hasattr(node.inputs[input_name].default_value, "__len__"):
-                                    if len(input_value) <= len(node.inputs[input_name].default_value):
-                                        for i, val in enumerate(input_value):
-                                            node.inputs[input_name].default_value[i] = val
-                            else:
-                                # Para valores escalares
-                                if hasattr(node.inputs[input_name], "default_value"):
-                                    node.inputs[input_name].default_value = input_value
-            except Exception as e:
-                print(f"Error al crear nodo {node_type}: {str(e)}")
-        
-        # Crear links
-        for link_data in data.get("links", []):
-            try:
-                from_node_id = link_data["from_node"]
-                from_socket_name = link_data["from_socket"]
-                to_node_id = link_data["to_node"]
-                to_socket_name = link_data["to_socket"]
-                
-                # Ajustar IDs para nodos de entrada y salida
-                if from_node_id == "input" or (from_node_id not in nodes and from_socket_name == "Geometry"):
-                    from_node_id = "input"
-                    from_socket_name = "Geometry"
-                
-                if to_node_id == "output" or (to_node_id not in nodes and to_socket_name == "Geometry"):
-                    to_node_id = "output"
-                    to_socket_name = "Geometry"
-                
-                if from_node_id in nodes and to_node_id in nodes:
-                    from_node = nodes[from_node_id]
-                    to_node = nodes[to_node_id]
-                    
-                    # Buscar sockets por nombre
-                    from_socket = None
-                    to_socket = None
-                    
-                    for output in from_node.outputs:
-                        if output.name == from_socket_name:
-                            from_socket = output
-                            break
-                    
-                    for input in to_node.inputs:
-                        if input.name == to_socket_name:
-                            to_socket = input
-                            break
-                    
-                    # Si no se encontraron por nombre, intentar por índice
-                    if from_socket is None and from_socket_name.isdigit():
-                        idx = int(from_socket_name)
-                        if idx < len(from_node.outputs):
-                            from_socket = from_node.outputs[idx]
-                    
-                    if to_socket is None and to_socket_name.isdigit():
-                        idx = int(to_socket_name)
-                        if idx < len(to_node.inputs):
-                            to_socket = to_node.inputs[idx]
-                    
-                    # Crear link si se encontraron los sockets
-                    if from_socket and to_socket:
-                        node_tree.links.new(from_socket, to_socket)
-            except Exception as e:
-                print(f"Error al crear link: {str(e)}")
-        
-        # Si no hay links, conectar directamente entrada y salida
-        if len(node_tree.links) == 0:
-            try:
-                # Intentar conectar el primer socket de salida del nodo de entrada
-                # con el primer socket de entrada del nodo de salida
-                if len(input_node.outputs) > 0 and len(output_node.inputs) > 0:
-                    node_tree.links.new(input_node.outputs[0], output_node.inputs[0])
-            except Exception as e:
-                print(f"Error al crear link directo: {str(e)}")
-        
-        # Asegurarse de que el nodo de salida esté marcado como activo
-        for node in node_tree.nodes:
-            if node.type == 'GROUP_OUTPUT':
-                node.is_active_output = True
-        
-        # Intentar actualizar la interfaz para reflejar los cambios
-        try:
-            if hasattr(bpy.context, 'view_layer'):
-                bpy.context.view_layer.update()
-        except Exception as e:
-            print(f"Error al actualizar view_layer: {str(e)}")
+        # Actualizar la capa de vista para reflejar los cambios; dentro de un lote la
+        # actualización se hace una sola vez al cerrarlo
+        view_layer = bpy.context.view_layer
+        if view_layer is not None and not undo_batch.in_batch():
+            view_layer.update()
         
         return True
-    
     except Exception as e:
         print(f"Error al construir el árbol de nodos: {str(e)}")
         return False
@@ -200,13 +80,10 @@ def setup_node_tree_io(node_group):
         output_node = node_group.nodes.new(type='NodeGroupOutput')
         output_node.location = (600, 0)
     
-    # Asegurarse de que hay una entrada de geometría
-    if 'Geometry' not in [input.name for input in node_group.inputs]:
-        node_group.inputs.new('NodeSocketGeometry', "Geometry")
-    
-    # Asegurarse de que hay una salida de geometría
-    if 'Geometry' not in [output.name for output in node_group.outputs]:
-        node_group.outputs.new('NodeSocketGeometry', "Geometry")
+    # Asegurarse de que hay una entrada y una salida de geometría
+    for in_out in ('INPUT', 'OUTPUT'):
+        if 'Geometry' not in [socket.name for socket in blender_api.interface_sockets(node_group, in_out)]:
+            blender_api.new_socket(node_group, "Geometry", in_out, 'NodeSocketGeometry')
 
 def create_nodes(node_group, nodes_data):
     """
@@ -302,4 +179,718 @@ def create_links(node_group, links_data, node_map):
         
         # Crear el enlace si se encontraron los sockets
         if from_socket is not None and to_socket is not None:
-            node_group.links.new(from_socket, to_socket) 
\ No newline at end of file
+            node_group.links.new(from_socket, to_socket)
+
+# Función para configurar un árbol de nodos de geometría
+def setup_geometry_node_tree(node_tree):
+    """
+    Configura un árbol de nodos de geometría para asegurar que tenga nodos de entrada y salida
+    correctamente conectados.
+    
+    Args:
+        node_tree: El árbol de nodos a configurar
+        
+    Returns:
+        tuple: (input_node, output_node) - Los nodos de entrada y salida
+    """
+    logger.debug(f"Configurando árbol de nodos: {node_tree.name}")
+    
+    # Buscar nodos de entrada y salida existentes
+    input_node = None
+    output_node = None
+    
+    for node in node_tree.nodes:
+        if node.type == 'GROUP_INPUT':
+            input_node = node
+            logger.debug(f"Nodo de entrada encontrado: {node.name}")
+        elif node.type == 'GROUP_OUTPUT':
+            output_node = node
+            logger.debug(f"Nodo de salida encontrado: {node.name}")
+    
+    # Crear nodos si no existen
+    if not input_node:
+        logger.info("Creando nodo de entrada")
+        input_node = node_tree.nodes.new('NodeGroupInput')
+        input_node.location = (-200, 0)
+    
+    if not output_node:
+        logger.info("Creando nodo de salida")
+        output_node = node_tree.nodes.new('NodeGroupOutput')
+        output_node.location = (200, 0)
+        output_node.is_active_output = True
+    else:
+        output_node.is_active_output = True
+    
+    # Asegurar que el nodo de salida esté marcado como activo
+    output_node.select = True
+    node_tree.nodes.active = output_node
+    
+    # Los adaptadores de blender_api resuelven la API de interfaces (3.x o 4.x)
+    has_input_interface = bool(blender_api.interface_sockets(node_tree, 'INPUT'))
+    has_output_interface = bool(blender_api.interface_sockets(node_tree, 'OUTPUT'))
+    
+    # Si no hay interfaces, crearlas
+    if not has_input_interface or not has_output_interface:
+        blender_api.clear_sockets(node_tree)
+        logger.debug("Creando sockets de geometría")
+        blender_api.new_socket(node_tree, "Geometry", 'INPUT', 'NodeSocketGeometry')
+        blender_api.new_socket(node_tree, "Geometry", 'OUTPUT', 'NodeSocketGeometry')
+    
+    return input_node, output_node
+
+def add_interface_sockets(node_tree, plan):
+    """
+    Añade a la interfaz del árbol los sockets del plan que todavía no existen.
+    
+    Args:
+        node_tree: El árbol de nodos a configurar
+        plan (dict): Plan compilado con las listas 'inputs' y 'outputs'
+    """
+    for in_out, sockets in (('INPUT', plan["inputs"]), ('OUTPUT', plan["outputs"])):
+        existing = {item.name for item in blender_api.interface_sockets(node_tree, in_out)}
+        for socket in sockets:
+            if socket["name"] in existing:
+                continue
+            item = blender_api.new_socket(node_tree, socket["name"], in_out, socket["type"])
+            if "default" in socket and hasattr(item, "default_value"):
+                item.default_value = socket["default"]
+
+def find_socket(sockets, key):
+    """
+    Busca un socket por nombre, después por identificador y, si no existe, por índice.
+    
+    El identificador distingue los sockets con el mismo nombre (p. ej. 'Value' y
+    'Value_001' en un nodo Math) y es lo que usan las plantillas exportadas. Entre
+    varios sockets con el mismo nombre se prefiere el habilitado: en algunas versiones
+    nodos como GeometryNodeSwitch tienen un juego de sockets homónimos por tipo de
+    datos y solo están habilitados los del tipo elegido.
+    
+    Args:
+        sockets: Colección de sockets (node.inputs o node.outputs)
+        key (str): Nombre, identificador o índice del socket
+        
+    Returns:
+        El socket encontrado o None
+    """
+    socket = sockets.get(key)
+    if socket is not None:
+        if socket.enabled:
+            return socket
+        enabled = next((other for other in sockets if other.name == key and other.enabled), None)
+        return enabled if enabled is not None else socket
+    
+    for socket in sockets:
+        if socket.identifier == key:
+            return socket
+    
+    if key.isdigit():
+        idx = int(key)
+        if idx < len(sockets):
+            return sockets[idx]
+    
+    return None
+
+# Tipos de Python aceptados por cada tipo de socket escalar
+_SCALAR_SOCKET_TYPES = {
+    'VALUE': (int, float),
+    'INT': (int,),
+    'BOOLEAN': (bool, int),
+    'STRING': (str,),
+    'MENU': (str,),
+}
+
+def set_socket_value(socket, value):
+    """
+    Asigna un valor por defecto a un socket de entrada.
+    
+    Args:
+        socket: Socket de entrada
+        value: Valor escalar o secuencia (vectores y colores)
+        
+    Returns:
+        bool: True si el valor es compatible con el socket y se asignó
+    """
+    if not hasattr(socket, "default_value"):
+        return False
+    
+    if isinstance(value, (list, tuple)) and len(value) > 0:
+        # Para vectores y colores
+        default_value = socket.default_value
+        if not hasattr(default_value, "__len__") or len(value) > len(default_value):
+            return False
+        for i, val in enumerate(value):
+            default_value[i] = val
+        return True
+    
+    # Para valores escalares; un entero escrito como 5.0 en JSON se acepta en sockets INT
+    if socket.type == 'INT' and isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if not isinstance(value, _SCALAR_SOCKET_TYPES.get(socket.type, ())):
+        return False
+    socket.default_value = value
+    return True
+
+def node_type_exists(node_type):
+    """Indica si un tipo de nodo existe, sin provocar excepciones al crear el nodo"""
+    return blender_api.node_type_exists(node_type)
+
+def create_plan_node(node_tree, node_data, diagnostics, subgraphs=None):
+    """
+    Crea un nodo del plan en un árbol y configura sus propiedades y entradas.
+    
+    Args:
+        node_tree: Árbol de nodos donde crear el nodo
+        node_data (dict): Nodo normalizado del plan
+        diagnostics (BuildDiagnostics): Registro de problemas
+        subgraphs (dict): Subgrafos del plan por hash (para los nodos de grupo)
+        
+    Returns:
+        El nodo creado o None si el tipo no existe (sin posición, ver write_locations)
+    """
+    if not node_type_exists(node_data["type"]):
+        diagnostics.record("unknown_node_type", f"{node_data['id']}: {node_data['type']}")
+        return None
+    
+    subplan = None
+    if "subgraph" in node_data:
+        subplan = (subgraphs or {}).get(node_data["subgraph"])
+        if subplan is None:
+            diagnostics.record("unknown_node", f"{node_data['id']}: subgrafo {node_data['subgraph'][:8]}")
+            return None
+    
+    node = node_tree.nodes.new(node_data["type"])
+    node.name = node_data["id"]
+    
+    # El subgrafo se construye una sola vez y se comparte entre todos sus usos;
+    # sus sockets existen en cuanto se asigna el árbol al nodo
+    if subplan is not None:
+        node.node_tree = get_or_build_node_group(subplan, diagnostics)
+    
+    for prop_name, prop_value in node_data["properties"].items():
+        set_node_property(node, prop_name, prop_value, diagnostics)
+    
+    for input_name, input_value in node_data["inputs"].items():
+        set_node_input(node, input_name, input_value, diagnostics)
+    
+    return node
+
+def set_node_property(node, prop_name, prop_value, diagnostics):
+    """
+    Asigna una propiedad de un nodo tras comprobar que existe y admite el valor.
+    
+    Args:
+        node: Nodo de Blender
+        prop_name (str): Identificador de la propiedad
+        prop_value: Valor a asignar
+        diagnostics (BuildDiagnostics): Registro de problemas
+    """
+    prop = node.bl_rna.properties.get(prop_name)
+    if prop is None or prop.is_readonly:
+        diagnostics.record("invalid_property", f"{node.name}.{prop_name}")
+        return
+    
+    if prop.type == 'ENUM' and not prop.is_enum_flag and len(prop.enum_items) > 0:
+        if prop.enum_items.get(prop_value) is None:
+            diagnostics.record("invalid_value", f"{node.name}.{prop_name} = {prop_value!r}")
+            return
+    
+    setattr(node, prop_name, prop_value)
+
+def set_node_input(node, input_name, input_value, diagnostics):
+    """
+    Asigna el valor por defecto de una entrada de un nodo.
+    
+    Args:
+        node: Nodo de Blender
+        input_name (str): Nombre o índice del socket
+        input_value: Valor a asignar
+        diagnostics (BuildDiagnostics): Registro de problemas
+    """
+    socket = find_socket(node.inputs, input_name)
+    if socket is None:
+        diagnostics.record("missing_socket", f"{node.name}: entrada '{input_name}'")
+    elif not set_socket_value(socket, input_value):
+        diagnostics.record("invalid_value", f"{node.name}.{input_name} = {input_value!r}")
+
+def create_plan_links(node_tree, nodes, plan, diagnostics):
+    """
+    Crea los enlaces de un plan entre los nodos ya creados.
+    
+    Si no se crea ningún enlace, se conectan directamente la entrada y la salida.
+    
+    Args:
+        node_tree: Árbol de nodos
+        nodes (dict): Mapeo de IDs del plan a nodos de Blender ('input' y 'output' incluidos)
+        plan (dict): Plan compilado
+        diagnostics (BuildDiagnostics): Registro de problemas
+        
+    Returns:
+        int: Número de enlaces creados
+    """
+    links_created = 0
+    for from_node_id, from_socket_name, to_node_id, to_socket_name in plan["links"]:
+        from_node = nodes.get(from_node_id)
+        to_node = nodes.get(to_node_id)
+        if from_node is None or to_node is None:
+            # El nodo no se pudo crear y ya se registró
+            continue
+        
+        from_socket = find_socket(from_node.outputs, from_socket_name)
+        to_socket = find_socket(to_node.inputs, to_socket_name)
+        
+        if from_socket is not None and to_socket is not None:
+            node_tree.links.new(from_socket, to_socket)
+            links_created += 1
+        else:
+            diagnostics.record("missing_socket", f"{from_node_id}.{from_socket_name} -> {to_node_id}.{to_socket_name}")
+            metrics.inc("links_failed_total")
+    
+    # Si no hay links, conectar directamente entrada y salida
+    input_node = nodes['input']
+    output_node = nodes['output']
+    if links_created == 0 and len(input_node.outputs) > 0 and len(output_node.inputs) > 0:
+        node_tree.links.new(input_node.outputs[0], output_node.inputs[0])
+        links_created += 1
+    
+    return links_created
+
+def write_locations(node_tree, nodes, plan):
+    """
+    Escribe de una sola vez las posiciones de todos los nodos de un árbol.
+    
+    Args:
+        node_tree: Árbol de nodos
+        nodes (dict): Mapeo de IDs del plan a nodos de Blender ('input' y 'output' incluidos)
+        plan (dict): Plan compilado (con 'io_locations' si se distribuyó automáticamente)
+    """
+    locations = {node_data["id"]: node_data["location"] for node_data in plan["nodes"]}
+    if plan.get("io_locations"):
+        locations['input'], locations['output'] = plan["io_locations"]
+    
+    by_name = {node.name: locations[node_id] for node_id, node in nodes.items() if node_id in locations}
+    flat = []
+    for node in node_tree.nodes:
+        location = by_name.get(node.name)
+        flat.extend(location if location is not None else node.location)
+    node_tree.nodes.foreach_set("location", flat)
+
+def build_node_group_from_plan(plan, name=None, diagnostics=None):
+    """
+    Construye un nuevo árbol de Geometry Nodes a partir de un plan compilado.
+    
+    Args:
+        plan (dict): Plan generado por template_plan.compile_template
+        name (str): Nombre del árbol (por defecto, el del plan)
+        diagnostics (BuildDiagnostics): Registro de problemas (opcional)
+        
+    Returns:
+        bpy.types.GeometryNodeTree: El árbol construido
+    """
+    if diagnostics is None:
+        diagnostics = BuildDiagnostics()
+    diagnostics.extend(plan.get("issues", ()))
+    start = time.perf_counter()
+    
+    # Árbol recién creado: no hace falta buscar nodos ni sockets existentes
+    node_tree = bpy.data.node_groups.new(name=name or plan["name"], type='GeometryNodeTree')
+    try:
+        input_node, output_node = blender_api.create_io_nodes(node_tree)
+        add_interface_sockets(node_tree, plan)
+        
+        nodes = {'input': input_node, 'output': output_node}
+        
+        subgraphs = plan.get("subgraphs")
+        for node_data in plan["nodes"]:
+            node = create_plan_node(node_tree, node_data, diagnostics, subgraphs)
+            if node is not None:
+                nodes[node_data["id"]] = node
+        
+        write_locations(node_tree, nodes, plan)
+        links_created = create_plan_links(node_tree, nodes, plan, diagnostics)
+    except Exception:
+        # No dejar en bpy.data un árbol a medio construir que nadie va a usar
+        bpy.data.node_groups.remove(node_tree)
+        raise
+    
+    output_node.is_active_output = True
+    node_tree[PLAN_HASH_PROP] = plan["hash"]
+    
+    metrics.observe("build_seconds", time.perf_counter() - start)
+    metrics.inc("nodes_created_total", len(nodes))
+    metrics.inc("links_created_total", links_created)
+    logger.info(f"Árbol {node_tree.name} construido: {len(plan['nodes'])} nodos, {links_created} links")
+    return node_tree
+
+def _get_socket_signature(node_data, scratch_tree, diagnostics):
+    """
+    Obtiene los sockets que tendrá un nodo con ciertas propiedades.
+    
+    Se crea el nodo una sola vez en un árbol auxiliar y el resultado se guarda
+    en caché por tipo y propiedades.
+    
+    Returns:
+        tuple: (nombres e identificadores de entradas, nº de entradas,
+                nombres e identificadores de salidas, nº de salidas)
+    """
+    key = (node_data["type"], json.dumps(node_data["properties"], sort_keys=True, default=str))
+    signature = _socket_signatures.get(key)
+    if signature is not None:
+        return signature
+    
+    node = scratch_tree.nodes.new(node_data["type"])
+    for prop_name, prop_value in node_data["properties"].items():
+        set_node_property(node, prop_name, prop_value, diagnostics)
+    # Solo los sockets habilitados con esas propiedades pueden recibir valores o enlaces
+    signature = ({key for socket in node.inputs if socket.enabled for key in (socket.name, socket.identifier)},
+                 len(node.inputs),
+                 {key for socket in node.outputs if socket.enabled for key in (socket.name, socket.identifier)},
+                 len(node.outputs))
+    scratch_tree.nodes.remove(node)
+    
+    _socket_signatures[key] = signature
+    return signature
+
+def _signature_has_socket(names, count, key):
+    return key in names or (key.isdigit() and int(key) < count)
+
+def _interface_signature(plan):
+    """Sockets de un nodo de grupo que instancia el plan de un subgrafo"""
+    inputs = {socket["name"] for socket in plan["inputs"]}
+    outputs = {socket["name"] for socket in plan["outputs"]}
+    return (inputs, len(inputs), outputs, len(outputs))
+
+def validate_plan(plan, diagnostics, _validated=None):
+    """
+    Comprueba un plan contra la versión de Blender en uso sin tocar la escena.
+    
+    Verifica que existan los tipos de nodo, las propiedades, las entradas con valor
+    y los sockets de cada enlace, también dentro de los subgrafos. Se usa en modo
+    estricto antes de aplicar.
+    
+    Args:
+        plan (dict): Plan compilado
+        diagnostics (BuildDiagnostics): Registro donde se anotan los problemas
+        
+    Returns:
+        bool: True si el plan no tiene problemas
+    """
+    before = diagnostics.total
+    diagnostics.extend(plan.get("issues", ()))
+    
+    # Cada subgrafo se valida una sola vez aunque se use en muchos nodos
+    if _validated is None:
+        _validated = set()
+    subgraphs = plan.get("subgraphs") or {}
+    
+    interface_inputs = {socket["name"] for socket in plan["inputs"]}
+    interface_outputs = {socket["name"] for socket in plan["outputs"]}
+    signatures = {
+        'input': (set(), 0, interface_inputs, len(interface_inputs)),
+        'output': (interface_outputs, len(interface_outputs), set(), 0),
+    }
+    
+    scratch_tree = None
+    try:
+        for node_data in plan["nodes"]:
+            if "subgraph" in node_data:
+                subplan = subgraphs.get(node_data["subgraph"])
+                if subplan is None:
+                    diagnostics.record("unknown_node", f"{node_data['id']}: subgrafo {node_data['subgraph'][:8]}")
+                    continue
+                if subplan["hash"] not in _validated:
+                    _validated.add(subplan["hash"])
+                    validate_plan(subplan, diagnostics, _validated)
+                signature = _interface_signature(subplan)
+                signatures[node_data["id"]] = signature
+                for input_name in node_data["inputs"]:
+                    if not _signature_has_socket(signature[0], signature[1], input_name):
+                        diagnostics.record("missing_socket", f"{node_data['id']}: entrada '{input_name}'")
+                continue
+            
+            if not node_type_exists(node_data["type"]):
+                diagnostics.record("unknown_node_type", f"{node_data['id']}: {node_data['type']}")
+                continue
+            
+            if scratch_tree is None:
+                scratch_tree = bpy.data.node_groups.new(name=".sciblend_validation", type='GeometryNodeTree')
+            signature = _get_socket_signature(node_data, scratch_tree, diagnostics)
+            signatures[node_data["id"]] = signature
+            
+            for input_name in node_data["inputs"]:
+                if not _signature_has_socket(signature[0], signature[1], input_name):
+                    diagnostics.record("missing_socket", f"{node_data['id']}: entrada '{input_name}'")
+    finally:
+        # El árbol auxiliar no debe sobrevivir a una validación interrumpida
+        if scratch_tree is not None:
+            bpy.data.node_groups.remove(scratch_tree)
+    
+    for from_node_id, from_socket_name, to_node_id, to_socket_name in plan["links"]:
+        from_signature = signatures.get(from_node_id)
+        to_signature = signatures.get(to_node_id)
+        if from_signature is None or to_signature is None:
+            continue
+        if (not _signature_has_socket(from_signature[2], from_signature[3], from_socket_name)
+                or not _signature_has_socket(to_signature[0], to_signature[1], to_socket_name)):
+            diagnostics.record("missing_socket", f"{from_node_id}.{from_socket_name} -> {to_node_id}.{to_socket_name}")
+    
+    return diagnostics.total == before
+
+def make_private_node_group(gn_mod):
+    """
+    Garantiza que el árbol de un modificador no lo comparte nadie más.
+    
+    Los árboles de la caché se comparten entre todos los objetos con el mismo hash de
+    plan (también presets y plantillas de igual estructura), así que antes de editar
+    uno en el sitio se sustituye en el modificador por una copia fuera de la caché.
+    
+    Args:
+        gn_mod: Modificador de Geometry Nodes
+        
+    Returns:
+        bpy.types.GeometryNodeTree: El árbol propio del modificador
+    """
+    node_tree = gn_mod.node_group
+    if node_tree.users <= 1 and node_tree.get(PLAN_HASH_PROP) is None:
+        return node_tree
+    
+    private_tree = node_tree.copy()
+    if PLAN_HASH_PROP in private_tree:
+        del private_tree[PLAN_HASH_PROP]
+    gn_mod.node_group = private_tree
+    logger.info(f"Copia propia {private_tree.name} del árbol compartido {node_tree.name}")
+    # Si el modificador era su único usuario, el original pasa a la caché de árboles sin usar
+    release_node_group(node_tree)
+    return private_tree
+
+def patch_node_group(node_tree, plan, patch, diagnostics=None):
+    """
+    Actualiza en el sitio un árbol construido desde un plan según un parche.
+    
+    El árbol no debe ser de la caché ni estar compartido (ver make_private_node_group):
+    el parche cambiaría a la vez todos los objetos que lo usan.
+    
+    Args:
+        node_tree: Árbol construido desde el plan anterior
+        plan (dict): Nuevo plan compilado
+        patch (dict): Diferencias generadas por template_diff.diff_plans
+        diagnostics (BuildDiagnostics): Registro de problemas (opcional)
+    """
+    if diagnostics is None:
+        diagnostics = BuildDiagnostics()
+    
+    nodes = {}
+    for node in node_tree.nodes:
+        if node.type == 'GROUP_INPUT':
+            nodes['input'] = node
+        elif node.type == 'GROUP_OUTPUT':
+            nodes['output'] = node
+        else:
+            nodes[node.name] = node
+    
+    for node_id in patch["removed_nodes"]:
+        node = nodes.pop(node_id, None)
+        if node is not None:
+            node_tree.nodes.remove(node)
+    
+    for node_data in patch["added_nodes"]:
+        node = create_plan_node(node_tree, node_data, diagnostics, plan.get("subgraphs"))
+        if node is not None:
+            node.location = node_data["location"]
+            nodes[node_data["id"]] = node
+    
+    for node_id, prop_name, prop_value in patch["properties"]:
+        if node_id in nodes:
+            set_node_property(nodes[node_id], prop_name, prop_value, diagnostics)
+    
+    for node_id, input_name, input_value in patch["inputs"]:
+        if node_id in nodes:
+            set_node_input(nodes[node_id], input_name, input_value, diagnostics)
+    
+    for node_id, location in patch["locations"]:
+        if node_id in nodes:
+            nodes[node_id].location = location
+    
+    if patch["links_changed"]:
+        node_tree.links.clear()
+        create_plan_links(node_tree, nodes, plan, diagnostics)
+    
+    logger.info(f"Árbol {node_tree.name} actualizado: +{len(patch['added_nodes'])} "
+                f"-{len(patch['removed_nodes'])} nodos, {len(patch['inputs'])} valores")
+
+def find_cached_node_group(plan_hash):
+    """
+    Busca un árbol ya construido para un hash de plan.
+    
+    Args:
+        plan_hash (str): Hash de contenido del plan
+        
+    Returns:
+        bpy.types.GeometryNodeTree: El árbol en caché o None
+    """
+    name = _node_group_cache.get(plan_hash)
+    if name is not None:
+        node_group = bpy.data.node_groups.get(name)
+        if node_group is not None and node_group.get(PLAN_HASH_PROP) == plan_hash:
+            return node_group
+        del _node_group_cache[plan_hash]
+    
+    # El árbol puede venir de un .blend guardado en otra sesión
+    for node_group in bpy.data.node_groups:
+        if node_group.get(PLAN_HASH_PROP) == plan_hash:
+            _node_group_cache[plan_hash] = node_group.name
+            return node_group
+    
+    return None
+
+def cache_node_group(plan_hash, node_group):
+    """Registra en la caché un árbol construido fuera de get_or_build_node_group"""
+    node_group[PLAN_HASH_PROP] = plan_hash
+    _node_group_cache[plan_hash] = node_group.name
+
+def get_or_build_node_group(plan, diagnostics=None):
+    """
+    Devuelve el árbol de nodos de un plan, construyéndolo solo si no está en caché.
+    
+    Args:
+        plan (dict): Plan compilado
+        diagnostics (BuildDiagnostics): Registro de problemas (opcional); en un acierto
+            de caché recibe los problemas de la construcción original
+        
+    Returns:
+        bpy.types.GeometryNodeTree: El árbol compartido para ese plan
+    """
+    node_group = find_cached_node_group(plan["hash"])
+    if node_group is not None:
+        logger.debug(f"Árbol en caché para {plan['name']}: {node_group.name}")
+        metrics.inc("cache_hits_total")
+        if diagnostics is not None and plan["hash"] in _build_diagnostics:
+            diagnostics.merge(_build_diagnostics[plan["hash"]])
+        return node_group
+    
+    metrics.inc("cache_misses_total")
+    build_diagnostics = BuildDiagnostics()
+    node_group = build_node_group_from_plan(plan, diagnostics=build_diagnostics)
+    _node_group_cache[plan["hash"]] = node_group.name
+    _build_diagnostics[plan["hash"]] = build_diagnostics
+    if diagnostics is not None:
+        diagnostics.merge(build_diagnostics)
+    return node_group
+
+def release_node_group(node_group):
+    """
+    Elimina un árbol que se ha quedado sin usuarios.
+    
+    Los árboles construidos desde un plan se conservan como caché hasta que hay más de
+    MAX_UNUSED_PLAN_TREES sin usuarios; entonces se eliminan los liberados hace más
+    tiempo y se reconstruyen si vuelven a pedirse.
+    
+    Args:
+        node_group: El árbol liberado
+    """
+    if node_group.users > 0:
+        return
+    
+    if node_group.get(PLAN_HASH_PROP) is not None:
+        _unused_plan_trees.pop(node_group.name, None)
+        _unused_plan_trees[node_group.name] = None
+        _evict_unused_plan_trees()
+        return
+    
+    _remove_node_group(node_group)
+
+def _remove_node_group(node_group):
+    name = node_group.name
+    subtrees = [node.node_tree for node in node_group.nodes
+                if node.bl_idname == template_plan.GROUP_NODE_TYPE and node.node_tree is not None]
+    try:
+        bpy.data.node_groups.remove(node_group)
+    except (ReferenceError, RuntimeError) as e:
+        logger.warning(f"No se pudo eliminar el árbol de nodos anterior: {name}: {str(e)}")
+        metrics.inc("orphaned_groups_total")
+        return
+    
+    # Los subgrafos y las etapas de una pila pueden quedarse sin usuarios al eliminarlo
+    for subtree in subtrees:
+        release_node_group(subtree)
+
+def _evict_unused_plan_trees():
+    for name in list(_unused_plan_trees):
+        node_group = bpy.data.node_groups.get(name)
+        if node_group is None or node_group.users > 0 or node_group.get(PLAN_HASH_PROP) is None:
+            del _unused_plan_trees[name]
+    
+    while len(_unused_plan_trees) > MAX_UNUSED_PLAN_TREES:
+        name = next(iter(_unused_plan_trees))
+        del _unused_plan_trees[name]
+        node_group = bpy.data.node_groups[name]
+        plan_hash = node_group[PLAN_HASH_PROP]
+        if _node_group_cache.get(plan_hash) == name:
+            del _node_group_cache[plan_hash]
+            _build_diagnostics.pop(plan_hash, None)
+        logger.debug(f"Árbol sin usuarios expulsado de la caché: {name}")
+        metrics.inc("evicted_groups_total")
+        _remove_node_group(node_group)
+
+def get_geometry_nodes_modifier(obj):
+    """
+    Devuelve el primer modificador de Geometry Nodes del objeto, creándolo si no existe.
+    
+    Args:
+        obj: Objeto de Blender
+        
+    Returns:
+        bpy.types.NodesModifier: El modificador
+    """
+    for mod in obj.modifiers:
+        if mod.type == 'NODES':
+            return mod
+    
+    logger.info(f"Creando nuevo modificador GeometryNodes en {obj.name}")
+    return obj.modifiers.new(name="GeometryNodes", type='NODES')
+
+def apply_plan(obj, plan, diagnostics=None):
+    """
+    Aplica un plan a un objeto usando el árbol compartido de la caché.
+    
+    Args:
+        obj: El objeto al que aplicar el árbol de nodos
+        plan (dict): Plan compilado
+        diagnostics (BuildDiagnostics): Registro de problemas (opcional)
+        
+    Returns:
+        bpy.types.NodesModifier: El modificador con el árbol asignado
+    """
+    node_group = get_or_build_node_group(plan, diagnostics)
+    gn_mod = get_geometry_nodes_modifier(obj)
+    
+    old_node_group = gn_mod.node_group
+    if old_node_group is not node_group:
+        gn_mod.node_group = node_group
+        if old_node_group is not None:
+            release_node_group(old_node_group)
+    
+    # Forzar actualización del modificador
+    gn_mod.show_viewport = False
+    gn_mod.show_viewport = True
+    metrics.inc("applies_total")
+    return gn_mod
+
+def set_modifier_input(gn_mod, name, value):
+    """
+    Asigna el valor de una entrada expuesta del grupo en un modificador.
+    
+    Args:
+        gn_mod: Modificador de Geometry Nodes
+        name (str): Nombre del socket de entrada en la interfaz del grupo
+        value: Valor a asignar
+        
+    Returns:
+        bool: True si la entrada existe y se asignó
+    """
+    for item in blender_api.interface_sockets(gn_mod.node_group, 'INPUT'):
+        if item.name == name:
+            gn_mod[item.identifier] = value
+            return True
+    
+    logger.warning(f"El grupo {gn_mod.node_group.name} no tiene la entrada {name}")
+    return False
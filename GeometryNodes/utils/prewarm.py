@@ -0,0 +1,188 @@
+import bpy
+import os
+import sys
+import glob
+import time
+import queue
+import logging
+import threading
+
+from . import node_builder, template_plan
+from .diagnostics import BuildDiagnostics
+
+logger = logging.getLogger("GeometryNodes")
+
+# Directorio con las plantillas incluidas en el addon
+BUILTIN_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "json_templates")
+
+# Tiempo máximo por llamada del temporizador construyendo árboles, para no bloquear la interfaz
+BUILD_BUDGET = 0.005
+
+# Segundos entre llamadas del temporizador mientras quedan árboles por construir
+BUILD_INTERVAL = 0.1
+
+# Planes compilados por el hilo de trabajo y pendientes de construir en el hilo principal
+_pending = queue.SimpleQueue()
+
+# Planes ya precalentados: hash -> plan (para reconstruir sus árboles al cargar otro archivo)
+_warmed = {}
+
+# Precalentamiento en curso: {"thread", "stop", "validate"} o None
+_state = None
+
+def template_directories():
+    """
+    Directorios de plantillas a precalentar: json_templates/ y los de la variable de
+    entorno SCIBLEND_TEMPLATE_DIRS (separados por os.pathsep).
+
+    Returns:
+        list: Rutas absolutas de los directorios existentes, sin repetir
+    """
+    directories = [BUILTIN_TEMPLATE_DIR]
+    directories += [path for path in os.environ.get("SCIBLEND_TEMPLATE_DIRS", "").split(os.pathsep) if path]
+    result = []
+    for directory in directories:
+        directory = os.path.abspath(os.path.expanduser(directory))
+        if os.path.isdir(directory) and directory not in result:
+            result.append(directory)
+    return result
+
+def _lower_priority():
+    """Baja la prioridad del hilo actual en el planificador, donde el sistema lo permite"""
+    # Solo Linux aplica la prioridad por hilo; en otros sistemas el identificador del
+    # hilo se interpretaría como el de otro proceso
+    if not sys.platform.startswith("linux"):
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+def _compile_all(directories, stop, throttle):
+    """
+    Hilo de trabajo: lee y compila todas las plantillas sin tocar bpy.
+
+    Los planes quedan en la caché de template_plan, de modo que la primera aplicación
+    de cada plantilla ya no lee ni compila el archivo.
+    """
+    _lower_priority()
+    start = time.perf_counter()
+    compiled = 0
+    issues = 0
+    for directory in directories:
+        for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            if stop.is_set():
+                return
+            try:
+                plan = template_plan.load_template(path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Precalentamiento: no se pudo compilar {path}: {str(e)}")
+                continue
+            compiled += 1
+            issues += len(plan.get("issues", ()))
+            _pending.put(plan)
+            # Ceder el intérprete al hilo principal entre plantillas
+            stop.wait(throttle)
+
+    elapsed = (time.perf_counter() - start) * 1000.0
+    logger.info(f"Precalentamiento: {compiled} plantillas compiladas en {elapsed:.0f} ms "
+                f"({issues} problemas)")
+
+def _build_pending():
+    """
+    Callback de bpy.app.timers: construye los árboles de los planes compilados.
+
+    Cada llamada construye árboles hasta agotar BUILD_BUDGET y vuelve a programarse
+    mientras el hilo de trabajo siga compilando o queden planes pendientes.
+    """
+    if _state is None:
+        return None
+
+    start = time.perf_counter()
+    while time.perf_counter() - start < BUILD_BUDGET:
+        try:
+            plan = _pending.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            if _state["validate"]:
+                # Llena la caché de firmas de sockets que usa el modo estricto
+                node_builder.validate_plan(plan, BuildDiagnostics())
+            node_builder.get_or_build_node_group(plan)
+            _warmed[plan["hash"]] = plan
+        except Exception as e:
+            logger.warning(f"Precalentamiento: no se pudo construir {plan['name']}: {str(e)}")
+
+    if _pending.empty() and not _state["thread"].is_alive():
+        logger.info(f"Precalentamiento completado: {len(_warmed)} árboles en caché")
+        return None
+    return BUILD_INTERVAL
+
+def _schedule_build():
+    if not bpy.app.timers.is_registered(_build_pending):
+        # Persistente: el archivo de inicio se carga después de registrar el addon
+        bpy.app.timers.register(_build_pending, first_interval=BUILD_INTERVAL, persistent=True)
+
+@bpy.app.handlers.persistent
+def _on_load(*args):
+    """Callback de load_post: los árboles precalentados no sobreviven a cargar otro archivo"""
+    if _state is None:
+        return
+    for plan in _warmed.values():
+        _pending.put(plan)
+    _schedule_build()
+
+def start_prewarm(directories=None, throttle=0.01, validate=False):
+    """
+    Precalienta las cachés de plantillas en segundo plano.
+
+    Un hilo de trabajo de baja prioridad lee y compila las plantillas (sin tocar bpy),
+    y un temporizador construye después, en pequeños bloques en el hilo principal, el
+    árbol compartido de cada plan. Así la primera aplicación de cada plantilla en la
+    sesión encuentra el plan y el árbol en caché. Tras cargar otro archivo los árboles
+    se vuelven a construir desde los planes ya compilados.
+
+    Args:
+        directories (list): Directorios de plantillas (por defecto, template_directories())
+        throttle (float): Segundos de pausa del hilo de trabajo entre plantillas
+        validate (bool): Validar además cada plan como en el modo estricto
+    """
+    global _state
+    stop_prewarm()
+    if directories is None:
+        directories = template_directories()
+
+    stop = threading.Event()
+    thread = threading.Thread(target=_compile_all, args=(directories, stop, throttle),
+                              name="sciblend-prewarm", daemon=True)
+    _state = {"thread": thread, "stop": stop, "validate": validate}
+    thread.start()
+
+    if _on_load not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load)
+    _schedule_build()
+    logger.info(f"Precalentando plantillas de {len(directories)} directorios")
+
+def stop_prewarm():
+    """Detiene el precalentamiento y deja de reconstruir árboles al cargar archivos"""
+    global _state
+    if _state is not None:
+        _state["stop"].set()
+        _state["thread"].join()
+        _state = None
+    if bpy.app.timers.is_registered(_build_pending):
+        bpy.app.timers.unregister(_build_pending)
+    if _on_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load)
+    while not _pending.empty():
+        _pending.get_nowait()
+    _warmed.clear()
+
+def start_from_environment():
+    """
+    Inicia el precalentamiento según las variables de entorno (al registrar el addon
+    con SCIBLEND_PREWARM=1).
+
+    SCIBLEND_PREWARM_VALIDATE=1 valida además cada plan como en el modo estricto.
+    """
+    start_prewarm(validate=os.environ.get("SCIBLEND_PREWARM_VALIDATE", "") not in ("", "0"))
@@ -0,0 +1,158 @@
+import csv
+import json
+import math
+import time
+import logging
+
+from . import node_builder
+
+logger = logging.getLogger("GeometryNodes")
+
+SUMMARY_COLUMNS = ("node_group", "plan_hash", "modifiers", "samples",
+                   "min_ms", "mean_ms", "p95_ms", "max_ms", "total_ms")
+
+def find_profiled_modifiers(scene):
+    """
+    Busca los modificadores de Geometry Nodes construidos por el addon en una escena.
+
+    Args:
+        scene: Escena de Blender
+
+    Returns:
+        list: Pares (objeto, modificador)
+    """
+    targets = []
+    for obj in scene.objects:
+        for mod in obj.modifiers:
+            if (mod.type == 'NODES' and mod.node_group is not None
+                    and mod.node_group.get(node_builder.PLAN_HASH_PROP) is not None):
+                targets.append((obj, mod))
+    return targets
+
+def _timed_update(depsgraph, obj):
+    """Reevalúa un objeto y devuelve el tiempo en segundos"""
+    obj.update_tag()
+    start = time.perf_counter()
+    depsgraph.update()
+    return time.perf_counter() - start
+
+def percentile(sorted_values, fraction):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def profile_modifiers(context, frame_start, frame_end, frame_step=1):
+    """
+    Mide el coste de evaluación de cada modificador del addon en un rango de fotogramas.
+
+    Todos los modificadores del addon se desactivan y, en cada fotograma, se activa
+    uno cada vez: el coste de un modificador es el tiempo de reevaluar su objeto con
+    el modificador activo menos el tiempo de reevaluarlo sin él. El estado de los
+    modificadores y el fotograma actual se restauran al terminar.
+
+    Args:
+        context: Contexto de Blender
+        frame_start (int): Primer fotograma
+        frame_end (int): Último fotograma (incluido)
+        frame_step (int): Paso entre fotogramas
+
+    Returns:
+        dict: Con 'samples' (objeto, modificador, árbol, hash -> tiempos en segundos)
+              y 'frames' (fotogramas medidos)
+    """
+    scene = context.scene
+    targets = find_profiled_modifiers(scene)
+    original_frame = scene.frame_current
+    original_state = [(mod, mod.show_viewport) for _, mod in targets]
+    depsgraph = context.evaluated_depsgraph_get()
+
+    samples = {}
+    frames = list(range(frame_start, frame_end + 1, max(1, frame_step)))
+    try:
+        for _, mod in targets:
+            mod.show_viewport = False
+
+        for frame in frames:
+            scene.frame_set(frame)
+            for obj, mod in targets:
+                baseline = _timed_update(depsgraph, obj)
+                mod.show_viewport = True
+                with_modifier = _timed_update(depsgraph, obj)
+                mod.show_viewport = False
+                depsgraph.update()
+
+                key = (obj.name, mod.name, mod.node_group.name, mod.node_group[node_builder.PLAN_HASH_PROP])
+                samples.setdefault(key, []).append(max(0.0, with_modifier - baseline))
+    finally:
+        for mod, show_viewport in original_state:
+            mod.show_viewport = show_viewport
+        scene.frame_set(original_frame)
+
+    logger.info(f"Perfilado de {len(targets)} modificadores en {len(frames)} fotogramas")
+    return {"samples": samples, "frames": frames}
+
+def summarize(profile):
+    """
+    Agrega las muestras por árbol de nodos y hash de plantilla.
+
+    Args:
+        profile (dict): Resultado de profile_modifiers
+
+    Returns:
+        list: Una fila (dict) por árbol con las claves de SUMMARY_COLUMNS, de mayor a
+              menor tiempo total
+    """
+    groups = {}
+    for (_, _, node_group, plan_hash), values in profile["samples"].items():
+        group = groups.setdefault((node_group, plan_hash), {"modifiers": 0, "values": []})
+        group["modifiers"] += 1
+        group["values"].extend(values)
+
+    rows = []
+    for (node_group, plan_hash), group in groups.items():
+        values = sorted(group["values"])
+        total = sum(values)
+        rows.append({
+            "node_group": node_group,
+            "plan_hash": plan_hash,
+            "modifiers": group["modifiers"],
+            "samples": len(values),
+            "min_ms": values[0] * 1000.0,
+            "mean_ms": total / len(values) * 1000.0,
+            "p95_ms": percentile(values, 0.95) * 1000.0,
+            "max_ms": values[-1] * 1000.0,
+            "total_ms": total * 1000.0,
+        })
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+def write_profile(profile, filepath):
+    """
+    Escribe el resumen de un perfilado en CSV o JSON según la extensión del archivo.
+
+    El JSON incluye además las muestras de cada modificador.
+
+    Args:
+        profile (dict): Resultado de profile_modifiers
+        filepath (str): Ruta de salida (.csv o .json)
+
+    Returns:
+        list: Filas del resumen
+    """
+    rows = summarize(profile)
+    if filepath.lower().endswith(".json"):
+        modifiers = [
+            {"object": obj_name, "modifier": mod_name, "node_group": node_group,
+             "plan_hash": plan_hash, "samples_ms": [value * 1000.0 for value in values]}
+            for (obj_name, mod_name, node_group, plan_hash), values in profile["samples"].items()
+        ]
+        with open(filepath, 'w') as f:
+            json.dump({"frames": profile["frames"], "summary": rows, "modifiers": modifiers}, f, indent=2)
+    else:
+        with open(filepath, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+    return rows
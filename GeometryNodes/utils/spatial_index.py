@@ -0,0 +1,356 @@
+import bpy
+import math
+import time
+import logging
+from mathutils import Vector
+
+logger = logging.getLogger("GeometryNodes")
+
+# Objetos cuya caja ocupa más celdas que esto se guardan aparte y se comprueban siempre
+MAX_CELLS_PER_OBJECT = 64
+
+# Índices espaciales por escena: nombre de escena -> SpatialIndex
+_indexes = {}
+
+def world_bounds(obj):
+    """
+    Caja alineada con los ejes, en coordenadas de mundo, de un objeto evaluado.
+
+    Args:
+        obj: Objeto de Blender
+
+    Returns:
+        tuple: (mínimo, máximo) como tuplas (x, y, z)
+    """
+    matrix = obj.matrix_world
+    corners = [matrix @ Vector(corner) for corner in obj.bound_box]
+    return (tuple(min(c[i] for c in corners) for i in range(3)),
+            tuple(max(c[i] for c in corners) for i in range(3)))
+
+def _overlaps(bmin, bmax, qmin, qmax):
+    return all(bmin[i] <= qmax[i] and bmax[i] >= qmin[i] for i in range(3))
+
+def _sphere_overlaps(bmin, bmax, center, radius_sq):
+    distance_sq = 0.0
+    for i in range(3):
+        if center[i] < bmin[i]:
+            distance_sq += (bmin[i] - center[i]) ** 2
+        elif center[i] > bmax[i]:
+            distance_sq += (center[i] - bmax[i]) ** 2
+    return distance_sq <= radius_sq
+
+def _frustum_overlaps(bmin, bmax, planes):
+    # Prueba del vértice positivo: la caja queda fuera si su esquina más avanzada en la
+    # dirección de la normal está detrás de algún plano
+    for a, b, c, d in planes:
+        x = bmax[0] if a >= 0 else bmin[0]
+        y = bmax[1] if b >= 0 else bmin[1]
+        z = bmax[2] if c >= 0 else bmin[2]
+        if a * x + b * y + c * z + d < 0:
+            return False
+    return True
+
+class SpatialIndex:
+    """
+    Rejilla uniforme de cajas de objetos para consultas por región.
+
+    Cada objeto se inserta en las celdas que toca su caja. Las consultas solo
+    comprueban los objetos de las celdas que toca la región, de modo que su coste
+    depende de los objetos cercanos y no del total de la escena.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.bounds = {}
+        self.cells = {}
+        self.large = set()
+        self.dirty = set()
+        self.needs_rescan = False
+
+    def _cell_range(self, bmin, bmax):
+        size = self.cell_size
+        return [range(math.floor(bmin[i] / size), math.floor(bmax[i] / size) + 1) for i in range(3)]
+
+    def _cell_count(self, ranges):
+        return len(ranges[0]) * len(ranges[1]) * len(ranges[2])
+
+    def _cells(self, ranges):
+        for i in ranges[0]:
+            for j in ranges[1]:
+                for k in ranges[2]:
+                    yield (i, j, k)
+
+    def insert(self, name, bmin, bmax):
+        """Inserta o actualiza la caja de un objeto"""
+        self.remove(name)
+        self.bounds[name] = (bmin, bmax)
+        ranges = self._cell_range(bmin, bmax)
+        if self._cell_count(ranges) > MAX_CELLS_PER_OBJECT:
+            self.large.add(name)
+            return
+        for cell in self._cells(ranges):
+            self.cells.setdefault(cell, set()).add(name)
+
+    def remove(self, name):
+        """Elimina un objeto del índice, si está"""
+        entry = self.bounds.pop(name, None)
+        if entry is None:
+            return
+        if name in self.large:
+            self.large.discard(name)
+            return
+        for cell in self._cells(self._cell_range(*entry)):
+            members = self.cells.get(cell)
+            if members is not None:
+                members.discard(name)
+                if not members:
+                    del self.cells[cell]
+
+    def candidates(self, qmin, qmax):
+        """Objetos que pueden tocar una caja de consulta (sin la prueba exacta)"""
+        ranges = self._cell_range(qmin, qmax)
+        if self._cell_count(ranges) >= len(self.cells):
+            # Región más grande que la ocupación de la rejilla: la prueba exacta sobre
+            # todos los objetos es más barata que recorrer sus celdas
+            return set(self.bounds)
+        found = set(self.large)
+        for cell in self._cells(ranges):
+            members = self.cells.get(cell)
+            if members:
+                found.update(members)
+        return found
+
+    def query_box(self, qmin, qmax):
+        """Nombres de los objetos cuya caja se solapa con la caja dada"""
+        return [name for name in self.candidates(qmin, qmax)
+                if _overlaps(*self.bounds[name], qmin, qmax)]
+
+    def query_radius(self, center, radius):
+        """Nombres de los objetos cuya caja está a menos de un radio de un punto"""
+        qmin = tuple(center[i] - radius for i in range(3))
+        qmax = tuple(center[i] + radius for i in range(3))
+        radius_sq = radius * radius
+        return [name for name in self.candidates(qmin, qmax)
+                if _sphere_overlaps(*self.bounds[name], center, radius_sq)]
+
+    def query_frustum(self, planes, qmin, qmax):
+        """
+        Nombres de los objetos cuya caja toca un tronco de visión.
+
+        Args:
+            planes (list): Planos (a, b, c, d) con la normal hacia el interior
+            qmin, qmax (tuple): Caja que envuelve el tronco
+        """
+        return [name for name in self.candidates(qmin, qmax)
+                if _frustum_overlaps(*self.bounds[name], planes)]
+
+def _suggest_cell_size(extents):
+    """Tamaño de celda: el doble de la mediana del tamaño de los objetos"""
+    sizes = sorted(max(bmax[i] - bmin[i] for i in range(3)) for bmin, bmax in extents)
+    if not sizes:
+        return 1.0
+    return max(sizes[len(sizes) // 2] * 2.0, 1e-3)
+
+def build_index(scene):
+    """
+    Construye el índice espacial de todos los objetos de una escena.
+
+    Args:
+        scene: Escena de Blender
+
+    Returns:
+        SpatialIndex: El índice construido
+    """
+    start = time.perf_counter()
+    entries = [(obj.name, world_bounds(obj)) for obj in scene.objects]
+    index = SpatialIndex(_suggest_cell_size([bounds for _, bounds in entries]))
+    for name, (bmin, bmax) in entries:
+        index.insert(name, bmin, bmax)
+
+    elapsed = (time.perf_counter() - start) * 1000.0
+    logger.info(f"Índice espacial de {scene.name}: {len(entries)} objetos en {len(index.cells)} celdas "
+                f"({index.cell_size:.3g} m) en {elapsed:.0f} ms")
+    return index
+
+def _refresh(index, scene):
+    """Aplica al índice los cambios registrados desde la última consulta"""
+    objects = scene.objects
+    if index.needs_rescan:
+        # Se añadieron o quitaron objetos: conciliar los nombres
+        names = set(objects.keys())
+        for name in list(index.bounds):
+            if name not in names:
+                index.remove(name)
+        index.dirty.update(names.difference(index.bounds))
+        index.needs_rescan = False
+
+    for name in index.dirty:
+        obj = objects.get(name)
+        if obj is None:
+            index.remove(name)
+        else:
+            index.insert(name, *world_bounds(obj))
+    index.dirty.clear()
+
+def get_index(scene):
+    """
+    Devuelve el índice espacial de una escena, al día con los últimos cambios.
+
+    La primera llamada construye el índice y empieza a seguir los cambios del
+    depsgraph; las siguientes solo actualizan los objetos que han cambiado.
+
+    Args:
+        scene: Escena de Blender
+
+    Returns:
+        SpatialIndex: El índice de la escena
+    """
+    index = _indexes.get(scene.name)
+    if index is None:
+        index = _indexes[scene.name] = build_index(scene)
+        _add_handlers()
+    else:
+        _refresh(index, scene)
+    return index
+
+@bpy.app.handlers.persistent
+def _on_depsgraph_update(scene, depsgraph):
+    """Callback de depsgraph_update_post: marca los objetos que han cambiado"""
+    index = _indexes.get(scene.name)
+    if index is None:
+        return
+    for update in depsgraph.updates:
+        datablock = update.id
+        if isinstance(datablock, bpy.types.Object):
+            if update.is_updated_transform or update.is_updated_geometry:
+                index.dirty.add(datablock.original.name)
+            else:
+                # Un cambio del propio ID (p. ej. un cambio de nombre): conciliar los nombres
+                index.needs_rescan = True
+        elif isinstance(datablock, (bpy.types.Collection, bpy.types.Scene)):
+            index.needs_rescan = True
+
+def _is_animated(obj):
+    """Indica si la caja de un objeto puede cambiar de un fotograma a otro"""
+    while obj is not None:
+        if obj.animation_data is not None or obj.constraints or obj.modifiers:
+            return True
+        obj = obj.parent
+    return False
+
+@bpy.app.handlers.persistent
+def _on_frame_change(scene, *args):
+    """
+    Callback de frame_change_post: marca los objetos animados.
+
+    Cambiar de fotograma no dispara depsgraph_update_post, así que sin esto las cajas
+    de los objetos animados quedarían en el fotograma en que se indexaron.
+    """
+    index = _indexes.get(scene.name)
+    if index is None:
+        return
+    index.dirty.update(obj.name for obj in scene.objects if _is_animated(obj))
+
+@bpy.app.handlers.persistent
+def _on_load(*args):
+    """Callback de load_post: los índices no sobreviven a cargar otro archivo"""
+    _indexes.clear()
+
+def _add_handlers():
+    if _on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    if _on_frame_change not in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.append(_on_frame_change)
+    if _on_load not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(_on_load)
+
+def clear():
+    """Descarta los índices y deja de seguir los cambios del depsgraph y de fotograma"""
+    _indexes.clear()
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_frame_change in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.remove(_on_frame_change)
+    if _on_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load)
+
+def camera_frustum(scene, depsgraph, camera=None):
+    """
+    Planos del tronco de visión de la cámara de render.
+
+    Args:
+        scene: Escena de Blender
+        depsgraph: Depsgraph evaluado
+        camera: Objeto cámara (por defecto, la cámara de la escena)
+
+    Returns:
+        tuple: (planos (a, b, c, d) con la normal hacia el interior, caja que envuelve el tronco)
+    """
+    camera = camera or scene.camera
+    if camera is None:
+        raise ValueError("La escena no tiene cámara")
+
+    render = scene.render
+    projection = camera.calc_matrix_camera(
+        depsgraph,
+        x=render.resolution_x, y=render.resolution_y,
+        scale_x=render.pixel_aspect_x, scale_y=render.pixel_aspect_y,
+    )
+    matrix = projection @ camera.matrix_world.inverted()
+    rows = [matrix.row[i] for i in range(4)]
+
+    # Extracción de Gribb-Hartmann: izquierda, derecha, abajo, arriba, cerca, lejos
+    planes = []
+    for axis in range(3):
+        for sign in (1.0, -1.0):
+            planes.append(tuple(rows[3][j] + sign * rows[axis][j] for j in range(4)))
+
+    # Esquinas del tronco en coordenadas de mundo para acotar la consulta
+    inverse = matrix.inverted()
+    corners = []
+    for x in (-1.0, 1.0):
+        for y in (-1.0, 1.0):
+            for z in (-1.0, 1.0):
+                corner = inverse @ Vector((x, y, z, 1.0))
+                corners.append(corner.xyz / corner.w)
+    qmin = tuple(min(c[i] for c in corners) for i in range(3))
+    qmax = tuple(max(c[i] for c in corners) for i in range(3))
+    return planes, qmin, qmax
+
+def find_targets(context, target_set, center=None, size=None, radius=1.0):
+    """
+    Busca los objetos de la escena que pertenecen a un conjunto de destino.
+
+    Args:
+        context: Contexto de Blender
+        target_set (str): 'BOX' (dentro de una caja), 'RADIUS' (a menos de un radio) o
+                          'FRUSTUM' (en el encuadre de la cámara de render)
+        center: Centro de la caja o de la esfera (por defecto, el cursor 3D)
+        size: Dimensiones de la caja
+        radius (float): Radio de la esfera
+
+    Returns:
+        list: Objetos que tocan la región, en orden de nombre
+    """
+    scene = context.scene
+    start = time.perf_counter()
+    index = get_index(scene)
+    center = tuple(center if center is not None else scene.cursor.location)
+
+    if target_set == 'BOX':
+        half = [s / 2.0 for s in size]
+        names = index.query_box(tuple(center[i] - half[i] for i in range(3)),
+                                tuple(center[i] + half[i] for i in range(3)))
+    elif target_set == 'RADIUS':
+        names = index.query_radius(center, radius)
+    elif target_set == 'FRUSTUM':
+        planes, qmin, qmax = camera_frustum(scene, context.evaluated_depsgraph_get())
+        names = index.query_frustum(planes, qmin, qmax)
+    else:
+        raise ValueError(f"Conjunto de destino desconocido: {target_set}")
+
+    objects = scene.objects
+    targets = [objects[name] for name in sorted(names) if name in objects]
+    elapsed = (time.perf_counter() - start) * 1000.0
+    logger.info(f"{len(targets)} objetos en el conjunto {target_set} ({elapsed:.1f} ms)")
+    return targets
@@ -0,0 +1,277 @@
+import bpy
+import hashlib
+import logging
+
+from . import node_builder, template_plan, blender_api
+
+logger = logging.getLogger("GeometryNodes")
+
+# Hashes de los árboles encadenados por un árbol de pila, en orden de evaluación y
+# separados por comas
+CHAIN_PROP = "sciblend_chain"
+
+# Separación horizontal entre los nodos de grupo de la cadena
+_STAGE_SPACING = 250
+
+# Claves del modificador de cada entrada: el valor, si la entrada lee un atributo y el
+# nombre de ese atributo
+_INPUT_KEY_SUFFIXES = ("", "_use_attribute", "_attribute_name")
+
+def chain_members(node_group):
+    """
+    Devuelve los árboles que encadena un árbol, aplanando las pilas ya fusionadas.
+
+    Args:
+        node_group: Árbol construido por el addon
+
+    Returns:
+        list: Árboles en orden de evaluación ([node_group] si no es una pila)
+    """
+    hashes = node_group.get(CHAIN_PROP)
+    if hashes is None:
+        return [node_group]
+
+    members = [node_builder.find_cached_node_group(plan_hash) for plan_hash in hashes.split(",")]
+    if any(member is None for member in members):
+        # Falta algún árbol de la cadena: tratar la pila como un árbol opaco
+        return [node_group]
+    return members
+
+def _geometry_socket(node_group, in_out):
+    """Primer socket de geometría de la interfaz de un árbol en un sentido"""
+    for item in blender_api.interface_sockets(node_group, in_out):
+        if blender_api.socket_type(item) == 'NodeSocketGeometry':
+            return item
+    return None
+
+def chain_interface(members):
+    """
+    Calcula las entradas que expone una pila: las de cada árbol salvo la geometría.
+
+    Los nombres repetidos entre árboles se distinguen con el número de etapa, de modo
+    que una misma lista de árboles produce siempre los mismos nombres.
+
+    Args:
+        members (list): Árboles encadenados
+
+    Returns:
+        list: Tuplas (etapa, elemento de interfaz del árbol, nombre en la pila)
+    """
+    interface = []
+    used = set()
+    for stage, member in enumerate(members):
+        geometry = _geometry_socket(member, 'INPUT')
+        for item in blender_api.interface_sockets(member, 'INPUT'):
+            if item == geometry:
+                continue
+            name = item.name if item.name not in used else f"{item.name} ({stage + 1})"
+            used.add(name)
+            interface.append((stage, item, name))
+    return interface
+
+def _chain_hash(members):
+    payload = "chain:" + ",".join(member[node_builder.PLAN_HASH_PROP] for member in members)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def build_chain_tree(members, chain_hash):
+    """
+    Construye un árbol que evalúa varios árboles en cadena dentro de un único modificador.
+
+    Cada árbol se instancia con un nodo de grupo y la geometría pasa de uno a otro
+    sin copias intermedias entre modificadores.
+
+    Args:
+        members (list): Árboles en orden de evaluación
+        chain_hash (str): Hash de la cadena
+
+    Returns:
+        bpy.types.GeometryNodeTree: El árbol de la pila
+    """
+    name = "SciBlend_Stack_" + "_".join(member.name for member in members)
+    node_tree = bpy.data.node_groups.new(name=name[:63], type='GeometryNodeTree')
+    input_node, output_node = blender_api.create_io_nodes(node_tree)
+    blender_api.new_socket(node_tree, "Geometry", 'INPUT', 'NodeSocketGeometry')
+    blender_api.new_socket(node_tree, "Geometry", 'OUTPUT', 'NodeSocketGeometry')
+
+    interface = chain_interface(members)
+    chain_items = []
+    for stage, item, socket_name in interface:
+        chain_item = blender_api.new_socket(node_tree, socket_name, 'INPUT', blender_api.socket_type(item))
+        if hasattr(item, "default_value") and hasattr(chain_item, "default_value"):
+            chain_item.default_value = item.default_value
+        chain_items.append(chain_item)
+
+    group_inputs = {socket.identifier: socket for socket in input_node.outputs}
+    previous = input_node.outputs[0]
+    group_nodes = []
+    for stage, member in enumerate(members):
+        group_node = node_tree.nodes.new(template_plan.GROUP_NODE_TYPE)
+        group_node.node_tree = member
+        group_node.name = f"stage_{stage}"
+        group_node.location = (stage * _STAGE_SPACING, 0)
+        group_nodes.append(group_node)
+
+        sockets = {socket.identifier: socket for socket in group_node.inputs}
+        geometry_in = _geometry_socket(member, 'INPUT')
+        if geometry_in is not None and previous is not None:
+            node_tree.links.new(previous, sockets[geometry_in.identifier])
+
+        geometry_out = _geometry_socket(member, 'OUTPUT')
+        previous = None
+        if geometry_out is not None:
+            previous = next(s for s in group_node.outputs if s.identifier == geometry_out.identifier)
+
+    for (stage, item, _), chain_item in zip(interface, chain_items):
+        target = next(s for s in group_nodes[stage].inputs if s.identifier == item.identifier)
+        node_tree.links.new(group_inputs[chain_item.identifier], target)
+
+    if previous is not None:
+        node_tree.links.new(previous, output_node.inputs[0])
+    input_node.location = (-_STAGE_SPACING, 0)
+    output_node.location = (len(members) * _STAGE_SPACING, 0)
+
+    node_tree[node_builder.PLAN_HASH_PROP] = chain_hash
+    node_tree[CHAIN_PROP] = ",".join(member[node_builder.PLAN_HASH_PROP] for member in members)
+    logger.info(f"Pila {node_tree.name} construida con {len(members)} árboles")
+    return node_tree
+
+def get_or_build_chain_tree(members):
+    """Devuelve el árbol de una cadena de árboles, construyéndolo solo si no está en caché"""
+    chain_hash = _chain_hash(members)
+    node_tree = node_builder.find_cached_node_group(chain_hash)
+    if node_tree is None:
+        node_tree = build_chain_tree(members, chain_hash)
+        node_builder.cache_node_group(chain_hash, node_tree)
+    return node_tree
+
+def _capture_inputs(gn_mod, offset):
+    """
+    Lee los valores de las entradas de un modificador por etapa de la cadena.
+
+    Además del valor se leen las claves que hacen que la entrada tome un atributo
+    (ver _INPUT_KEY_SUFFIXES).
+
+    Returns:
+        dict: (etapa global, identificador en el árbol de la etapa) -> {sufijo: valor}
+    """
+    node_group = gn_mod.node_group
+    members = chain_members(node_group)
+    identifiers = {item.name: item.identifier for item in blender_api.interface_sockets(node_group, 'INPUT')}
+
+    values = {}
+    for stage, item, socket_name in chain_interface(members):
+        identifier = identifiers.get(socket_name)
+        if identifier is None:
+            continue
+        keys = {suffix: gn_mod[identifier + suffix]
+                for suffix in _INPUT_KEY_SUFFIXES if identifier + suffix in gn_mod}
+        if keys:
+            values[(offset + stage, item.identifier)] = keys
+    return values
+
+def _restore_inputs(gn_mod, members, values):
+    """Asigna al modificador de una pila los valores capturados de cada etapa"""
+    identifiers = {item.name: item.identifier for item in blender_api.interface_sockets(gn_mod.node_group, 'INPUT')}
+    for stage, item, socket_name in chain_interface(members):
+        keys = values.get((stage, item.identifier))
+        if keys is None or socket_name not in identifiers:
+            continue
+        for suffix, value in keys.items():
+            gn_mod[identifiers[socket_name] + suffix] = value
+
+def _is_addon_modifier(mod):
+    return (mod.type == 'NODES' and mod.node_group is not None
+            and mod.node_group.get(node_builder.PLAN_HASH_PROP) is not None)
+
+def append_plan(obj, plan, diagnostics=None):
+    """
+    Compone un plan sobre la salida del árbol que ya tiene el objeto.
+
+    El árbol existente y el del plan se encadenan en un árbol de pila, de modo que el
+    nuevo efecto se suma al anterior en lugar de sustituirlo.
+
+    Args:
+        obj: Objeto de destino
+        plan (dict): Plan compilado
+        diagnostics (BuildDiagnostics): Registro de problemas (opcional)
+
+    Returns:
+        bpy.types.NodesModifier: El modificador con la pila asignada
+    """
+    gn_mod = next((mod for mod in obj.modifiers if mod.type == 'NODES'), None)
+    if gn_mod is None or gn_mod.node_group is None:
+        return node_builder.apply_plan(obj, plan, diagnostics)
+    if not _is_addon_modifier(gn_mod):
+        raise ValueError(f"El árbol {gn_mod.node_group.name} no se construyó con SciBlend y no puede componerse")
+
+    values = _capture_inputs(gn_mod, 0)
+    members = chain_members(gn_mod.node_group) + [node_builder.get_or_build_node_group(plan, diagnostics)]
+    old_node_group = gn_mod.node_group
+    gn_mod.node_group = get_or_build_chain_tree(members)
+    node_builder.release_node_group(old_node_group)
+    _restore_inputs(gn_mod, members, values)
+
+    logger.info(f"{plan['name']} compuesto sobre {old_node_group.name} en {obj.name}")
+    return gn_mod
+
+def find_fusable_runs(obj):
+    """
+    Busca secuencias de modificadores consecutivos del addon que pueden fusionarse.
+
+    Args:
+        obj: Objeto de Blender
+
+    Returns:
+        list: Listas de índices de modificadores (al menos dos por secuencia)
+    """
+    runs = []
+    current = []
+    for index, mod in enumerate(obj.modifiers):
+        if _is_addon_modifier(mod) and (not current or (
+                mod.show_viewport == obj.modifiers[current[0]].show_viewport
+                and mod.show_render == obj.modifiers[current[0]].show_render)):
+            current.append(index)
+            continue
+        if len(current) > 1:
+            runs.append(current)
+        current = [index] if _is_addon_modifier(mod) else []
+    if len(current) > 1:
+        runs.append(current)
+    return runs
+
+def fuse_modifier_stack(obj):
+    """
+    Fusiona los modificadores consecutivos del addon en un único árbol por secuencia.
+
+    El primer modificador de cada secuencia recibe la pila y conserva los valores de
+    las entradas de todas las etapas; el resto se eliminan.
+
+    Args:
+        obj: Objeto de Blender
+
+    Returns:
+        int: Número de modificadores eliminados
+    """
+    removed = 0
+    # De atrás hacia delante para que los índices de las secuencias sigan siendo válidos
+    for run in reversed(find_fusable_runs(obj)):
+        modifiers = [obj.modifiers[index] for index in run]
+        members = []
+        values = {}
+        for mod in modifiers:
+            values.update(_capture_inputs(mod, len(members)))
+            members.extend(chain_members(mod.node_group))
+
+        old_node_groups = [mod.node_group for mod in modifiers]
+        first = modifiers[0]
+        first.node_group = get_or_build_chain_tree(members)
+        _restore_inputs(first, members, values)
+
+        for mod in modifiers[1:]:
+            obj.modifiers.remove(mod)
+            removed += 1
+        for node_group in old_node_groups:
+            node_builder.release_node_group(node_group)
+
+        logger.info(f"{len(modifiers)} modificadores de {obj.name} fusionados en {first.node_group.name}")
+    return removed
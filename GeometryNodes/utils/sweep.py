@@ -0,0 +1,148 @@
+import bpy
+import csv
+import time
+import itertools
+import logging
+
+from . import node_builder, template_plan
+from .diagnostics import BuildDiagnostics
+
+logger = logging.getLogger("GeometryNodes")
+
+STAT_COLUMNS = ("vertices", "edges", "faces", "instances",
+                "min_x", "min_y", "min_z", "max_x", "max_y", "max_z", "eval_time")
+
+def iter_grid(grid):
+    """
+    Recorre todas las combinaciones de una rejilla de parámetros.
+
+    Args:
+        grid (dict): Parámetro ("id_nodo.Entrada") -> lista de valores
+
+    Yields:
+        dict: Parámetro -> valor de una combinación
+    """
+    keys = sorted(grid)
+    for values in itertools.product(*(grid[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+def count_instances(depsgraph, obj):
+    """Cuenta las instancias generadas por un objeto en el depsgraph evaluado"""
+    count = 0
+    for instance in depsgraph.object_instances:
+        if instance.is_instance and instance.parent is not None and instance.parent.original == obj:
+            count += 1
+    return count
+
+def evaluate_stats(depsgraph, obj, with_instances=True):
+    """
+    Evalúa un objeto y resume la geometría resultante.
+
+    Args:
+        depsgraph: Depsgraph de la escena
+        obj: Objeto original con el modificador
+        with_instances (bool): Contar también las instancias (recorre todo el depsgraph)
+
+    Returns:
+        dict: Estadísticas con las claves de STAT_COLUMNS
+    """
+    start = time.perf_counter()
+    depsgraph.update()
+    obj_eval = obj.evaluated_get(depsgraph)
+    eval_time = time.perf_counter() - start
+
+    stats = {"vertices": 0, "edges": 0, "faces": 0, "eval_time": eval_time}
+    data = obj_eval.data
+    if isinstance(data, bpy.types.Mesh):
+        stats["vertices"] = len(data.vertices)
+        stats["edges"] = len(data.edges)
+        stats["faces"] = len(data.polygons)
+
+    corners = [tuple(corner) for corner in obj_eval.bound_box]
+    for axis, name in enumerate("xyz"):
+        stats[f"min_{name}"] = min(corner[axis] for corner in corners)
+        stats[f"max_{name}"] = max(corner[axis] for corner in corners)
+
+    stats["instances"] = count_instances(depsgraph, obj) if with_instances else 0
+    return stats
+
+def run_sweep(context, obj, plan, grid, with_instances=True):
+    """
+    Evalúa un plan para cada combinación de una rejilla de parámetros.
+
+    Las entradas de la rejilla se exponen en el grupo, de modo que el árbol se
+    construye una sola vez y cada combinación solo cambia valores del modificador.
+
+    Args:
+        context: Contexto de Blender
+        obj: Objeto sobre el que se evalúa
+        plan (dict): Plan compilado de la plantilla
+        grid (dict): Parámetro ("id_nodo.Entrada") -> lista de valores
+        with_instances (bool): Contar también las instancias
+
+    Returns:
+        list: Una fila (dict) por combinación, con los parámetros y las estadísticas
+
+    Raises:
+        ValueError: Si alguna entrada de la plantilla o de la rejilla no existe en su nodo
+    """
+    examples = {key: values[0] for key, values in grid.items() if values}
+    exposed = template_plan.expose_inputs(plan, examples)
+    diagnostics = BuildDiagnostics()
+    gn_mod = node_builder.apply_plan(obj, exposed, diagnostics)
+    diagnostics.log()
+
+    # Una entrada que no existe haría que todas las filas salieran iguales
+    missing = [message for category, message in diagnostics.examples if category == "missing_socket"]
+    if diagnostics.counts.get("missing_socket"):
+        raise ValueError(f"{diagnostics.counts['missing_socket']} sockets no encontrados: {', '.join(missing)}")
+    depsgraph = context.evaluated_depsgraph_get()
+
+    rows = []
+    start = time.perf_counter()
+    for combination in iter_grid(grid):
+        for key, value in combination.items():
+            node_builder.set_modifier_input(gn_mod, key, value)
+        obj.update_tag()
+
+        row = dict(combination)
+        row.update(evaluate_stats(depsgraph, obj, with_instances))
+        rows.append(row)
+
+    # Dejar el modificador con los valores de la plantilla
+    for socket in exposed["inputs"]:
+        if socket["name"] in grid and "default" in socket:
+            node_builder.set_modifier_input(gn_mod, socket["name"], socket["default"])
+    obj.update_tag()
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Barrido de {len(rows)} combinaciones en {elapsed:.2f} s")
+    return rows
+
+def write_csv(rows, filepath):
+    """Escribe las filas de un barrido en CSV"""
+    if not rows:
+        return
+    columns = [key for key in rows[0] if key not in STAT_COLUMNS] + list(STAT_COLUMNS)
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: (list(value) if isinstance(value, tuple) else value)
+                             for key, value in row.items()})
+
+def write_npz(rows, filepath):
+    """Escribe las filas de un barrido en un archivo NPZ de NumPy (una matriz por columna)"""
+    import numpy as np
+
+    if not rows:
+        return
+    arrays = {key: np.asarray([row[key] for row in rows]) for key in rows[0]}
+    np.savez(filepath, **arrays)
+
+def write_results(rows, filepath):
+    """Escribe las filas en CSV o NPZ según la extensión del archivo"""
+    if filepath.lower().endswith(".npz"):
+        write_npz(rows, filepath)
+    else:
+        write_csv(rows, filepath)
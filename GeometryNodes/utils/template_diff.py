@@ -0,0 +1,81 @@
+def diff_plans(old_plan, new_plan):
+    """
+    Calcula las diferencias entre dos planes compilados.
+
+    El parche describe los cambios que pueden aplicarse en el sitio sobre un árbol
+    construido con el plan anterior. Si la interfaz del grupo cambia, el parche pide
+    una reconstrucción completa. Los nodos que cambian de tipo o pierden propiedades o
+    entradas, o que instancian otro subgrafo, se sustituyen (se eliminan y se vuelven
+    a crear).
+
+    Args:
+        old_plan (dict): Plan con el que se construyó el árbol
+        new_plan (dict): Plan nuevo
+
+    Returns:
+        dict: Parche con las claves 'full_rebuild', 'reason', 'added_nodes',
+              'removed_nodes', 'properties', 'inputs', 'locations' y 'links_changed'
+    """
+    patch = {
+        "full_rebuild": False,
+        "reason": "",
+        "added_nodes": [],
+        "removed_nodes": [],
+        "properties": [],
+        "inputs": [],
+        "locations": [],
+        "links_changed": False,
+    }
+
+    if old_plan["inputs"] != new_plan["inputs"] or old_plan["outputs"] != new_plan["outputs"]:
+        patch["full_rebuild"] = True
+        patch["reason"] = "La interfaz del grupo ha cambiado"
+        return patch
+
+    old_nodes = {node["id"]: node for node in old_plan["nodes"]}
+    new_nodes = {node["id"]: node for node in new_plan["nodes"]}
+
+    for node_id in old_nodes:
+        if node_id not in new_nodes:
+            patch["removed_nodes"].append(node_id)
+
+    for node_id, new_node in new_nodes.items():
+        old_node = old_nodes.get(node_id)
+        if old_node is None:
+            patch["added_nodes"].append(new_node)
+            continue
+
+        # Un valor que desaparece no puede volver a su valor por defecto en el sitio
+        if (old_node["type"] != new_node["type"]
+                or old_node.get("subgraph") != new_node.get("subgraph")
+                or not old_node["properties"].keys() <= new_node["properties"].keys()
+                or not old_node["inputs"].keys() <= new_node["inputs"].keys()):
+            patch["removed_nodes"].append(node_id)
+            patch["added_nodes"].append(new_node)
+            continue
+
+        for prop_name, value in new_node["properties"].items():
+            if old_node["properties"].get(prop_name) != value:
+                patch["properties"].append((node_id, prop_name, value))
+
+        for input_name, value in new_node["inputs"].items():
+            if old_node["inputs"].get(input_name) != value:
+                patch["inputs"].append((node_id, input_name, value))
+
+        if old_node["location"] != new_node["location"]:
+            patch["locations"].append((node_id, new_node["location"]))
+
+    # Las propiedades pueden cambiar los sockets disponibles, así que también obligan a reconectar
+    patch["links_changed"] = bool(
+        set(old_plan["links"]) != set(new_plan["links"])
+        or patch["added_nodes"]
+        or patch["removed_nodes"]
+        or patch["properties"]
+    )
+    return patch
+
+def is_empty(patch):
+    """Indica si un parche no contiene ningún cambio"""
+    return not (patch["full_rebuild"] or patch["added_nodes"] or patch["removed_nodes"]
+                or patch["properties"] or patch["inputs"] or patch["locations"]
+                or patch["links_changed"])
@@ -0,0 +1,532 @@
+import os
+import json
+import hashlib
+import logging
+
+from . import auto_layout, metrics
+
+logger = logging.getLogger("GeometryNodes")
+
+# Identificadores reservados para los nodos de entrada y salida del grupo
+GROUP_INPUT_ID = "input"
+GROUP_OUTPUT_ID = "output"
+
+# Nombres con los que plantillas y presets se refieren a los nodos de grupo
+_INPUT_ALIASES = {"input", "GROUP_INPUT", "Group Input"}
+_OUTPUT_ALIASES = {"output", "GROUP_OUTPUT", "Group Output"}
+
+_DEFAULT_INTERFACE = ({"name": "Geometry", "type": "NodeSocketGeometry"},)
+
+# Nodo y socket añadidos por el modo de instancias de colección
+COLLECTION_INFO_ID = "collection_info"
+COLLECTION_SOCKET = "Collection"
+
+# Nodo compartido por todos los interruptores de nivel de detalle
+LOD_VIEWPORT_ID = "lod_is_viewport"
+
+# Tipo de nodo con el que se instancian los subgrafos y prefijo de las referencias a archivos
+GROUP_NODE_TYPE = "GeometryNodeGroup"
+FILE_REF_PREFIX = "file:"
+
+# Caché de plantillas leídas de disco: ruta -> (dependencias, plan), donde las
+# dependencias son los (ruta, mtime_ns, tamaño) del archivo y de todos los archivos
+# de subgrafos que referencia, directa o indirectamente
+_file_cache = {}
+
+# Caché de planes derivados: (tipo de derivación, hash del plan original) -> plan
+_derived_cache = {}
+
+# Subgrafos compilados, compartidos entre plantillas: hash -> plan (los menos usados
+# recientemente se descartan al superar SUBGRAPH_CACHE_SIZE)
+_subgraph_cache = {}
+SUBGRAPH_CACHE_SIZE = 512
+
+
+def _freeze(value):
+    """Convierte listas en tuplas para que el plan pueda compartirse sin copias"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _normalize_interface(sockets):
+    """
+    Normaliza la lista de sockets de interfaz de una plantilla.
+
+    Args:
+        sockets: Lista de diccionarios con 'name' y 'type' (puede ser None)
+
+    Returns:
+        tuple: Sockets normalizados, siempre con 'Geometry' en primer lugar
+    """
+    result = []
+    seen = set()
+    for socket in tuple(_DEFAULT_INTERFACE) + tuple(sockets or ()):
+        name = socket.get("name")
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        item = {"name": name, "type": socket.get("type", "NodeSocketFloat")}
+        if "default" in socket:
+            item["default"] = _freeze(socket["default"])
+        result.append(item)
+    return tuple(result)
+
+
+def compute_plan_hash(plan):
+    """
+    Calcula el hash de contenido de un plan.
+
+    El nombre y la descripción no forman parte del hash, de modo que dos plantillas
+    con la misma estructura comparten el mismo árbol de nodos en caché.
+
+    Args:
+        plan (dict): Plan compilado
+
+    Returns:
+        str: Hash SHA-1 en hexadecimal
+    """
+    content = {
+        "nodes": plan["nodes"],
+        "links": plan["links"],
+        "inputs": plan["inputs"],
+        "outputs": plan["outputs"],
+    }
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _switch_type(value):
+    """Tipo de datos del nodo Switch adecuado para un valor de LOD"""
+    if isinstance(value, bool):
+        return 'BOOLEAN'
+    if isinstance(value, int):
+        return 'INT'
+    if isinstance(value, (list, tuple)):
+        return 'VECTOR'
+    return 'FLOAT'
+
+
+def _expand_lod(lod_entries, nodes, links, issues):
+    """
+    Expande las declaraciones de nivel de detalle de una plantilla.
+
+    Cada entrada {"node", "input", "viewport", "render"} se convierte en un nodo
+    GeometryNodeSwitch controlado por un único GeometryNodeIsViewport, cuya salida
+    se conecta a la entrada indicada. El viewport usa el valor reducido y el render
+    el valor completo.
+
+    Args:
+        lod_entries (list): Declaraciones 'lod' de la plantilla
+        nodes (list): Nodos ya normalizados (se amplía en el sitio)
+        links (list): Enlaces normalizados (se amplía en el sitio)
+        issues (list): Problemas encontrados (se amplía en el sitio)
+    """
+    nodes_by_id = {node["id"]: node for node in nodes}
+    is_viewport_added = False
+
+    for index, entry in enumerate(lod_entries):
+        target = nodes_by_id.get(entry.get("node"))
+        if target is None or not all(key in entry for key in ("input", "viewport", "render")):
+            issues.append(("invalid_value", f"Declaración LOD ignorada: {entry}"))
+            continue
+
+        if not is_viewport_added:
+            nodes.append({
+                "id": LOD_VIEWPORT_ID,
+                "type": "GeometryNodeIsViewport",
+                "location": (target["location"][0] - 400, target["location"][1] - 200),
+                "properties": {},
+                "inputs": {},
+            })
+            is_viewport_added = True
+
+        switch_id = f"lod_{target['id']}_{index}"
+        nodes.append({
+            "id": switch_id,
+            "type": "GeometryNodeSwitch",
+            "location": (target["location"][0] - 200, target["location"][1] - 150 * (index + 1)),
+            "properties": {"input_type": _switch_type(entry["render"])},
+            "inputs": {"False": _freeze(entry["render"]), "True": _freeze(entry["viewport"])},
+        })
+        links.append((LOD_VIEWPORT_ID, "Is Viewport", switch_id, "Switch"))
+        links.append((switch_id, "Output", target["id"], str(entry["input"])))
+
+
+def _resolve_subgraph(ref, scope, issues):
+    """
+    Resuelve una referencia a un subgrafo y lo compila una sola vez.
+
+    Una referencia es el nombre de una definición de 'subgraphs' o "file:<ruta>" para
+    otra plantilla (relativa a la plantilla que la usa). Una definición puede ser un
+    diccionario con el mismo formato que una plantilla o la ruta de un archivo.
+
+    Args:
+        ref (str): Referencia al subgrafo
+        scope (dict): Contexto de resolución con 'definitions', 'base_dir', 'stack',
+                      'resolved' y 'files' (dependencias de archivo, se amplía en el sitio)
+        issues (list): Problemas encontrados (se amplía en el sitio)
+
+    Returns:
+        dict: Plan del subgrafo o None si no se pudo resolver
+    """
+    if ref in scope["resolved"]:
+        return scope["resolved"][ref]
+
+    definition = ref[len(FILE_REF_PREFIX):] if ref.startswith(FILE_REF_PREFIX) else scope["definitions"].get(ref)
+    if definition is None:
+        issues.append(("unknown_node", f"Subgrafo no definido: {ref}"))
+        return None
+
+    if isinstance(definition, str):
+        key = os.path.abspath(os.path.join(scope["base_dir"] or "", definition))
+    else:
+        key = ref
+    if key in scope["stack"]:
+        issues.append(("invalid_value", f"Referencia circular al subgrafo {ref}"))
+        return None
+
+    stack = scope["stack"] + (key,)
+    if isinstance(definition, str):
+        if not os.path.isfile(key):
+            # Si el archivo aparece más tarde, el plan en caché deja de ser válido
+            scope["files"].append((key, None, None))
+            issues.append(("unknown_node", f"Archivo de subgrafo no encontrado: {key}"))
+            return None
+        subplan = _load(key, stack)
+        scope["files"].extend(_file_cache[key][0])
+    else:
+        definitions = dict(scope["definitions"])
+        definitions.update(definition.get("subgraphs", {}))
+        subplan = _compile(definition, definition.get("name", ref), scope["base_dir"], definitions, stack,
+                           scope["files"])
+
+    # Los subgrafos idénticos de distintas plantillas comparten el mismo plan
+    subplan = _subgraph_cache.pop(subplan["hash"], subplan)
+    _subgraph_cache[subplan["hash"]] = subplan
+    while len(_subgraph_cache) > SUBGRAPH_CACHE_SIZE:
+        del _subgraph_cache[next(iter(_subgraph_cache))]
+    scope["resolved"][ref] = subplan
+    return subplan
+
+
+def compile_template(data, name=None, base_dir=None, dependencies=None):
+    """
+    Compila los datos JSON de una plantilla en un plan de construcción.
+
+    El plan resuelve los alias de los nodos de grupo, los enlaces implícitos y los
+    valores de entrada una sola vez, de modo que construir el árbol de nodos no
+    requiere volver a interpretar el JSON.
+
+    Los nodos con una clave 'subgraph' se compilan como nodos GeometryNodeGroup que
+    instancian el subgrafo referenciado. Cada subgrafo es un plan propio, guardado en
+    'subgraphs' por su hash, y se construye una sola vez como árbol compartido.
+
+    Si ningún nodo tiene una posición útil, se distribuyen automáticamente por capas
+    (ver auto_layout). La clave 'layout' de la plantilla ('auto', 'always' o 'none')
+    permite forzar o desactivar esta distribución.
+
+    Args:
+        data (dict): Datos de la plantilla
+        name (str): Nombre del árbol de nodos (por defecto, el de la plantilla)
+        base_dir (str): Carpeta desde la que se resuelven las referencias a archivos
+        dependencies (list): Si se indica, recibe los (ruta, mtime_ns, tamaño) de los
+                             archivos de subgrafos usados (ver dependencies_changed)
+
+    Returns:
+        dict: Plan con las claves 'name', 'hash', 'nodes', 'links', 'inputs', 'outputs',
+              'subgraphs', 'io_locations' (posiciones de entrada y salida, o None) e
+              'issues' (problemas encontrados al compilar, fuera del hash)
+    """
+    files = dependencies if dependencies is not None else []
+    return _compile(data, name, base_dir, data.get("subgraphs", {}), (), files)
+
+
+def file_state(path):
+    """(ruta, mtime_ns, tamaño) de un archivo, con None si no existe"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def dependencies_changed(dependencies):
+    """
+    Indica si alguno de los archivos de una lista de dependencias ha cambiado.
+
+    Args:
+        dependencies: (ruta, mtime_ns, tamaño) anotados al compilar
+
+    Returns:
+        bool: True si algún archivo se modificó, apareció o desapareció
+    """
+    return any(file_state(path) != (path, mtime_ns, size) for path, mtime_ns, size in dependencies)
+
+
+def _compile(data, name, base_dir, definitions, stack, files):
+    """Compila una plantilla dentro de un contexto de resolución de subgrafos"""
+    nodes = []
+    aliases = {}
+    node_ids = set()
+    issues = []
+    subgraphs = {}
+    scope = {"definitions": definitions, "base_dir": base_dir, "stack": stack, "resolved": {}, "files": files}
+
+    for index, node_data in enumerate(data.get("nodes", [])):
+        # Los nodos que instancian un subgrafo no necesitan declarar su tipo
+        node_type = node_data.get("type", GROUP_NODE_TYPE if node_data.get("subgraph") else None)
+        if node_type is None:
+            node_type = node_data["type"]
+        node_id = node_data.get("id", node_data.get("name", f"node_{index}"))
+
+        # Los nodos de entrada y salida se crean siempre al construir el árbol
+        if node_type == 'NodeGroupInput':
+            aliases[node_id] = GROUP_INPUT_ID
+            continue
+        if node_type == 'NodeGroupOutput':
+            aliases[node_id] = GROUP_OUTPUT_ID
+            continue
+
+        inputs = node_data.get("inputs", {})
+        if isinstance(inputs, (list, tuple)):
+            # Entradas definidas por posición
+            inputs = {str(i): value for i, value in enumerate(inputs)}
+
+        node = {
+            "id": node_id,
+            "type": node_type,
+            "location": tuple(node_data.get("location", (0, 0))),
+            "properties": {k: _freeze(v) for k, v in node_data.get("properties", {}).items()},
+            "inputs": {str(k): _freeze(v) for k, v in inputs.items()},
+        }
+
+        if node_data.get("subgraph"):
+            subplan = _resolve_subgraph(str(node_data["subgraph"]), scope, issues)
+            if subplan is None:
+                continue
+            # El hash del subgrafo forma parte del nodo y, por tanto, del hash del plan
+            node["type"] = GROUP_NODE_TYPE
+            node["subgraph"] = subplan["hash"]
+            subgraphs[subplan["hash"]] = subplan
+
+        nodes.append(node)
+        node_ids.add(node_id)
+
+    # Sin posiciones útiles, los nodos se distribuyen automáticamente por capas
+    layout = data.get("layout", "auto")
+    use_layout = layout == "always" or (layout == "auto" and auto_layout.needs_layout(nodes))
+
+    links = []
+    if data.get("lod"):
+        _expand_lod(data["lod"], nodes, links, issues)
+        node_ids.update(node["id"] for node in nodes)
+
+    for link_data in data.get("links", []):
+        from_node_id = link_data["from_node"]
+        from_socket_name = str(link_data["from_socket"])
+        to_node_id = link_data["to_node"]
+        to_socket_name = str(link_data["to_socket"])
+
+        from_node_id = aliases.get(from_node_id, from_node_id)
+        to_node_id = aliases.get(to_node_id, to_node_id)
+
+        # Ajustar IDs para nodos de entrada y salida
+        if from_node_id in _INPUT_ALIASES or (from_node_id not in node_ids and from_socket_name == "Geometry"):
+            from_node_id = GROUP_INPUT_ID
+        if to_node_id in _OUTPUT_ALIASES or (to_node_id not in node_ids and to_socket_name == "Geometry"):
+            to_node_id = GROUP_OUTPUT_ID
+
+        if from_node_id not in node_ids and from_node_id != GROUP_INPUT_ID:
+            issues.append(("unknown_node", f"Link ignorado, nodo de origen desconocido: {from_node_id}"))
+            continue
+        if to_node_id not in node_ids and to_node_id != GROUP_OUTPUT_ID:
+            issues.append(("unknown_node", f"Link ignorado, nodo de destino desconocido: {to_node_id}"))
+            continue
+
+        links.append((from_node_id, from_socket_name, to_node_id, to_socket_name))
+
+    io_locations = None
+    if use_layout:
+        locations = auto_layout.compute_layout(
+            [GROUP_INPUT_ID] + [node["id"] for node in nodes] + [GROUP_OUTPUT_ID],
+            [(link[0], link[2]) for link in links],
+            fixed_first=(GROUP_INPUT_ID,),
+            fixed_last=(GROUP_OUTPUT_ID,),
+        )
+        for node in nodes:
+            node["location"] = locations[node["id"]]
+        io_locations = (locations[GROUP_INPUT_ID], locations[GROUP_OUTPUT_ID])
+
+    plan = {
+        "name": name or data.get("name", "GeometryNodes"),
+        "nodes": tuple(nodes),
+        "links": tuple(links),
+        "inputs": _normalize_interface(data.get("inputs")),
+        "outputs": _normalize_interface(data.get("outputs")),
+        "subgraphs": subgraphs,
+        "io_locations": io_locations,
+        "issues": tuple(issues),
+    }
+    plan["hash"] = compute_plan_hash(plan)
+    return plan
+
+
+def with_collection_source(plan):
+    """
+    Deriva un plan que toma su geometría de una colección en lugar de la del objeto.
+
+    Se añade un nodo GeometryNodeCollectionInfo alimentado por una entrada 'Collection'
+    del grupo, y todos los enlaces que partían de la geometría de entrada pasan a
+    partir de sus instancias. Cada objeto de la colección se conserva como una
+    instancia con su propia transformación.
+
+    Args:
+        plan (dict): Plan compilado
+
+    Returns:
+        dict: Nuevo plan (memorizado por el hash del plan original)
+    """
+    cached = _derived_cache.get(("collection", plan["hash"]))
+    if cached is not None:
+        return cached
+
+    collection_node = {
+        "id": COLLECTION_INFO_ID,
+        "type": "GeometryNodeCollectionInfo",
+        "location": (-400, 0),
+        "properties": {"transform_space": 'RELATIVE'},
+        "inputs": {"Separate Children": True, "Reset Children": False},
+    }
+
+    links = [(GROUP_INPUT_ID, COLLECTION_SOCKET, COLLECTION_INFO_ID, "Collection")]
+    for from_node_id, from_socket_name, to_node_id, to_socket_name in plan["links"]:
+        if from_node_id == GROUP_INPUT_ID and from_socket_name == "Geometry":
+            from_node_id, from_socket_name = COLLECTION_INFO_ID, "Instances"
+        links.append((from_node_id, from_socket_name, to_node_id, to_socket_name))
+
+    # Sin enlaces el árbol conectaría la entrada directamente con la salida
+    if len(links) == 1:
+        links.append((COLLECTION_INFO_ID, "Instances", GROUP_OUTPUT_ID, "Geometry"))
+
+    derived = {
+        "name": f"{plan['name']}_collection",
+        "nodes": (collection_node,) + tuple(plan["nodes"]),
+        "links": tuple(links),
+        "inputs": tuple(plan["inputs"]) + ({"name": COLLECTION_SOCKET, "type": "NodeSocketCollection"},),
+        "outputs": plan["outputs"],
+        "subgraphs": plan.get("subgraphs", {}),
+        "io_locations": plan.get("io_locations"),
+        "issues": plan.get("issues", ()),
+    }
+    derived["hash"] = compute_plan_hash(derived)
+    _derived_cache[("collection", plan["hash"])] = derived
+    return derived
+
+
+def socket_type_for_value(value):
+    """Tipo de socket de interfaz adecuado para un valor de ejemplo"""
+    if isinstance(value, bool):
+        return "NodeSocketBool"
+    if isinstance(value, int):
+        return "NodeSocketInt"
+    if isinstance(value, (list, tuple)):
+        return "NodeSocketVector"
+    return "NodeSocketFloat"
+
+
+def expose_inputs(plan, parameters):
+    """
+    Deriva un plan en el que ciertas entradas de nodos se controlan desde el modificador.
+
+    Cada parámetro "id_nodo.Entrada" se convierte en un socket de entrada del grupo con
+    ese mismo nombre, conectado a la entrada del nodo. Así un único árbol sirve para
+    evaluar muchas combinaciones de valores sin reconstruirse.
+
+    Args:
+        plan (dict): Plan compilado
+        parameters (dict): Parámetro -> valor de ejemplo (para deducir el tipo de socket)
+
+    Returns:
+        dict: Nuevo plan (memorizado por el hash del plan y los parámetros)
+    """
+    signature = tuple(sorted((key, socket_type_for_value(value)) for key, value in parameters.items()))
+    cache_key = ("expose", plan["hash"], signature)
+    cached = _derived_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    nodes_by_id = {node["id"]: node for node in plan["nodes"]}
+    interface = []
+    links = []
+    for key, socket_type in signature:
+        node_id, _, input_name = key.partition(".")
+        node = nodes_by_id.get(node_id)
+        if node is None or not input_name:
+            raise ValueError(f"Parámetro no válido: {key}")
+
+        socket = {"name": key, "type": socket_type}
+        if input_name in node["inputs"]:
+            socket["default"] = node["inputs"][input_name]
+        interface.append(socket)
+
+        # La entrada expuesta sustituye a cualquier enlace previo hacia ese socket
+        links.append((GROUP_INPUT_ID, key, node_id, input_name))
+
+    exposed_targets = {(link[2], link[3]) for link in links}
+    links = [link for link in plan["links"] if (link[2], link[3]) not in exposed_targets] + links
+
+    derived = {
+        "name": plan["name"],
+        "nodes": plan["nodes"],
+        "links": tuple(links),
+        "inputs": tuple(plan["inputs"]) + tuple(interface),
+        "outputs": plan["outputs"],
+        "subgraphs": plan.get("subgraphs", {}),
+        "io_locations": plan.get("io_locations"),
+        "issues": plan.get("issues", ()),
+    }
+    derived["hash"] = compute_plan_hash(derived)
+    _derived_cache[cache_key] = derived
+    return derived
+
+
+def load_template(filepath):
+    """
+    Lee y compila una plantilla JSON, reutilizando el plan si el archivo no ha cambiado.
+
+    Args:
+        filepath (str): Ruta al archivo JSON
+
+    Returns:
+        dict: Plan compilado
+    """
+    return _load(filepath, ())
+
+
+def _load(filepath, stack):
+    """Lee y compila una plantilla con la pila de subgrafos en resolución"""
+    path = os.path.abspath(filepath)
+    cached = _file_cache.get(path)
+    if cached is not None and not dependencies_changed(cached[0]):
+        return cached[1]
+
+    state = file_state(path)
+    if state[1] is None:
+        raise FileNotFoundError(f"Plantilla no encontrada: {path}")
+    with open(path, 'r') as f:
+        data = json.load(f)
+    metrics.inc("template_bytes_parsed_total", state[2])
+
+    files = [state]
+    plan = _compile(data, None, os.path.dirname(path), data.get("subgraphs", {}), stack + (path,), files)
+    _file_cache[path] = (tuple(dict.fromkeys(files)), plan)
+    logger.debug(f"Plantilla compilada: {path} ({plan['hash'][:8]})")
+    return plan
+
+
+def clear_cache():
+    """Vacía la caché de plantillas leídas de disco, de planes derivados y de subgrafos"""
+    _file_cache.clear()
+    _derived_cache.clear()
+    _subgraph_cache.clear()
@@ -0,0 +1,165 @@
+import bpy
+import os
+import json
+import time
+import hashlib
+import logging
+
+from . import node_builder, template_plan, template_diff
+from .diagnostics import BuildDiagnostics
+
+logger = logging.getLogger("GeometryNodes")
+
+# Estado de la vigilancia activa (None si no se vigila ninguna plantilla)
+_watch = None
+
+# Propiedad con el hash del plan de la copia propia que se parchea durante la vigilancia
+WATCH_HASH_PROP = "sciblend_watch_hash"
+
+def is_watching():
+    """Indica si hay una plantilla en vigilancia"""
+    return _watch is not None
+
+def get_watched_filepath():
+    """Devuelve la ruta de la plantilla vigilada o una cadena vacía"""
+    return _watch["filepath"] if _watch is not None else ""
+
+def _read_template(filepath):
+    """
+    Lee una plantilla y calcula su hash de contenido.
+
+    Returns:
+        tuple: (mtime_ns, hash del contenido, contenido en bytes)
+    """
+    mtime_ns = os.stat(filepath).st_mtime_ns
+    with open(filepath, 'rb') as f:
+        content = f.read()
+    return mtime_ns, hashlib.sha1(content).hexdigest(), content
+
+def start_watch(obj, filepath, interval=0.25):
+    """
+    Aplica una plantilla a un objeto y empieza a vigilar el archivo.
+
+    Cada cambio en el archivo se compara con el último plan aplicado y se parchea el
+    árbol existente en el sitio; solo se reconstruye por completo cuando el parche no
+    puede aplicarse.
+
+    Args:
+        obj: Objeto al que se aplica la plantilla
+        filepath (str): Ruta absoluta a la plantilla JSON
+        interval (float): Segundos entre comprobaciones del archivo
+    """
+    global _watch
+    stop_watch()
+
+    mtime_ns, digest, content = _read_template(filepath)
+    dependencies = []
+    plan = template_plan.compile_template(json.loads(content), base_dir=os.path.dirname(filepath),
+                                          dependencies=dependencies)
+    node_builder.apply_plan(obj, plan)
+
+    _watch = {
+        "filepath": filepath,
+        "object_name": obj.name,
+        "interval": interval,
+        "mtime_ns": mtime_ns,
+        "digest": digest,
+        "dependencies": dependencies,
+        "plan": plan,
+    }
+    bpy.app.timers.register(_poll, first_interval=interval)
+    logger.info(f"Vigilando plantilla {filepath} sobre {obj.name}")
+
+def stop_watch():
+    """Detiene la vigilancia activa, si la hay"""
+    global _watch
+    if bpy.app.timers.is_registered(_poll):
+        bpy.app.timers.unregister(_poll)
+    if _watch is not None:
+        logger.info(f"Vigilancia detenida: {_watch['filepath']}")
+    _watch = None
+
+def reapply(obj, plan):
+    """
+    Aplica un nuevo plan sobre el árbol construido con el último plan vigilado.
+
+    Args:
+        obj: Objeto vigilado
+        plan (dict): Nuevo plan compilado
+    """
+    start = time.perf_counter()
+    diagnostics = BuildDiagnostics()
+    old_plan = _watch["plan"]
+    gn_mod = node_builder.get_geometry_nodes_modifier(obj)
+    node_tree = gn_mod.node_group
+    patch = template_diff.diff_plans(old_plan, plan)
+
+    tree_hash = None
+    if node_tree is not None:
+        tree_hash = node_tree.get(WATCH_HASH_PROP, node_tree.get(node_builder.PLAN_HASH_PROP))
+
+    if node_tree is None or patch["full_rebuild"] or tree_hash != old_plan["hash"]:
+        # El árbol no corresponde al último plan o el cambio no admite parche
+        node_builder.apply_plan(obj, plan, diagnostics)
+        mode = "reconstrucción completa"
+    elif template_diff.is_empty(patch):
+        mode = "sin cambios"
+    else:
+        # El árbol de la caché lo comparten otros objetos: parchear solo una copia propia
+        node_tree = node_builder.make_private_node_group(gn_mod)
+        node_builder.patch_node_group(node_tree, plan, patch, diagnostics)
+        node_tree[WATCH_HASH_PROP] = plan["hash"]
+        mode = "parche"
+
+    _watch["plan"] = plan
+    elapsed = (time.perf_counter() - start) * 1000.0
+    logger.info(f"Plantilla reaplicada ({mode}) en {elapsed:.1f} ms")
+    diagnostics.log()
+
+def _poll():
+    """Callback de bpy.app.timers: comprueba el archivo y reaplica si ha cambiado"""
+    global _watch
+    if _watch is None:
+        return None
+    interval = _watch["interval"]
+
+    try:
+        # Un cambio en un archivo de subgrafo referenciado también obliga a recompilar
+        dependencies_changed = template_plan.dependencies_changed(_watch["dependencies"])
+        if os.stat(_watch["filepath"]).st_mtime_ns == _watch["mtime_ns"] and not dependencies_changed:
+            return interval
+        mtime_ns, digest, content = _read_template(_watch["filepath"])
+    except OSError:
+        # El editor puede estar reemplazando el archivo
+        return interval
+
+    _watch["mtime_ns"] = mtime_ns
+    if digest == _watch["digest"] and not dependencies_changed:
+        return interval
+
+    dependencies = []
+    try:
+        plan = template_plan.compile_template(json.loads(content),
+                                              base_dir=os.path.dirname(_watch["filepath"]),
+                                              dependencies=dependencies)
+    except (ValueError, KeyError, TypeError, OSError) as e:
+        logger.error(f"Plantilla no válida, se mantiene el árbol actual: {str(e)}")
+        # No volver a compilar hasta el siguiente cambio en alguno de los archivos
+        _watch["dependencies"] = [template_plan.file_state(path) for path, _, _ in _watch["dependencies"]]
+        _watch["dependencies"] += dependencies
+        return interval
+
+    obj = bpy.data.objects.get(_watch["object_name"])
+    if obj is None:
+        logger.warning(f"El objeto vigilado {_watch['object_name']} ya no existe")
+        _watch = None
+        return None
+
+    _watch["digest"] = digest
+    _watch["dependencies"] = dependencies
+    try:
+        reapply(obj, plan)
+    except Exception as e:
+        logger.exception(f"Error al reaplicar la plantilla: {str(e)}")
+
+    return interval
@@ -0,0 +1,329 @@
+import bpy
+import json
+import time
+import logging
+
+from . import template_plan, blender_api
+
+logger = logging.getLogger("GeometryNodes")
+
+# Nodos cuyos sockets dependen de la interfaz de un árbol: sus identificadores cambian
+# al reconstruirlo, así que se exportan por nombre
+_INTERFACE_NODE_TYPES = {'NodeGroupInput', 'NodeGroupOutput', template_plan.GROUP_NODE_TYPE}
+
+# Nodos que solo organizan el editor y no forman parte de la plantilla
+_SKIPPED_NODE_TYPES = {'NodeFrame'}
+
+# Nodos de la interfaz del grupo, que no se sustituyen aunque estén silenciados
+_GROUP_IO_NODE_TYPES = {'NodeGroupInput', 'NodeGroupOutput'}
+
+# Propiedades que no se exportan, además de las comunes a bpy.types.Node
+_EXTRA_IGNORED_PROPERTIES = {"rna_type", "is_active_output", "node_tree"}
+_ignored_properties = None
+
+# Valores por defecto de las entradas de cada tipo de nodo según sus propiedades:
+# (tipo, propiedades) -> {identificador: valor}
+_input_defaults = {}
+
+def _get_ignored_properties():
+    global _ignored_properties
+    if _ignored_properties is None:
+        base = {prop.identifier for prop in bpy.types.Node.bl_rna.properties}
+        _ignored_properties = base | _EXTRA_IGNORED_PROPERTIES
+    return _ignored_properties
+
+def _plain(value):
+    """
+    Convierte un valor RNA en un valor de JSON.
+
+    Returns:
+        El valor convertido, o None si no puede representarse (p. ej. un ID)
+    """
+    if isinstance(value, bpy.types.ID):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if hasattr(value, "__len__"):
+        return [_plain(v) for v in value]
+    return None
+
+def _absolute_location(node):
+    """Posición del nodo en el editor, sumando la de los marcos que lo contienen"""
+    x, y = node.location
+    parent = node.parent
+    while parent is not None:
+        x += parent.location[0]
+        y += parent.location[1]
+        parent = parent.parent
+    return [round(x, 1), round(y, 1)]
+
+def _property_default(prop):
+    if prop.type == 'ENUM':
+        return set(prop.default_flag) if prop.is_enum_flag else prop.default
+    if getattr(prop, "is_array", False):
+        return list(prop.default_array)
+    return prop.default
+
+def node_properties(node):
+    """
+    Propiedades del nodo que difieren de su valor por defecto.
+
+    Args:
+        node: Nodo de Blender
+
+    Returns:
+        dict: Identificador -> valor
+    """
+    ignored = _get_ignored_properties()
+    properties = {}
+    for prop in node.bl_rna.properties:
+        if (prop.identifier in ignored or prop.is_readonly
+                or prop.type not in {'BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM'}):
+            continue
+        value = getattr(node, prop.identifier)
+        plain = _plain(value)
+        if plain is None or plain == _plain(_property_default(prop)):
+            continue
+        properties[prop.identifier] = plain
+    return properties
+
+def _socket_key(node, socket):
+    return socket.name if node.bl_idname in _INTERFACE_NODE_TYPES else socket.identifier
+
+def _group_defaults(node_tree):
+    return {item.identifier: _plain(item.default_value)
+            for item in blender_api.interface_sockets(node_tree, 'INPUT') if hasattr(item, "default_value")}
+
+def input_defaults(node, properties, scratch):
+    """
+    Valores por defecto de las entradas de un nodo con ciertas propiedades.
+
+    Se crea un nodo igual una sola vez en un árbol auxiliar y el resultado se guarda en
+    caché por tipo y propiedades, de modo que exportar muchos árboles con los mismos
+    tipos de nodo no vuelve a crear nodos.
+
+    Args:
+        node: Nodo de Blender
+        properties (dict): Propiedades exportadas del nodo
+        scratch (dict): Contexto de exportación con el árbol auxiliar en 'tree'
+
+    Returns:
+        dict: Identificador del socket -> valor por defecto
+    """
+    if node.bl_idname == template_plan.GROUP_NODE_TYPE:
+        return _group_defaults(node.node_tree) if node.node_tree is not None else {}
+
+    key = (node.bl_idname, json.dumps(properties, sort_keys=True))
+    defaults = _input_defaults.get(key)
+    if defaults is not None:
+        return defaults
+
+    if scratch["tree"] is None:
+        scratch["tree"] = bpy.data.node_groups.new(name=".sciblend_export", type='GeometryNodeTree')
+    reference = scratch["tree"].nodes.new(node.bl_idname)
+    for prop_name, prop_value in properties.items():
+        try:
+            setattr(reference, prop_name, prop_value)
+        except (TypeError, ValueError, AttributeError):
+            pass
+    defaults = {socket.identifier: _plain(socket.default_value)
+                for socket in reference.inputs if hasattr(socket, "default_value")}
+    scratch["tree"].nodes.remove(reference)
+
+    _input_defaults[key] = defaults
+    return defaults
+
+def _export_interface(node_tree, in_out):
+    sockets = []
+    for item in blender_api.interface_sockets(node_tree, in_out):
+        socket = {"name": item.name, "type": blender_api.socket_type(item)}
+        if in_out == 'INPUT' and hasattr(item, "default_value"):
+            default = _plain(item.default_value)
+            if default is not None:
+                socket["default"] = default
+        sockets.append(socket)
+    return sockets
+
+def _bypass_sources(node, socket, muted):
+    """
+    Orígenes reales de una salida, atravesando los nodos silenciados.
+
+    Un nodo silenciado deja pasar a cada salida la entrada de su enlace interno; las
+    salidas sin enlace interno no tienen origen y el destino queda sin conectar.
+
+    Args:
+        node: Nodo del que sale el enlace
+        socket: Socket de salida
+        muted (set): Nombres de los nodos silenciados
+
+    Returns:
+        list: Pares (nodo, socket) no silenciados
+    """
+    if node.name not in muted:
+        return [(node, socket)]
+
+    sources = []
+    for internal in node.internal_links:
+        if internal.to_socket.identifier != socket.identifier:
+            continue
+        for link in internal.from_socket.links:
+            if link.is_valid and not link.is_muted:
+                sources.extend(_bypass_sources(link.from_node, link.from_socket, muted))
+    if not sources:
+        logger.warning(f"{node.id_data.name}: la salida '{socket.name}' del nodo silenciado {node.name} "
+                       f"no deja pasar ninguna entrada y se exporta sin conectar")
+    return sources
+
+def _export(node_tree, scratch, subgraphs, stack):
+    """
+    Exporta un árbol; los árboles de los nodos de grupo se añaden a 'subgraphs'.
+
+    El formato de plantilla no puede silenciar nodos, así que los nodos silenciados no
+    se exportan y sus enlaces se sustituyen por los que atraviesan el nodo.
+    """
+    muted = {node.name for node in node_tree.nodes
+             if node.mute and node.bl_idname not in _GROUP_IO_NODE_TYPES}
+
+    nodes = []
+    for node in node_tree.nodes:
+        if node.bl_idname in _SKIPPED_NODE_TYPES or node.name in muted:
+            continue
+        node_data = {"id": node.name, "type": node.bl_idname, "location": _absolute_location(node)}
+
+        if node.bl_idname == template_plan.GROUP_NODE_TYPE and node.node_tree is not None:
+            sub_tree = node.node_tree
+            if sub_tree.name in stack:
+                raise ValueError(f"Referencia circular al árbol {sub_tree.name}")
+            if sub_tree.name not in subgraphs:
+                subgraphs[sub_tree.name] = None
+                subgraphs[sub_tree.name] = _export(sub_tree, scratch, subgraphs, stack | {sub_tree.name})
+            node_data["subgraph"] = sub_tree.name
+
+        if node.bl_idname not in _INTERFACE_NODE_TYPES - {template_plan.GROUP_NODE_TYPE}:
+            properties = node_properties(node)
+            defaults = input_defaults(node, properties, scratch)
+            inputs = {}
+            for socket in node.inputs:
+                if socket.is_linked or not socket.enabled or not hasattr(socket, "default_value"):
+                    continue
+                value = _plain(socket.default_value)
+                if value is not None and value != defaults.get(socket.identifier):
+                    inputs[_socket_key(node, socket)] = value
+            if properties:
+                node_data["properties"] = properties
+            if inputs:
+                node_data["inputs"] = inputs
+        nodes.append(node_data)
+
+    links = []
+    exported = set()
+    for link in node_tree.links:
+        if not link.is_valid or link.is_muted:
+            continue
+        if link.from_node.bl_idname in _SKIPPED_NODE_TYPES or link.to_node.bl_idname in _SKIPPED_NODE_TYPES:
+            continue
+        if link.to_node.name in muted:
+            continue
+        for from_node, from_socket in _bypass_sources(link.from_node, link.from_socket, muted):
+            key = (from_node.name, _socket_key(from_node, from_socket),
+                   link.to_node.name, _socket_key(link.to_node, link.to_socket))
+            if key in exported:
+                continue
+            exported.add(key)
+            links.append(dict(zip(("from_node", "from_socket", "to_node", "to_socket"), key)))
+
+    return {
+        "name": node_tree.name,
+        "nodes": nodes,
+        "links": links,
+        "inputs": _export_interface(node_tree, 'INPUT'),
+        "outputs": _export_interface(node_tree, 'OUTPUT'),
+    }
+
+def export_template(node_tree, scratch=None):
+    """
+    Exporta un árbol de Geometry Nodes al formato de plantilla del addon.
+
+    Recorre el árbol una sola vez: tipos de nodo, posiciones, propiedades y valores de
+    entrada que difieren de los del nodo recién creado, enlaces por identificador de
+    socket (por nombre en los nodos que dependen de una interfaz) e interfaz del grupo.
+    Los árboles de los nodos de grupo se exportan como subgrafos.
+
+    Args:
+        node_tree: Árbol de Geometry Nodes
+        scratch (dict): Contexto compartido entre exportaciones (opcional; ver export_library)
+
+    Returns:
+        dict: Plantilla con el formato de json_templates/
+    """
+    owns_scratch = scratch is None
+    if owns_scratch:
+        scratch = {"tree": None}
+    try:
+        subgraphs = {}
+        template = _export(node_tree, scratch, subgraphs, frozenset((node_tree.name,)))
+    finally:
+        if owns_scratch and scratch["tree"] is not None:
+            bpy.data.node_groups.remove(scratch["tree"])
+    if subgraphs:
+        template["subgraphs"] = subgraphs
+    return template
+
+def export_node_tree(node_tree, scratch=None):
+    """
+    Exporta un árbol como plantilla y plan compilado.
+
+    Args:
+        node_tree: Árbol de Geometry Nodes
+        scratch (dict): Contexto compartido entre exportaciones (opcional)
+
+    Returns:
+        dict: 'template' (plantilla), 'plan' (plan compilado) y 'hash' (hash del plan)
+    """
+    template = export_template(node_tree, scratch)
+    plan = template_plan.compile_template(template, name=node_tree.name)
+    return {"template": template, "plan": plan, "hash": plan["hash"]}
+
+def export_library(node_groups=None):
+    """
+    Exporta muchos árboles compartiendo el árbol auxiliar y la caché de valores por defecto.
+
+    Args:
+        node_groups: Árboles a exportar (por defecto, todos los de Geometry Nodes del archivo)
+
+    Returns:
+        list: Resultados de export_node_tree, en el mismo orden
+    """
+    if node_groups is None:
+        node_groups = [node_group for node_group in bpy.data.node_groups
+                       if node_group.bl_idname == 'GeometryNodeTree' and not node_group.name.startswith(".")]
+
+    start = time.perf_counter()
+    scratch = {"tree": None}
+    try:
+        results = [export_node_tree(node_group, scratch) for node_group in node_groups]
+    finally:
+        if scratch["tree"] is not None:
+            bpy.data.node_groups.remove(scratch["tree"])
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"{len(results)} árboles exportados en {elapsed * 1000.0:.0f} ms")
+    return results
+
+def write_bundle(results, filepath):
+    """
+    Escribe las plantillas exportadas como un paquete NDJSON (una plantilla por línea).
+
+    Cada plantilla lleva el nombre del árbol en 'id', para poder asignarla por nombre
+    en un paquete (ver utils/bundle.py), y el hash de su plan en 'hash'.
+
+    Args:
+        results (list): Resultados de export_library
+        filepath (str): Ruta de salida
+    """
+    with open(filepath, 'w') as f:
+        for result in results:
+            record = dict(result["template"], id=result["template"]["name"], hash=result["hash"])
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
@@ -0,0 +1,132 @@
+import bpy
+import json
+import hashlib
+
+from . import blender_api
+
+# Rondas de refinamiento de etiquetas (Weisfeiler-Lehman) para independizar el hash
+# de los nombres y del orden de los nodos
+_REFINEMENT_ROUNDS = 3
+
+# Propiedades de los nodos que no afectan al resultado, además de las comunes a bpy.types.Node
+_EXTRA_IGNORED_PROPERTIES = {"rna_type"}
+
+# Propiedades comunes a bpy.types.Node que sí cambian el resultado: un nodo silenciado
+# deja pasar su entrada y la salida activa decide cuál de los Group Output se usa
+_KEPT_NODE_PROPERTIES = {"mute", "is_active_output"}
+_ignored_properties = None
+
+def _get_ignored_properties():
+    global _ignored_properties
+    if _ignored_properties is None:
+        base = {prop.identifier for prop in bpy.types.Node.bl_rna.properties}
+        _ignored_properties = (base | _EXTRA_IGNORED_PROPERTIES) - _KEPT_NODE_PROPERTIES
+    return _ignored_properties
+
+def _digest(value):
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def _rna_value(value, memo):
+    """Convierte un valor RNA en un valor comparable y serializable"""
+    if isinstance(value, bpy.types.NodeTree):
+        return "tree:" + structural_hash(value, memo)
+    if isinstance(value, bpy.types.ID):
+        return f"id:{type(value).__name__}:{value.name_full}"
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if hasattr(value, "__len__") and not isinstance(value, str):
+        return [_rna_value(v, memo) for v in value]
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+def _node_signature(node, memo):
+    """
+    Firma local de un nodo: tipo, propiedades y valores de entradas no conectadas.
+
+    Args:
+        node: Nodo de Blender
+        memo (dict): Hashes ya calculados para los subárboles
+
+    Returns:
+        str: Hash de la firma
+    """
+    ignored = _get_ignored_properties()
+    properties = {}
+    for prop in node.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier in ignored or prop.type == 'COLLECTION':
+            continue
+        properties[identifier] = _rna_value(getattr(node, identifier, None), memo)
+
+    inputs = []
+    for socket in node.inputs:
+        value = None
+        if not socket.is_linked and hasattr(socket, "default_value"):
+            value = _rna_value(socket.default_value, memo)
+        inputs.append((socket.identifier, socket.enabled, value))
+
+    return _digest([node.bl_idname, properties, inputs])
+
+def _interface_signature(node_tree, memo):
+    """Firma de la interfaz del árbol (sockets de entrada y salida con sus valores por defecto)"""
+    items = []
+    for in_out in ('INPUT', 'OUTPUT'):
+        for item in blender_api.interface_sockets(node_tree, in_out):
+            default = _rna_value(item.default_value, memo) if hasattr(item, "default_value") else None
+            items.append((in_out, blender_api.socket_type(item), item.identifier, item.name, default))
+    return items
+
+def structural_hash(node_tree, memo=None):
+    """
+    Calcula un hash canónico de la estructura de un árbol de nodos.
+
+    El hash cubre tipos de nodo, propiedades, valores por defecto, enlaces e interfaz
+    (incluidos los valores por defecto de sus sockets), y no depende de los nombres ni
+    del orden de los nodos. Los nodos de grupo se resuelven por el hash estructural de
+    su subárbol.
+
+    Args:
+        node_tree (bpy.types.NodeTree): El árbol de nodos
+        memo (dict): Hashes ya calculados, indexados por nombre completo del árbol
+
+    Returns:
+        str: Hash SHA-1 en hexadecimal
+    """
+    if memo is None:
+        memo = {}
+    key = node_tree.name_full
+    if key in memo:
+        return memo[key]
+
+    # Protección contra árboles recursivos
+    memo[key] = "recursive"
+
+    labels = {node.name: _node_signature(node, memo) for node in node_tree.nodes}
+
+    edges = []
+    for link in node_tree.links:
+        if not link.is_valid or link.is_muted:
+            continue
+        edges.append((link.from_node.name, link.from_socket.identifier,
+                      link.to_node.name, link.to_socket.identifier))
+
+    # Refinar las etiquetas con las de los vecinos para distinguir posiciones en el grafo
+    for _ in range(_REFINEMENT_ROUNDS):
+        neighbours = {name: [] for name in labels}
+        for from_name, from_socket, to_name, to_socket in edges:
+            neighbours[from_name].append(("out", from_socket, to_socket, labels[to_name]))
+            neighbours[to_name].append(("in", to_socket, from_socket, labels[from_name]))
+        labels = {name: _digest([label, sorted(neighbours[name])])
+                  for name, label in labels.items()}
+
+    canonical_edges = sorted((labels[f], fs, labels[t], ts) for f, fs, t, ts in edges)
+    result = _digest([
+        node_tree.bl_idname,
+        _interface_signature(node_tree, memo),
+        sorted(labels.values()),
+        canonical_edges,
+    ])
+    memo[key] = result
+    return result
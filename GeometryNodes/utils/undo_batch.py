@@ -0,0 +1,84 @@
+import bpy
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger("GeometryNodes")
+
+# Lotes abiertos, del más externo al más interno
+_stack = []
+
+class UndoBatch:
+    """
+    Estado de un lote de aplicaciones que se deshace en un solo paso.
+
+    Attributes:
+        message (str): Nombre del paso en el historial de deshacer
+        count (int): Objetos modificados dentro del lote
+        skip_threshold (int): Tamaño a partir del cual no se guarda paso de deshacer
+                              (None para guardarlo siempre)
+    """
+
+    def __init__(self, message, skip_threshold=None):
+        self.message = message
+        self.count = 0
+        self.skip_threshold = skip_threshold
+
+    @property
+    def skips_undo(self):
+        """Indica si el lote es lo bastante grande para no guardar paso de deshacer"""
+        return self.skip_threshold is not None and self.count >= self.skip_threshold
+
+def in_batch():
+    """Indica si hay un lote abierto"""
+    return bool(_stack)
+
+def record(count=1):
+    """Anota objetos modificados en el lote abierto más interno, si lo hay"""
+    if _stack:
+        _stack[-1].count += count
+
+def push_step(message):
+    """Guarda un paso en el historial de deshacer"""
+    try:
+        bpy.ops.ed.undo_push(message=message)
+    except RuntimeError as e:
+        # Sin ventana (p. ej. en segundo plano) no hay historial de deshacer
+        logger.debug(f"No se guardó el paso de deshacer '{message}': {str(e)}")
+
+@contextmanager
+def batch(context, message, skip_threshold=None):
+    """
+    Agrupa varias aplicaciones en un único paso de deshacer.
+
+    Dentro del lote no se actualiza la capa de vista ni se guardan pasos de deshacer;
+    al cerrar el lote más externo se hace una sola actualización y un solo paso, también
+    si el lote termina con una excepción, para poder deshacer lo que llegó a aplicarse.
+    Los lotes anidados (por ejemplo, un operador llamado desde un bucle dentro de un
+    lote) se suman al lote externo.
+
+    Los operadores que lo usan no declaran 'UNDO' en bl_options, ya que el paso se
+    guarda aquí.
+
+    Args:
+        context: Contexto de Blender
+        message (str): Nombre del paso en el historial de deshacer
+        skip_threshold (int): Con este número de objetos o más, no guardar paso de
+                              deshacer y avisar en el registro (None para guardarlo siempre)
+
+    Yields:
+        UndoBatch: Estado del lote
+    """
+    current = UndoBatch(message, skip_threshold)
+    _stack.append(current)
+    try:
+        yield current
+    finally:
+        _stack.pop()
+        if _stack:
+            _stack[-1].count += current.count
+        else:
+            context.view_layer.update()
+            if current.skips_undo:
+                logger.warning(f"{message}: {current.count} objetos modificados sin paso de deshacer")
+            elif current.count:
+                push_step(message)